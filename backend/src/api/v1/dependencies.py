@@ -1,11 +1,11 @@
 # backend/src/api/v1/dependencies.py
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from backend.src.core.security import verify_token
+from backend.src.core.security import verify_stream_token, verify_token
 from backend.src.db.models.user import User
-from backend.src.db.postgresql import get_session
+from backend.src.db.postgresql import get_session, postgres_db
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
@@ -13,6 +13,23 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 async def get_current_user(
     token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_session)
 ) -> User:
+    return await user_for_token(session, token)
+
+
+async def get_current_superuser(
+    current_user: User = Depends(get_current_user),
+) -> User:
+    """Restricts an endpoint to operators; everyone else gets a 403."""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="The user doesn't have enough privileges",
+        )
+    return current_user
+
+
+async def user_for_token(session: AsyncSession, token: str) -> User:
+    """Resolves a bearer token to its active user, or raises 401/400."""
     user_id = verify_token(token)
     if not user_id:
         raise HTTPException(
@@ -24,3 +41,22 @@ async def get_current_user(
     if not user or not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return user
+
+
+async def get_stream_user(token: str = Query(...)) -> User:
+    """
+    Resolves the short-lived stream token of an event stream (see
+    create_stream_token). The user is looked up in its own session, which is
+    closed before the stream starts rather than held open for its lifetime.
+    """
+    user_id = verify_stream_token(token)
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired stream token",
+        )
+    async with postgres_db.get_session() as session:
+        user = await session.get(User, user_id)
+    if not user or not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return user
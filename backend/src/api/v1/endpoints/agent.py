@@ -2,6 +2,7 @@ import asyncio
 import uuid
 from typing import List
 import json
+import re
 
 from fastapi import APIRouter, Depends, status, HTTPException, Request, Response
 from fastapi.responses import FileResponse, StreamingResponse
@@ -9,12 +10,32 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select, desc
 from pathlib import Path
 
-from backend.src.api.v1.dependencies import get_current_user
+from backend.src.api.v1.dependencies import (
+    get_current_superuser,
+    get_current_user,
+    get_stream_user,
+)
+from backend.src.core.security import create_stream_token
 from backend.src.core.settings import get_settings
-from backend.src.db.models.agent_run import AgentRun, AgentRunCreate, AgentRunRead
+from backend.src.db.models.agent_run import (
+    AgentRun,
+    AgentRunBatchCreate,
+    AgentRunCreate,
+    AgentRunRead,
+    RunStep,
+)
 from backend.src.db.models.user import User
 from backend.src.db.postgresql import get_session
 from backend.src.services import agent_runner
+from backend.src.services.run_events import publish_run_status, run_events_channel
+from backend.src.services.run_log import load_run_log
+from backend.src.services.screenshot_store import (
+    release_run_blobs,
+    resolve_screenshot,
+    screenshot_store,
+    sweep_orphan_blobs,
+)
+from backend.worker.lanes import get_queue_wait_stats
 
 import redis.asyncio as redis
 
@@ -35,12 +56,46 @@ async def create_agent_run(
     """Creates a new agent run record and queues it for execution."""
     if not current_user.id:
         raise HTTPException(status_code=403, detail="User ID not found")
-    run = await agent_runner.queue_agent_run(
-        db=db, run_in=run_in, owner_id=current_user.id
-    )
+    try:
+        run = await agent_runner.queue_agent_run(
+            db=db, run_in=run_in, owner_id=current_user.id
+        )
+    except agent_runner.RunQuotaExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
     return run
 
 
+@router.post(
+    "/runs/batch",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=List[AgentRunRead],
+)
+async def create_agent_runs_batch(
+    batch_in: AgentRunBatchCreate,
+    db: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Creates many agent runs in one transaction and queues them for execution."""
+    if not current_user.id:
+        raise HTTPException(status_code=403, detail="User ID not found")
+    try:
+        runs = await agent_runner.queue_agent_runs(
+            db=db, runs_in=batch_in.runs, owner_id=current_user.id
+        )
+    except agent_runner.RunQuotaExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return runs
+
+
+@router.get("/queues/wait-times")
+async def get_queue_wait_times(current_user: User = Depends(get_current_superuser)):
+    """
+    Per-lane histogram of how long scout runs waited for a worker. The numbers
+    cover every tenant's runs, so only operators may read them.
+    """
+    return await get_queue_wait_stats(redis_client)
+
+
 @router.get("/runs", response_model=List[AgentRunRead])
 async def get_agent_runs(
     db: AsyncSession = Depends(get_session),
@@ -75,6 +130,25 @@ async def get_agent_run(
     return db_run
 
 
+@router.get("/runs/{run_id}/steps", response_model=List[RunStep])
+async def get_agent_run_steps(
+    run_id: uuid.UUID,
+    db: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Gets the recorded steps of a run, including steps of a run still in progress."""
+    result = await db.execute(
+        select(AgentRun.id).where(
+            AgentRun.id == run_id, AgentRun.owner_id == current_user.id
+        )
+    )
+    if not result.scalar_one_or_none():
+        raise HTTPException(
+            status_code=404, detail="Agent run not found or access denied"
+        )
+    return await load_run_log(db, run_id)
+
+
 @router.delete("/runs/{run_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_agent_run(
     run_id: uuid.UUID,
@@ -93,18 +167,60 @@ async def delete_agent_run(
             status_code=404, detail="Agent run not found or access denied"
         )
 
+    await release_run_blobs(db, run_id)
     await db.delete(db_run)
     await db.commit()
+
+    orphaned = await sweep_orphan_blobs(db, settings.SCREENSHOT_BLOB_GRACE_SECONDS)
+    await db.commit()
+    await asyncio.to_thread(screenshot_store.delete, orphaned)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
+@router.post("/runs/{run_id}/cancel", status_code=status.HTTP_202_ACCEPTED)
+async def cancel_agent_run(
+    run_id: uuid.UUID,
+    db: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Requests cancellation of a pending or running agent run."""
+    result = await db.execute(
+        select(AgentRun).where(
+            AgentRun.id == run_id, AgentRun.owner_id == current_user.id
+        )
+    )
+    db_run = result.scalar_one_or_none()
+    if not db_run:
+        raise HTTPException(
+            status_code=404, detail="Agent run not found or access denied"
+        )
+    if db_run.status not in ("PENDING", "RUNNING"):
+        raise HTTPException(status_code=409, detail="Run can no longer be cancelled.")
+
+    if db_run.status == "PENDING":
+        # The worker skips runs that were cancelled before it picked them up.
+        db_run.status = "CANCELLED"
+        db.add(db_run)
+        await db.commit()
+        await publish_run_status(redis_client, db_run.owner_id, run_id, "CANCELLED")
+    await redis_client.publish(f"cancel:{run_id}", "cancel")
+    return {"run_id": str(run_id), "status": "CANCELLING"}
+
+
 @router.get("/runs/{run_id}/screenshots/{screenshot_file}")
-async def get_run_screenshot(run_id: uuid.UUID, screenshot_file: str):
-    """Serves a screenshot file from the run's storage."""
+async def get_run_screenshot(
+    run_id: uuid.UUID, screenshot_file: str, db: AsyncSession = Depends(get_session)
+):
+    """Serves a screenshot from the run's storage, or a step's from the screenshot store."""
     if ".." in screenshot_file:
         raise HTTPException(status_code=400, detail="Invalid filename.")
 
     file_path = Path(f"storage/runs/{run_id}/{screenshot_file}")
+    step_match = re.fullmatch(r"step_(\d+)\.jpeg", screenshot_file)
+    if not file_path.is_file() and step_match:
+        steps = await load_run_log(db, run_id, steps=[int(step_match.group(1))])
+        if steps:
+            file_path = resolve_screenshot(steps[0].screenshot_path)
     if not file_path.is_file():
         raise HTTPException(status_code=404, detail="Screenshot not found.")
     return FileResponse(str(file_path))
@@ -143,9 +259,9 @@ async def download_run_report(
 
 
 async def frame_generator(run_id: str):
-    """Streams JPEG frames for the MJPEG live view."""
+    """Streams low-resolution preview frames for the MJPEG live view."""
     pubsub = redis_client.pubsub()
-    await pubsub.subscribe(f"frames:{run_id}")
+    await pubsub.subscribe(f"preview:{run_id}")
     print(f"🎥 Started MJPEG frame stream for run_id: {run_id}")
     try:
         while True:
@@ -167,8 +283,8 @@ async def frame_generator(run_id: str):
     except asyncio.CancelledError:
         print(f"🛑 MJPEG stream for run_id: {run_id} cancelled by client.")
     finally:
-        await pubsub.unsubscribe(f"frames:{run_id}")
-        print(f"🎬 Unsubscribed from frames:{run_id}")
+        await pubsub.unsubscribe(f"preview:{run_id}")
+        print(f"🎬 Unsubscribed from preview:{run_id}")
 
 
 @router.get("/stream/{run_id}")
@@ -208,3 +324,64 @@ async def stream_agent_logs(run_id: str, request: Request):
     return StreamingResponse(
         log_generator(run_id, request), media_type="text/event-stream"
     )
+
+
+async def run_events_generator(owner_id: uuid.UUID, request: Request):
+    """Streams the user's run status transitions using Server-Sent Events (SSE)."""
+    channel = run_events_channel(owner_id)
+    pubsub = redis_client.pubsub()
+    await pubsub.subscribe(channel)
+    print(f"📡 Started SSE run status stream for user: {owner_id}")
+    idle_seconds = 0.0
+    try:
+        # Events published while disconnected are lost; clients refetch their
+        # runs on `connected` and then apply events as they arrive.
+        yield "event: connected\ndata: Connection established\n\n"
+        while True:
+            if await request.is_disconnected():
+                break
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=1.0
+            )
+            if message and message["type"] == "message":
+                idle_seconds = 0.0
+                yield f"data: {message['data'].decode('utf-8')}\n\n"
+            else:
+                idle_seconds += 1.0
+                if idle_seconds >= settings.RUN_EVENTS_KEEPALIVE_SECONDS:
+                    # Comment line; keeps idle connections open through proxies.
+                    idle_seconds = 0.0
+                    yield ": keepalive\n\n"
+    except asyncio.CancelledError:
+        print(f"🛑 SSE run status stream for user: {owner_id} cancelled by server.")
+    finally:
+        await pubsub.unsubscribe(channel)
+        await pubsub.aclose()
+        print(f"🎬 Unsubscribed from {channel}")
+
+
+@router.post("/events/token")
+async def create_run_events_token(current_user: User = Depends(get_current_user)):
+    """
+    Issues a short-lived token for `GET /events`. EventSource cannot send
+    headers, so the stream is opened with this token in the query string
+    instead of the access token; fetch a new one before each (re)connect.
+    """
+    assert current_user.id is not None
+    return {
+        "token": create_stream_token(current_user.id),
+        "expires_in": settings.RUN_EVENTS_TOKEN_EXPIRE_SECONDS,
+    }
+
+
+@router.get("/events")
+async def stream_run_events(
+    request: Request, current_user: User = Depends(get_stream_user)
+):
+    """
+    Pushes the current user's run status changes, so clients need not poll
+    the runs endpoints. Opened with a token from `POST /events/token`.
+    """
+    return StreamingResponse(
+        run_events_generator(current_user.id, request), media_type="text/event-stream"
+    )
@@ -65,14 +65,36 @@ def create_refresh_token(data: dict) -> str:
     return encoded_jwt
 
 
+# Stream tokens travel in URLs (EventSource cannot send headers), where they
+# end up in logs, so they expire quickly and only open a run events stream.
+STREAM_TOKEN_PURPOSE = "run_events"
+
+
+def create_stream_token(user_id: uuid.UUID) -> str:
+    expire = datetime.now(timezone.utc) + timedelta(
+        seconds=settings.RUN_EVENTS_TOKEN_EXPIRE_SECONDS
+    )
+    to_encode = {"sub": str(user_id), "purpose": STREAM_TOKEN_PURPOSE, "exp": expire}
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
 def verify_token(token: str) -> Optional[uuid.UUID]:
+    """Resolves a bearer token to its user id; purpose-bound tokens are rejected."""
+    return _verify_token(token, purpose=None)
+
+
+def verify_stream_token(token: str) -> Optional[uuid.UUID]:
+    return _verify_token(token, purpose=STREAM_TOKEN_PURPOSE)
+
+
+def _verify_token(token: str, purpose: Optional[str]) -> Optional[uuid.UUID]:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
         user_id = payload.get("sub")
-        if user_id is None:
+        if user_id is None or payload.get("purpose") != purpose:
             return None
         return uuid.UUID(user_id)
-    except JWTError:
+    except (JWTError, ValueError):
         return None
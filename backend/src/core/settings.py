@@ -24,6 +24,13 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str | None = None
     HF_INFERENCE_API_KEY: str | None = None
     HF_MODEL_ID: str | None = None
+    # Optional overrides of the provider's default screenshot preparation.
+    VLM_FRAME_MAX_WIDTH: int | None = None
+    VLM_FRAME_MAX_HEIGHT: int | None = None
+    VLM_FRAME_FORMAT: Literal["jpeg", "webp"] | None = None
+    VLM_FRAME_QUALITY: int | None = None
+    # Normalized (left, top, right, bottom) viewport crop sent to the model.
+    VLM_FRAME_CROP: tuple[float, float, float, float] | None = None
 
     # --- Security & JWT ---
     # Generate a good secret key with: openssl rand -hex 32
@@ -45,6 +52,153 @@ class Settings(BaseSettings):
     REDIS_HOST: str
     REDIS_PORT: int = 6379
 
+    # --- Browser Pool (Worker) ---
+    BROWSER_POOL_SIZE: int = 2
+    BROWSER_MAX_CONTEXTS_PER_BROWSER: int = 20
+    BROWSER_HEADLESS: bool = True
+
+    # --- Worker Concurrency ---
+    # Max agent sessions multiplexed on one worker process's event loop.
+    WORKER_MAX_CONCURRENT_RUNS: int = 8
+    # Must stay below the scout actor's dramatiq time_limit (900s).
+    AGENT_RUN_TIME_LIMIT_SECONDS: int = 840
+
+    # --- Report Design ---
+    # Friction point redesigns generated at once, and the time allowed for each.
+    DESIGN_IMAGE_CONCURRENCY: int = 4
+    DESIGN_IMAGE_TIMEOUT_SECONDS: int = 180
+
+    # --- Run Status Events ---
+    # Seconds of silence before the status stream sends an SSE keepalive comment.
+    RUN_EVENTS_KEEPALIVE_SECONDS: int = 15
+    # Lifetime of the token that opens the stream; it travels in the URL.
+    RUN_EVENTS_TOKEN_EXPIRE_SECONDS: int = 60
+
+    # --- Worker Connection Pools ---
+    # One engine and one Redis pool per worker process, shared by all actors.
+    WORKER_POSTGRES_POOL_SIZE: int = 10
+    WORKER_POSTGRES_MAX_OVERFLOW: int = 5
+    WORKER_REDIS_MAX_CONNECTIONS: int = 64
+
+    # --- Run Admission (per target domain / per user) ---
+    # Max runs executing at once against one domain and for one user (0 = no cap).
+    RUN_MAX_CONCURRENT_PER_DOMAIN: int = 2
+    RUN_MAX_CONCURRENT_PER_USER: int = 5
+    # A run over its caps is woken when a slot frees; as a fallback it is also
+    # retried after a jittered delay that doubles per attempt, up to the max.
+    RUN_ADMISSION_RETRY_DELAY_SECONDS: int = 15
+    RUN_ADMISSION_MAX_RETRY_DELAY_SECONDS: int = 300
+
+    # --- Run Lanes (by plan) ---
+    # Max queued or running runs per user, checked when runs are submitted.
+    RUN_MAX_IN_FLIGHT_PER_USER_FREE: int = 10
+    RUN_MAX_IN_FLIGHT_PER_USER_PAID: int = 100
+
+    # --- Page Settle Detection (Scout) ---
+    SETTLE_MAX_WAIT_MS: int = 5000
+    SETTLE_MIN_WAIT_MS: int = 100
+    SETTLE_NETWORK_QUIET_MS: int = 500
+    SETTLE_DOM_QUIET_MS: int = 300
+
+    # --- Mission History (Scout) ---
+    # Max prompt tokens spent on history; older steps are folded into a summary.
+    AGENT_HISTORY_TOKEN_BUDGET: int = 1500
+    AGENT_HISTORY_VERBATIM_STEPS: int = 4
+
+    # --- Trajectory Monitor (Scout) ---
+    # Default step budget for runs that do not set their own `max_steps`.
+    AGENT_MAX_STEPS: int = 25
+    # Consecutive repeated actions/screens before a step is flagged as stuck.
+    TRAJECTORY_REPEAT_THRESHOLD: int = 3
+    # Flagged steps that only nudge the agent before the run is cut.
+    TRAJECTORY_PATIENCE: int = 2
+
+    # --- Page Snapshots (Scout) ---
+    # "vision": the model sees the frame only. "text": it gets the page snapshot
+    # instead (plus a thumbnail if the provider cannot go text-only).
+    # "text+thumbnail": the snapshot and a small thumbnail.
+    AGENT_OBSERVATION_MODE: Literal["vision", "text", "text+thumbnail"] = "vision"
+    SNAPSHOT_MAX_ELEMENTS: int = 60
+
+    # --- Frame Deduplication (Scout) ---
+    # Max consecutive VLM calls skipped by reusing a `wait` decision.
+    FRAME_DEDUP_MAX_REUSE: int = 2
+
+    # --- Request Routing (Scout) ---
+    ROUTING_ENABLED: bool = True
+    # Blocking applies to third-party requests only; first-party content always loads.
+    ROUTING_BLOCKED_RESOURCE_TYPES: list[str] = ["media", "font"]
+    ROUTING_BLOCKED_DOMAINS: list[str] = [
+        "doubleclick.net",
+        "googlesyndication.com",
+        "googleadservices.com",
+        "google-analytics.com",
+        "googletagmanager.com",
+        "facebook.net",
+        "hotjar.com",
+        "segment.io",
+        "segment.com",
+        "mixpanel.com",
+        "amplitude.com",
+        "fullstory.com",
+        "clarity.ms",
+        "bing.com",
+        "adnxs.com",
+        "criteo.com",
+        "taboola.com",
+        "outbrain.com",
+        "youtube.com",
+        "vimeo.com",
+    ]
+    # When non-empty, third-party requests load only from these domains.
+    ROUTING_ALLOWED_DOMAINS: list[str] = []
+    # Shared on-disk cache of static assets across runs (routing must be enabled).
+    HTTP_CACHE_ENABLED: bool = False
+    HTTP_CACHE_DIR: str = "storage/http_cache"
+    HTTP_CACHE_TTL_SECONDS: int = 3600
+    HTTP_CACHE_MAX_ENTRY_BYTES: int = 5 * 1024 * 1024
+    # Least recently used assets are evicted past this total size (0 = no cap).
+    HTTP_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024
+
+    # --- Live Preview (Scout) ---
+    # Rendition published to live MJPEG viewers; archived frames stay full size.
+    PREVIEW_FRAME_MAX_WIDTH: int = 640
+    PREVIEW_FRAME_MAX_HEIGHT: int = 360
+    PREVIEW_FRAME_QUALITY: int = 50
+
+    # --- Analyst Keyframes ---
+    # Max keyframes per report, chosen for visual diversity weighted by friction.
+    KEYFRAME_BUDGET: int = 5
+    KEYFRAME_FRICTION_WEIGHT: float = 1.0
+    # Slots kept for the highest-friction steps, even on near-identical screens.
+    KEYFRAME_FRICTION_SLOTS: int = 2
+    # Rendition of each keyframe sent to the analyst, and the total image bytes
+    # allowed per request; over budget, keyframes are shrunk further.
+    ANALYST_FRAME_MAX_WIDTH: int = 1280
+    ANALYST_FRAME_MAX_HEIGHT: int = 720
+    ANALYST_FRAME_FORMAT: Literal["jpeg", "webp"] = "webp"
+    ANALYST_FRAME_QUALITY: int = 70
+    ANALYST_IMAGE_BUDGET_BYTES: int = 2 * 1024 * 1024
+
+    # --- Step I/O Pipeline (Scout) ---
+    STEP_IO_QUEUE_SIZE: int = 64
+    STEP_IO_WRITER_THREADS: int = 4
+
+    # --- Run Step Persistence ---
+    RUN_STEP_BATCH_SIZE: int = 3
+    RUN_STEP_FLUSH_INTERVAL_SECONDS: float = 5.0
+
+    # --- Screenshot Store ---
+    SCREENSHOT_STORE_DIR: str = "storage/blobs"
+    # How long an unreferenced screenshot is kept before its file is deleted.
+    SCREENSHOT_BLOB_GRACE_SECONDS: int = 60 * 60
+    # How often a worker sweeps unreferenced and untracked screenshot blobs.
+    SCREENSHOT_BLOB_GC_INTERVAL_SECONDS: int = 60 * 60
+
+    # --- Run Checkpoints & Leases ---
+    RUN_CHECKPOINT_TTL_SECONDS: int = 24 * 60 * 60
+    RUN_LEASE_TTL_SECONDS: int = 60
+
     # --- Stripe ---
     STRIPE_API_KEY: str
     STRIPE_WEBHOOK_SECRET: str
@@ -59,6 +213,17 @@ class Settings(BaseSettings):
     GOOGLE_API_KEY: str | None = None
     GOOGLE_ANALYSIS_MODEL: str = "gemini-2.5-flash-lite"
     GOOGLE_IMAGE_MODEL: str = "gemini-2.5-flash-image-preview"
+    # Max Gemini requests in flight per process, across all runs.
+    GEMINI_MAX_IN_FLIGHT: int = 8
+    # Retries on rate limits and transient errors, with jittered exponential backoff.
+    GEMINI_MAX_RETRIES: int = 5
+    GEMINI_BACKOFF_BASE_SECONDS: float = 1.0
+    GEMINI_BACKOFF_MAX_SECONDS: float = 60.0
+    # On-disk cache of report-generation responses, keyed on model and inputs.
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_DIR: str = "storage/llm_cache"
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    LLM_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
 
 
 @lru_cache
@@ -1,8 +1,15 @@
 # backend/src/db/models/__init__.py
 # flake8: noqa
 from .user import User
-from .agent_run import AgentRun
+from .agent_run import AgentRun, AgentRunStep, ScreenshotBlob
 from .oauth_account import OAuthAccount
 from .report import Report
 
-__all__ = ["User", "AgentRun", "OAuthAccount", "Report"]
+__all__ = [
+    "User",
+    "AgentRun",
+    "AgentRunStep",
+    "ScreenshotBlob",
+    "OAuthAccount",
+    "Report",
+]
@@ -1,6 +1,7 @@
 import uuid
 from typing import Optional, Dict, Any, List, TYPE_CHECKING
 from sqlmodel import Field, SQLModel, Column, Relationship
+from sqlalchemy import UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB
 import datetime as dt
 from pydantic import BaseModel
@@ -11,15 +12,48 @@ if TYPE_CHECKING:
 # --- Pydantic models defining the JSON structure for logs and reports ---
 
 
+class SnapshotElement(BaseModel):
+    """An interactive element (or heading) visible in the viewport."""
+
+    role: str
+    name: str
+    # Normalized viewport coordinates of the element's center, and its size.
+    x: float
+    y: float
+    width: float
+    height: float
+    value: Optional[str] = None
+    checked: Optional[bool] = None
+    disabled: bool = False
+
+
+class PageSnapshot(BaseModel):
+    """A compact, pruned view of the page's accessible structure at one step."""
+
+    url: str
+    title: str
+    elements: List[SnapshotElement]
+
+
 class RunStep(BaseModel):
     """Defines the structure for a single step in the agent's log."""
 
     step: int
     thought: str
     action: str
+    # A screenshot store reference (`blob:<sha256>.jpeg`), or a file path for
+    # runs recorded before the store existed.
     screenshot_path: str
     observation: str
     friction_score: int
+    # Time spent waiting for the page to settle after this step's action.
+    settle_ms: int = 0
+    # Perceptual (difference) hash of the screenshot, as 64 hex characters
+    # (16 for runs recorded before keyframe selection needed a finer one).
+    frame_hash: Optional[str] = None
+    # Set on the last step when the trajectory monitor cut the run short.
+    stop_reason: Optional[str] = None
+    snapshot: Optional[PageSnapshot] = None
 
 
 class FrictionPoint(BaseModel):
@@ -46,11 +80,17 @@ class AgentRunBase(SQLModel):
     target_url: str
     task_prompt: str
     favicon_url: Optional[str] = Field(default=None)
+    # Step budget for this run; None uses the AGENT_MAX_STEPS default.
+    max_steps: Optional[int] = Field(default=None, ge=1, le=50)
+    # Load ads, trackers and other third-party content when they matter to the audit.
+    allow_third_party: bool = Field(default=False)
 
 
 class AgentRun(AgentRunBase, table=True):  # type: ignore[call-arg]
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
     status: str = Field(default="PENDING", index=True)
+    # Legacy blob for runs recorded before the `run_step` table; new runs
+    # append to `AgentRunStep` instead (see services/run_log.py).
     run_log: Optional[List[Dict[str, Any]]] = Field(
         default=None, sa_column=Column(JSONB)
     )
@@ -65,10 +105,40 @@ class AgentRun(AgentRunBase, table=True):  # type: ignore[call-arg]
     owner: "User" = Relationship(back_populates="runs")
 
 
+class AgentRunStep(SQLModel, table=True):  # type: ignore[call-arg]
+    """A single scout step, appended as it happens. The run log is a projection over these rows."""
+
+    __tablename__ = "run_step"
+    __table_args__ = (UniqueConstraint("run_id", "step"),)
+
+    id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+    run_id: uuid.UUID = Field(foreign_key="agentrun.id", ondelete="CASCADE", index=True)
+    step: int
+    friction_score: int = Field(default=0)
+    # The full `RunStep` payload, so new step fields need no migration.
+    data: Dict[str, Any] = Field(sa_column=Column(JSONB, nullable=False))
+    created_at: dt.datetime = Field(default_factory=dt.datetime.utcnow)
+
+
+class ScreenshotBlob(SQLModel, table=True):  # type: ignore[call-arg]
+    """Reference count of a content-addressed screenshot (see services/screenshot_store.py)."""
+
+    __tablename__ = "screenshot_blob"
+
+    ref: str = Field(primary_key=True)
+    # Number of `run_step` rows pointing at this blob.
+    ref_count: int = Field(default=0)
+    updated_at: dt.datetime = Field(default_factory=dt.datetime.utcnow)
+
+
 class AgentRunCreate(AgentRunBase):
     pass
 
 
+class AgentRunBatchCreate(SQLModel):
+    runs: List[AgentRunCreate] = Field(min_length=1, max_length=500)
+
+
 class AgentRunRead(AgentRunBase):
     id: uuid.UUID
     status: str
@@ -21,6 +21,8 @@ class User(UserBase, table=True):  # type: ignore[call-arg]
     hashed_password: Optional[str] = Field(default=None)
     created_at: dt.datetime = Field(default_factory=dt.datetime.utcnow)
     run_count: int = Field(default=0, nullable=False)
+    # Operators; only settable in the database, never through the API.
+    is_superuser: bool = Field(default=False)
 
     # --- START STRIPE FIELDS ---
     stripe_customer_id: Optional[str] = Field(default=None, unique=True, index=True)
@@ -14,7 +14,7 @@ settings = get_settings()
 
 
 class PostgresDatabase:
-    def __init__(self):
+    def __init__(self, pool_size: int | None = None, max_overflow: int | None = None):
         self.DATABASE_URL = str(settings.DATABASE_URL)
         if not self.DATABASE_URL:
             raise ValueError("POSTGRES_DATABASE_URL environment variable is not set.")
@@ -61,8 +61,10 @@ class PostgresDatabase:
                 "DEV MODE: Disabling prepared statement cache to prevent schema change errors."
             )
 
-        self.pool_size = settings.POSTGRES_POOL_SIZE
-        self.max_overflow = settings.POSTGRES_MAX_OVERFLOW
+        self.pool_size = pool_size or settings.POSTGRES_POOL_SIZE
+        self.max_overflow = (
+            settings.POSTGRES_MAX_OVERFLOW if max_overflow is None else max_overflow
+        )
         self.pool_timeout = settings.POSTGRES_POOL_TIMEOUT
         self.pool_recycle = settings.POSTGRES_POOL_RECYCLE
         self.max_retries = 5
@@ -1,9 +1,10 @@
 # backend/src/services/agent_runner.py
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import select
+from sqlmodel import col, func, select
 import uuid  # Import uuid
 
-from backend.worker.tasks import run_churninator_agent
+from backend.worker.lanes import lane_for, max_in_flight_runs
+from backend.worker.tasks import enqueue_scouts
 from backend.src.db.models.agent_run import AgentRun, AgentRunCreate
 from backend.src.db.models.user import User
 from backend.src.utils.favicon import (
@@ -11,6 +12,12 @@ from backend.src.utils.favicon import (
     get_favicon_url,
 )
 
+IN_FLIGHT_STATUSES = ("PENDING", "RUNNING")
+
+
+class RunQuotaExceeded(Exception):
+    """Raised when queuing runs would exceed the user's in-flight run cap."""
+
 
 async def queue_agent_run(
     db: AsyncSession,
@@ -21,27 +28,68 @@ async def queue_agent_run(
     Creates an AgentRun record, generates its favicon_url, increments the
     user's run_count, and queues the background task.
     """
-    domain = get_domain_from_url(run_in.target_url)
-    favicon_url = get_favicon_url(domain)
+    [db_run] = await queue_agent_runs(db=db, runs_in=[run_in], owner_id=owner_id)
+    return db_run
+
 
-    user_result = await db.execute(select(User).where(User.id == owner_id))
+async def queue_agent_runs(
+    db: AsyncSession,
+    runs_in: list[AgentRunCreate],
+    owner_id: uuid.UUID,
+) -> list[AgentRun]:
+    """
+    Creates many AgentRun records and bumps the user's run_count in a single
+    transaction, then queues one background task per run on the lane for the
+    user's plan, all in one broker round trip. How many of them execute at once is capped per domain and per
+    user by the worker.
+    """
+    # Lock the owner's row until commit so concurrent submissions by the same
+    # user count in-flight runs one at a time, and reload it so run_count is
+    # current once the lock is held.
+    user_result = await db.execute(
+        select(User)
+        .where(User.id == owner_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
     user: User = user_result.scalar_one_or_none()
     if not user:
         raise ValueError("User not found")
 
-    user.run_count += 1
-    db.add(user)
+    lane = lane_for(user)
+    in_flight_result = await db.execute(
+        select(func.count())
+        .select_from(AgentRun)
+        .where(AgentRun.owner_id == owner_id)
+        .where(col(AgentRun.status).in_(IN_FLIGHT_STATUSES))
+    )
+    in_flight = in_flight_result.scalar_one()
+    limit = max_in_flight_runs(lane)
+    if in_flight + len(runs_in) > limit:
+        raise RunQuotaExceeded(
+            f"{in_flight} runs already queued or running; the limit is {limit}."
+        )
 
-    db_run_data = run_in.model_dump()
-    db_run_data["owner_id"] = owner_id
-    db_run_data["favicon_url"] = favicon_url
+    user.run_count += len(runs_in)
+    db.add(user)
 
-    db_run = AgentRun.model_validate(db_run_data)
+    db_runs = []
+    for run_in in runs_in:
+        db_run_data = run_in.model_dump()
+        db_run_data["owner_id"] = owner_id
+        db_run_data["favicon_url"] = get_favicon_url(
+            get_domain_from_url(run_in.target_url)
+        )
+        db_runs.append(AgentRun.model_validate(db_run_data))
 
-    db.add(db_run)
+    # Every column has a client-side default, so no per-row refresh is needed.
+    db.add_all(db_runs)
     await db.commit()
-    await db.refresh(db_run)
 
-    run_churninator_agent.send(str(db_run.id), db_run.target_url, db_run.task_prompt)
+    enqueue_scouts(
+        [(str(r.id), r.target_url, r.task_prompt) for r in db_runs],
+        owner_id=str(owner_id),
+        lane=lane,
+    )
 
-    return db_run
+    return db_runs
@@ -0,0 +1,36 @@
+# backend/src/services/run_events.py
+import uuid
+from typing import Any, Union
+
+import redis.asyncio as redis
+from pydantic import BaseModel
+
+
+class RunStatusEvent(BaseModel):
+    """A run's status transition, as pushed to its owner's event stream."""
+
+    run_id: str
+    status: str
+
+
+def run_events_channel(owner_id: Union[str, uuid.UUID]) -> str:
+    return f"run_status:{owner_id}"
+
+
+async def publish_run_status(
+    redis_client: redis.Redis,
+    owner_id: Any,
+    run_id: Any,
+    status: str,
+):
+    """
+    Publishes a status transition to the owner's channel. Best effort: the
+    database stays the source of truth, and clients resync on reconnect.
+    """
+    event = RunStatusEvent(run_id=str(run_id), status=status)
+    try:
+        await redis_client.publish(
+            run_events_channel(owner_id), event.model_dump_json()
+        )
+    except redis.RedisError as e:
+        print(f"⚠️ [EVENTS] Could not publish {status} for run {run_id}: {e}")
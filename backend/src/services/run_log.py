@@ -0,0 +1,111 @@
+# backend/src/services/run_log.py
+import asyncio
+import datetime as dt
+import uuid
+from typing import Any, Iterable, Optional
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.src.db.models.agent_run import AgentRun, AgentRunStep, RunStep
+from backend.src.db.postgresql import PostgresDatabase
+from backend.src.services.screenshot_store import add_blob_refs
+
+
+class RunStepWriter:
+    """
+    Appends a run's steps to the `run_step` table as they happen.
+
+    Steps are buffered and written with a single multi-row INSERT once
+    `batch_size` steps are pending or `flush_interval_seconds` have passed since
+    the oldest pending step. Inserts are idempotent on (run_id, step), so a
+    retried flush never duplicates rows, and only newly inserted rows add a
+    reference to their screenshot blob, in the same transaction.
+    """
+
+    def __init__(
+        self,
+        db: PostgresDatabase,
+        run_id: str,
+        batch_size: int = 3,
+        flush_interval_seconds: float = 5.0,
+    ):
+        self.db = db
+        self.run_id = run_id
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self._pending: list[RunStep] = []
+        self._oldest_pending_at: Optional[float] = None
+
+    def add(self, step: RunStep) -> bool:
+        """Buffers a step. Returns True when a flush is due."""
+        now = asyncio.get_running_loop().time()
+        if not self._pending:
+            self._oldest_pending_at = now
+        self._pending.append(step)
+        assert self._oldest_pending_at is not None
+        return (
+            len(self._pending) >= self.batch_size
+            or now - self._oldest_pending_at >= self.flush_interval_seconds
+        )
+
+    async def flush(self):
+        """Writes all pending steps in one INSERT. Failed steps stay pending."""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        rows: list[dict[str, Any]] = [
+            {
+                "id": uuid.uuid4(),
+                "run_id": self.run_id,
+                "step": step.step,
+                "friction_score": step.friction_score,
+                "data": step.model_dump(),
+                "created_at": dt.datetime.utcnow(),
+            }
+            for step in batch
+        ]
+        try:
+            async with self.db.get_session() as session:
+                result = await session.execute(
+                    insert(AgentRunStep)
+                    .values(rows)
+                    .on_conflict_do_nothing(index_elements=["run_id", "step"])
+                    .returning(AgentRunStep.step)  # type: ignore[arg-type]
+                )
+                inserted = set(result.scalars().all())
+                await add_blob_refs(
+                    session, [s.screenshot_path for s in batch if s.step in inserted]
+                )
+        except Exception:
+            self._pending = batch + self._pending
+            raise
+
+
+async def load_run_log(
+    session: AsyncSession, run_id: Any, steps: Optional[Iterable[int]] = None
+) -> list[RunStep]:
+    """
+    Returns a run's steps in order, optionally only the given step numbers.
+
+    Reads from the `run_step` table, falling back to the legacy
+    `AgentRun.run_log` blob for runs recorded before it existed.
+    """
+    query = select(AgentRunStep.data).where(AgentRunStep.run_id == run_id)
+    if steps is not None:
+        query = query.where(AgentRunStep.step.in_(list(steps)))  # type: ignore[attr-defined]
+    result = await session.execute(query.order_by(AgentRunStep.step))
+    log = [RunStep.model_validate(data) for data in result.scalars().all()]
+    if log:
+        return log
+
+    run = await session.get(AgentRun, run_id)
+    if not run or not run.run_log:
+        return []
+    wanted = set(steps) if steps is not None else None
+    return [
+        RunStep.model_validate(s)
+        for s in run.run_log
+        if wanted is None or s["step"] in wanted
+    ]
@@ -0,0 +1,181 @@
+# backend/src/services/screenshot_store.py
+import asyncio
+import datetime as dt
+import hashlib
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterable
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import col, delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.src.core.settings import get_settings
+from backend.src.db.models.agent_run import AgentRunStep, ScreenshotBlob
+
+settings = get_settings()
+
+BLOB_REF_PREFIX = "blob:"
+
+
+def is_blob_ref(path_or_ref: str) -> bool:
+    return path_or_ref.startswith(BLOB_REF_PREFIX)
+
+
+class ScreenshotStore:
+    """
+    A content-addressed store for run screenshots.
+
+    Each screenshot is stored once under the SHA-256 of its bytes, so identical
+    frames (within a run, or across runs of the same page) share one file and
+    a repeated frame costs no write at all. Steps record the blob reference,
+    not a file path. Reference counts live in the `screenshot_blob` table.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    @staticmethod
+    def ref_for(data: bytes, extension: str = "jpeg") -> str:
+        return f"{BLOB_REF_PREFIX}{hashlib.sha256(data).hexdigest()}.{extension}"
+
+    def path_for(self, ref: str) -> Path:
+        name = ref.removeprefix(BLOB_REF_PREFIX)
+        return self.root / name[:2] / name
+
+    def write(self, ref: str, data: bytes) -> bool:
+        """
+        Stores the blob unless it already exists. Returns True if written.
+        An existing blob is touched, so it counts as fresh for `stale_refs`.
+        """
+        path = self.path_for(ref)
+        if path.exists():
+            try:
+                path.touch()
+                return False
+            except FileNotFoundError:
+                pass  # Swept meanwhile: write it again.
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+        return True
+
+    def delete(self, refs: Iterable[str]):
+        """Deletes the blobs and any renditions prepared from them (`<sha>.*`)."""
+        for ref in refs:
+            path = self.path_for(ref)
+            path.unlink(missing_ok=True)
+            for derived in path.parent.glob(f"{path.stem}.*"):
+                derived.unlink(missing_ok=True)
+
+    def stale_refs(self, cutoff: float) -> list[str]:
+        """
+        Refs of the blobs last written before `cutoff` (a Unix timestamp).
+        Temporary files left by writes that died before `cutoff` are deleted.
+        """
+        refs = []
+        for path in self.root.glob("*/*"):
+            try:
+                if path.stat().st_mtime >= cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            if path.suffix == ".tmp":
+                path.unlink(missing_ok=True)
+            elif path.name.count(".") == 1:  # Not a `<sha>.<spec>.<ext>` rendition.
+                refs.append(f"{BLOB_REF_PREFIX}{path.name}")
+        return refs
+
+
+screenshot_store = ScreenshotStore(Path(settings.SCREENSHOT_STORE_DIR))
+
+
+def resolve_screenshot(path_or_ref: str) -> Path:
+    """File path of a step's screenshot, whether stored as a blob or a legacy path."""
+    if is_blob_ref(path_or_ref):
+        return screenshot_store.path_for(path_or_ref)
+    return Path(path_or_ref)
+
+
+async def add_blob_refs(session: AsyncSession, refs: Iterable[str]):
+    """Counts one new reference per occurrence of each blob ref."""
+    counts = Counter(ref for ref in refs if is_blob_ref(ref))
+    if not counts:
+        return
+    now = dt.datetime.utcnow()
+    rows: list[dict[str, Any]] = [
+        {"ref": ref, "ref_count": n, "updated_at": now} for ref, n in counts.items()
+    ]
+    statement = insert(ScreenshotBlob).values(rows)
+    await session.execute(
+        statement.on_conflict_do_update(
+            index_elements=["ref"],
+            set_={
+                "ref_count": ScreenshotBlob.ref_count + statement.excluded.ref_count,
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+    )
+
+
+async def release_run_blobs(session: AsyncSession, run_id: Any):
+    """Drops the references held by a run's steps. Call before deleting the run."""
+    screenshot = AgentRunStep.data["screenshot_path"].astext.label("ref")  # type: ignore[index]
+    result = await session.execute(
+        select(screenshot, func.count())
+        .where(AgentRunStep.run_id == run_id)
+        .group_by(screenshot.name)
+    )
+    now = dt.datetime.utcnow()
+    for ref, n in result.all():
+        if ref and is_blob_ref(ref):
+            await session.execute(
+                update(ScreenshotBlob)
+                .where(col(ScreenshotBlob.ref) == ref)
+                .values(ref_count=ScreenshotBlob.ref_count - n, updated_at=now)
+            )
+
+
+async def sweep_orphan_blobs(session: AsyncSession, grace_seconds: int) -> list[str]:
+    """
+    Forgets blobs that have had no references for `grace_seconds` and returns
+    their refs, so the caller can delete the files once the session commits.
+    The grace period covers a run that has already written a blob but not
+    yet flushed the step that references it.
+    """
+    cutoff = dt.datetime.utcnow() - dt.timedelta(seconds=grace_seconds)
+    result = await session.execute(
+        delete(ScreenshotBlob)
+        .where(col(ScreenshotBlob.ref_count) <= 0)
+        .where(col(ScreenshotBlob.updated_at) < cutoff)
+        .returning(col(ScreenshotBlob.ref))
+    )
+    return list(result.scalars().all())
+
+
+async def collect_orphan_blobs(session: AsyncSession, grace_seconds: int) -> int:
+    """
+    Deletes the blobs nothing points at any more: those swept by
+    `sweep_orphan_blobs`, and files older than `grace_seconds` that never got
+    a `screenshot_blob` row (e.g. the worker died between writing the file and
+    flushing its step). Commits the session. Returns how many were deleted.
+    """
+    orphaned = await sweep_orphan_blobs(session, grace_seconds)
+    await session.commit()
+    cutoff = time.time() - grace_seconds
+    candidates = await asyncio.to_thread(screenshot_store.stale_refs, cutoff)
+    tracked: set[str] = set()
+    for i in range(0, len(candidates), 1000):
+        result = await session.execute(
+            select(ScreenshotBlob.ref).where(
+                col(ScreenshotBlob.ref).in_(candidates[i : i + 1000])
+            )
+        )
+        tracked.update(result.scalars().all())
+    untracked = [ref for ref in candidates if ref not in tracked]
+    await asyncio.to_thread(screenshot_store.delete, orphaned + untracked)
+    return len(orphaned) + len(untracked)
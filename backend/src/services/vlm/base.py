@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from pydantic import BaseModel
-from typing import Optional
+from typing import Literal, Optional
 
 
 # This model remains the clean, final output we always want
@@ -11,6 +11,34 @@ class VLMResponse(BaseModel):
     friction_score: Optional[int] = None
 
 
+class FrameSpec(BaseModel):
+    """How a screenshot is prepared before it is sent to a provider."""
+
+    max_width: int = 1920
+    max_height: int = 1080
+    format: Literal["jpeg", "webp"] = "jpeg"
+    quality: int = 70
+    # Optional normalized (left, top, right, bottom) crop of the viewport.
+    crop: Optional[tuple[float, float, float, float]] = None
+
+    @property
+    def mime_type(self) -> str:
+        return f"image/{self.format}"
+
+
+def image_mime_type(data: bytes) -> str:
+    """
+    The MIME type of encoded image bytes, read from their signature. A
+    prepared frame can still be the original screenshot (see
+    frames.prepare_model_frame), so its spec's format is not proof.
+    """
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    return "image/jpeg"
+
+
 class VLMResponseParser(ABC):
     """Abstract Base Class for response parsers."""
 
@@ -23,9 +51,25 @@ class VLMResponseParser(ABC):
 class VLMProvider(ABC):
     """Abstract Base Class for VLM providers."""
 
+    # Providers override this with the resolution and encoding they work best with.
+    frame_spec = FrameSpec()
+    # Used in text-first mode, where the page snapshot carries most of the state.
+    thumbnail_spec = FrameSpec(max_width=512, max_height=288, quality=60)
+    # Whether `get_next_action` accepts a prompt with no image at all.
+    supports_text_only = False
+
     def __init__(self, parser: VLMResponseParser):
         self.parser = parser
 
     @abstractmethod
-    async def get_next_action(self, image_base64: str, prompt: str) -> VLMResponse:
+    async def get_next_action(
+        self, image_base64: Optional[str], prompt: str
+    ) -> VLMResponse:
         pass
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Approximate prompt token count, used to budget the mission history.
+        Providers with access to their real tokenizer should override this.
+        """
+        return len(text) // 4 + 1
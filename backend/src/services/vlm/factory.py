@@ -8,6 +8,22 @@ from .parsers import Stage2Parser, HuggingFaceGenericParser
 from .base import VLMResponseParser
 
 
+def apply_frame_overrides(provider: VLMProvider) -> VLMProvider:
+    """Applies any VLM_FRAME_* settings on top of the provider's default frame spec."""
+    settings = get_settings()
+    overrides = {
+        "max_width": settings.VLM_FRAME_MAX_WIDTH,
+        "max_height": settings.VLM_FRAME_MAX_HEIGHT,
+        "format": settings.VLM_FRAME_FORMAT,
+        "quality": settings.VLM_FRAME_QUALITY,
+        "crop": settings.VLM_FRAME_CROP,
+    }
+    overrides = {k: v for k, v in overrides.items() if v is not None}
+    if overrides:
+        provider.frame_spec = provider.frame_spec.model_copy(update=overrides)
+    return provider
+
+
 def get_vlm_provider() -> VLMProvider:
     """
     Factory that reads settings and returns an instance of the configured
@@ -39,4 +55,4 @@ def get_vlm_provider() -> VLMProvider:
 
 
 # The singleton instance remains the same
-vlm_provider = get_vlm_provider()
+vlm_provider = apply_frame_overrides(get_vlm_provider())
@@ -1,8 +1,15 @@
+import asyncio
+import json
+import random
+from io import BytesIO
+
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 from PIL import Image
 from backend.src.core.settings import get_settings
 from backend.src.db.models.agent_run import FinalReport
-from typing import List
+from backend.src.services.vlm.response_cache import ResponseCache
+from typing import Any, Callable, List, Optional
 from pathlib import Path
 
 settings = get_settings()
@@ -21,25 +28,140 @@ def load_prompt(filename: str) -> str:
 REPORT_ANALYST_PROMPT = load_prompt("report_analyst_prompt.txt")
 MARKDOWN_DESIGNER_PROMPT = load_prompt("markdown_designer_prompt.txt")
 
+# Rate limits and server-side hiccups; anything else fails the call at once.
+RETRYABLE_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.InternalServerError,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2^attempt)]."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def parse_report_json(text: str) -> dict[str, Any]:
+    """Parses the analyst's JSON answer, tolerating a Markdown code fence."""
+    return json.loads(text.strip().replace("```json", "").replace("```", ""))
+
+
+def extract_image_bytes(response: Any) -> bytes:
+    for part in response.candidates[0].content.parts:
+        if part.inline_data is not None:
+            return part.inline_data.data
+    raise ValueError("Image generation failed to return an image.")
+
 
 class GeminiVLMProvider:
-    def __init__(self):
+    """
+    Async Gemini client for report generation. Requests never block the event
+    loop, at most `max_in_flight` run at once in this process, and rate-limited
+    or transiently failing requests are retried with jittered backoff.
+    Successful responses are kept in the optional `ResponseCache`.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = settings.GEMINI_MAX_IN_FLIGHT,
+        max_retries: int = settings.GEMINI_MAX_RETRIES,
+    ):
         api_key = settings.GOOGLE_API_KEY
         if not api_key:
             raise ValueError("GOOGLE_API_KEY must be configured.")
         genai.configure(api_key=api_key)
         self.analysis_model = genai.GenerativeModel(settings.GOOGLE_ANALYSIS_MODEL)
         self.image_model = genai.GenerativeModel(settings.GOOGLE_IMAGE_MODEL)
+        self.max_retries = max_retries
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self.cache: Optional[ResponseCache] = (
+            ResponseCache(
+                Path(settings.LLM_CACHE_DIR),
+                ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+                max_bytes=settings.LLM_CACHE_MAX_BYTES,
+            )
+            if settings.LLM_CACHE_ENABLED
+            else None
+        )
 
-    def generate_report_from_run(self, images: list[Image.Image], log_text: str) -> str:
+    async def _generate(self, model: genai.GenerativeModel, contents: list[Any]):
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._in_flight:
+                    return await model.generate_content_async(contents)
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = backoff_delay(
+                    attempt,
+                    settings.GEMINI_BACKOFF_BASE_SECONDS,
+                    settings.GEMINI_BACKOFF_MAX_SECONDS,
+                )
+                print(
+                    f"⚠️ [GEMINI] {type(e).__name__} from {model.model_name}; "
+                    f"retry {attempt + 1}/{self.max_retries} in {delay:.1f}s"
+                )
+                # Sleep outside the limiter so waiting retries free their slot.
+                await asyncio.sleep(delay)
+
+    async def _generate_cached(
+        self,
+        model: genai.GenerativeModel,
+        contents: list[Any],
+        extract: Callable[[Any], bytes],
+        validate: Optional[Callable[[bytes], Any]] = None,
+    ) -> bytes:
+        """
+        `_generate` behind the response cache; `extract` picks the bytes to
+        keep. A response is only cached once `validate` (if given) accepts it,
+        so an unusable answer raises instead of being replayed; a cached entry
+        it rejects is dropped and regenerated.
+        """
+        if self.cache is None:
+            data = extract(await self._generate(model, contents))
+            if validate:
+                validate(data)
+            return data
+        # Hashing image pixels and disk I/O stay off the loop.
+        key = await asyncio.to_thread(self.cache.key_for, model.model_name, contents)
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            try:
+                if validate:
+                    validate(cached)
+                print(f"♻️ [GEMINI] Reusing cached {model.model_name} response.")
+                return cached
+            except Exception as e:
+                print(f"⚠️ [GEMINI] Dropping unusable cached response: {e}")
+                await asyncio.to_thread(self.cache.discard, key)
+        data = extract(await self._generate(model, contents))
+        if validate:
+            validate(data)
+        try:
+            await asyncio.to_thread(self.cache.put, key, data)
+        except OSError as e:
+            print(f"⚠️ [GEMINI] Could not cache response: {e}")
+        return data
+
+    async def generate_report_from_run(
+        self, images: list[Image.Image | dict[str, Any]], log_text: str
+    ) -> str:
+        """`images` are PIL images or prepared `{"mime_type", "data"}` blobs."""
         # Prepare the content for the multimodal prompt
-        prompt_parts = [REPORT_ANALYST_PROMPT, log_text]
+        prompt_parts: list[Any] = [REPORT_ANALYST_PROMPT, log_text]
         prompt_parts.extend(images)
 
-        response = self.analysis_model.generate_content(prompt_parts)
-        return response.text
+        text = await self._generate_cached(
+            self.analysis_model,
+            prompt_parts,
+            lambda r: r.text.encode(),
+            validate=lambda data: parse_report_json(data.decode()),
+        )
+        return text.decode()
 
-    def generate_improved_design(
+    async def generate_improved_design(
         self, original_image: Image.Image, recommendation: str
     ) -> Image.Image:
         print(f"🎨 Generating improved design based on: '{recommendation}'")
@@ -49,15 +171,12 @@ class GeminiVLMProvider:
             "The new image should look like a realistic, improved version of the original screenshot. "
             "Keep the overall branding and style consistent, but apply the specific change. Only output the new image."
         )
-        response = self.image_model.generate_content([prompt, original_image])
-        for part in response.candidates[0].content.parts:
-            if part.inline_data is not None:
-                from io import BytesIO
-
-                return Image.open(BytesIO(part.inline_data.data))
-        raise ValueError("Image generation failed to return an image.")
+        image_bytes = await self._generate_cached(
+            self.image_model, [prompt, original_image], extract_image_bytes
+        )
+        return Image.open(BytesIO(image_bytes))
 
-    def author_markdown_report(
+    async def author_markdown_report(
         self,
         analysis: FinalReport,
         target_url: str,
@@ -87,12 +206,14 @@ class GeminiVLMProvider:
             "Please now write the complete Markdown document."
         )
 
-        response = self.analysis_model.generate_content(
-            [MARKDOWN_DESIGNER_PROMPT, prompt]
+        text = await self._generate_cached(
+            self.analysis_model,
+            [MARKDOWN_DESIGNER_PROMPT, prompt],
+            lambda r: r.text.encode(),
         )
 
         # Clean the response to get only the Markdown code
-        markdown_code = response.text.strip()
+        markdown_code = text.decode().strip()
         if markdown_code.startswith("```markdown"):
             markdown_code = markdown_code[10:]
         if markdown_code.startswith("```"):
@@ -1,5 +1,7 @@
+from typing import Optional
+
 import httpx
-from .base import VLMProvider, VLMResponse, VLMResponseParser
+from .base import FrameSpec, VLMProvider, VLMResponse, VLMResponseParser
 from backend.src.core.settings import get_settings
 
 
@@ -9,6 +11,9 @@ class HuggingFaceVLMProvider(VLMProvider):
     vision-language model hosted on the Hub.
     """
 
+    # Hub VLMs typically work at ~1024px; larger payloads only slow the upload.
+    frame_spec = FrameSpec(max_width=1024, max_height=576, quality=75)
+
     def __init__(self, parser: VLMResponseParser):
         super().__init__(parser)
         self.settings = get_settings()
@@ -27,7 +32,9 @@ class HuggingFaceVLMProvider(VLMProvider):
         )
         self.headers = {"Authorization": f"Bearer {self.settings.HF_INFERENCE_API_KEY}"}
 
-    async def get_next_action(self, image_base64: str, prompt: str) -> VLMResponse:
+    async def get_next_action(
+        self, image_base64: Optional[str], prompt: str
+    ) -> VLMResponse:
         """
         Sends a request to the Hugging Face Inference API and uses its
         injected parser to interpret the response.
@@ -1,6 +1,8 @@
 # backend/src/services/vlm/local_provider.py
+from typing import Optional
+
 import httpx
-from .base import VLMProvider, VLMResponse, VLMResponseParser
+from .base import FrameSpec, VLMProvider, VLMResponse, VLMResponseParser
 from backend.src.core.settings import get_settings
 
 
@@ -11,11 +13,17 @@ class LocalVLMProvider(VLMProvider):
     to handle the model's specific output format.
     """
 
+    # The SmolVLM processor resizes to a 1536px longest edge; anything larger
+    # is wasted upload and decode time.
+    frame_spec = FrameSpec(max_width=1536, max_height=864, quality=80)
+
     def __init__(self, parser: VLMResponseParser):
         super().__init__(parser)
         self.settings = get_settings()
 
-    async def get_next_action(self, image_base64: str, prompt: str) -> VLMResponse:
+    async def get_next_action(
+        self, image_base64: Optional[str], prompt: str
+    ) -> VLMResponse:
         """
         Sends the current state to the local inference server and uses its
         injected parser to interpret the response.
@@ -1,8 +1,22 @@
 # backend/src/services/vlm/openai_provider.py
+import base64
+from typing import Any, Optional
+
 from openai import AsyncOpenAI, OpenAIError
-from .base import VLMProvider, VLMResponse, VLMResponseParser
+from .base import (
+    FrameSpec,
+    VLMProvider,
+    VLMResponse,
+    VLMResponseParser,
+    image_mime_type,
+)
 from backend.src.core.settings import get_settings
 
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to the base class heuristic.
+    tiktoken = None  # type: ignore[assignment]
+
 
 class OpenAIVLMProvider(VLMProvider):
     """
@@ -10,6 +24,12 @@ class OpenAIVLMProvider(VLMProvider):
     It is initialized with a parser to handle the model's output format.
     """
 
+    # "high" detail scales images to a 768px short side before tiling, so a
+    # 1366x768 frame costs the same vision tokens as 1920x1080 at half the bytes.
+    frame_spec = FrameSpec(max_width=1366, max_height=768, format="webp", quality=75)
+    thumbnail_spec = FrameSpec(max_width=512, max_height=288, format="webp", quality=60)
+    supports_text_only = True
+
     def __init__(self, parser: VLMResponseParser):
         super().__init__(parser)
         self.settings = get_settings()
@@ -18,13 +38,42 @@ class OpenAIVLMProvider(VLMProvider):
                 "OPENAI_API_KEY must be set in settings to use the OpenAIVLMProvider."
             )
         self.client = AsyncOpenAI(api_key=self.settings.OPENAI_API_KEY)
+        self._encoding = None
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.encoding_for_model("gpt-4o")
+            except Exception:
+                # The encoding file could not be loaded (e.g. offline).
+                self._encoding = None
+
+    def count_tokens(self, text: str) -> int:
+        """Exact GPT-4o token count when tiktoken is available."""
+        if self._encoding is None:
+            return super().count_tokens(text)
+        return len(self._encoding.encode(text))
 
-    async def get_next_action(self, image_base64: str, prompt: str) -> VLMResponse:
+    async def get_next_action(
+        self, image_base64: Optional[str], prompt: str
+    ) -> VLMResponse:
         """
         Sends the current state to the OpenAI API and uses its
         injected parser to interpret the response.
         """
         try:
+            content: list[dict[str, Any]] = [{"type": "text", "text": prompt}]
+            if image_base64 is not None:
+                # Declare what the bytes are, whichever spec produced them.
+                mime_type = image_mime_type(base64.b64decode(image_base64[:16]))
+                content.append(
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:{mime_type};base64,{image_base64}",
+                            "detail": "high",  # Use high detail for accurate GUI analysis
+                        },
+                    }
+                )
+
             # This system prompt is crucial for forcing GPT-4o into the desired output format.
             system_prompt = "You are a helpful GUI agent. First, think step-by-step about your plan inside <think> tags. Then, provide the single pyautogui-style action to perform inside <code> tags."
 
@@ -32,19 +81,7 @@ class OpenAIVLMProvider(VLMProvider):
                 model="gpt-4o",
                 messages=[
                     {"role": "system", "content": system_prompt},
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{image_base64}",
-                                    "detail": "high",  # Use high detail for accurate GUI analysis
-                                },
-                            },
-                        ],
-                    },
+                    {"role": "user", "content": content},  # type: ignore[misc,list-item]
                 ],
                 max_tokens=300,
                 temperature=0.0,  # Set to 0 for deterministic, repeatable actions
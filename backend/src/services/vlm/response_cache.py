@@ -0,0 +1,93 @@
+# backend/src/services/vlm/response_cache.py
+import hashlib
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from PIL import Image
+
+
+def content_digest(part: Any) -> bytes:
+    """A stable digest of one prompt part: text as-is, images by their content."""
+    if isinstance(part, dict) and isinstance(part.get("data"), bytes):
+        digest = hashlib.sha256(str(part.get("mime_type")).encode())
+        digest.update(part["data"])
+        return digest.digest()
+    if isinstance(part, Image.Image):
+        digest = hashlib.sha256(f"{part.mode}:{part.size}".encode())
+        digest.update(part.tobytes())
+        return digest.digest()
+    return hashlib.sha256(str(part).encode()).digest()
+
+
+class ResponseCache:
+    """
+    A content-addressed on-disk cache of LLM responses.
+
+    Entries are keyed on the model name and every prompt part (images by
+    pixel hash), so a retried or regenerated report with identical inputs
+    reuses the earlier answer. Entries expire `ttl_seconds` after their last
+    use, and the least recently used ones are evicted once the cache grows
+    past `max_bytes`.
+    """
+
+    def __init__(self, root: Path, ttl_seconds: int, max_bytes: int):
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key_for(model_name: str, contents: Iterable[Any]) -> str:
+        digest = hashlib.sha256(model_name.encode())
+        for part in contents:
+            digest.update(content_digest(part))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.bin"
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                return None
+            data = path.read_bytes()
+            # Touch on read: mtime doubles as the last-use time for eviction.
+            os.utime(path)
+            return data
+        except OSError:
+            return None
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+        self.evict()
+
+    def discard(self, key: str):
+        self._path(key).unlink(missing_ok=True)
+
+    def evict(self):
+        """Drops expired entries, then the least recently used over `max_bytes`."""
+        now = time.time()
+        entries = []
+        for path in self.root.glob("*.bin"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
@@ -27,6 +27,28 @@ async def test_create_agent_run_authenticated(
     assert mock_broker.get_queue("default").qsize() == 1
 
 
+async def test_create_agent_runs_batch(
+    test_client: AsyncClient, test_user: User, mock_broker: StubBroker
+):
+    """Test submitting several runs in a single request."""
+    runs = [
+        {"target_url": f"https://site-{i}.com", "task_prompt": "Audit the landing page"}
+        for i in range(3)
+    ]
+    response = await test_client.post("/api/v1/agent/runs/batch", json={"runs": runs})
+
+    assert response.status_code == 202
+    data = response.json()
+    assert [run["target_url"] for run in data] == [r["target_url"] for r in runs]
+    assert all(run["owner_id"] == str(test_user.id) for run in data)
+    assert mock_broker.get_queue("default").qsize() == 3
+
+
+async def test_create_agent_runs_batch_rejects_empty(test_client: AsyncClient):
+    response = await test_client.post("/api/v1/agent/runs/batch", json={"runs": []})
+    assert response.status_code == 422
+
+
 async def test_get_agent_runs_for_user(
     test_client: AsyncClient, db_session: AsyncSession, test_user: User
 ):
@@ -75,3 +97,21 @@ async def test_get_specific_agent_run_unauthorized(
     # The authenticated test_user tries to fetch other_run
     response = await test_client.get(f"/api/v1/agent/runs/{other_run.id}")
     assert response.status_code == 404  # Should be treated as "not found"
+
+
+async def test_queue_wait_times_are_operator_only(
+    test_client: AsyncClient, test_user: User, mocker
+):
+    """Wait times span every tenant's runs, so customers cannot read them."""
+    mocker.patch(
+        "backend.src.api.v1.endpoints.agent.get_queue_wait_stats",
+        return_value={"standard": {"count": 0}},
+    )
+
+    response = await test_client.get("/api/v1/agent/queues/wait-times")
+    assert response.status_code == 403
+
+    test_user.is_superuser = True
+    response = await test_client.get("/api/v1/agent/queues/wait-times")
+    assert response.status_code == 200
+    assert response.json() == {"standard": {"count": 0}}
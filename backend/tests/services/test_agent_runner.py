@@ -1,5 +1,6 @@
 # backend/tests/services/test_agent_runner.py
 import pytest
+from sqlalchemy.dialects import postgresql
 from sqlmodel.ext.asyncio.session import AsyncSession
 from dramatiq.brokers.stub import StubBroker
 
@@ -54,3 +55,83 @@ async def test_queue_agent_run_service(
     message = queue.get()
     assert message.actor_name == "run_churninator_agent"
     assert message.args == (str(db_run.id), db_run.target_url, db_run.task_prompt)
+
+
+async def test_queue_agent_runs_batch(
+    db_session: AsyncSession, test_user: User, mock_broker: StubBroker
+):
+    """A batch is committed in one go and every run is queued with its owner."""
+    initial_run_count = test_user.run_count
+    runs_in = [
+        AgentRunCreate(target_url=f"https://batch-{i}.com", task_prompt="Batch test")
+        for i in range(3)
+    ]
+    assert test_user.id is not None
+
+    db_runs = await agent_runner.queue_agent_runs(
+        db=db_session, runs_in=runs_in, owner_id=test_user.id
+    )
+
+    await db_session.refresh(test_user)
+    assert test_user.run_count == initial_run_count + 3
+    assert [run.target_url for run in db_runs] == [r.target_url for r in runs_in]
+
+    queue = mock_broker.get_queue("default")
+    assert queue.qsize() == 3
+    message = queue.get()
+    assert message.args[0] == str(db_runs[0].id)
+    assert message.kwargs == {"owner_id": str(test_user.id)}
+
+
+async def test_paid_users_are_queued_on_the_priority_lane(
+    db_session: AsyncSession, test_user: User, mock_broker: StubBroker
+):
+    test_user.subscription_status = "active"
+    db_session.add(test_user)
+    await db_session.commit()
+    assert test_user.id is not None
+
+    await agent_runner.queue_agent_run(
+        db=db_session,
+        run_in=AgentRunCreate(target_url="https://paid.com", task_prompt="Paid"),
+        owner_id=test_user.id,
+    )
+
+    message = mock_broker.get_queue("runs_priority").get()
+    assert message.actor_name == "run_churninator_agent_priority"
+
+
+async def test_queue_agent_runs_enforces_in_flight_cap(
+    db_session: AsyncSession, test_user: User, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(
+        "backend.worker.lanes.settings.RUN_MAX_IN_FLIGHT_PER_USER_FREE", 2
+    )
+    runs_in = [
+        AgentRunCreate(target_url=f"https://cap-{i}.com", task_prompt="Cap test")
+        for i in range(3)
+    ]
+    assert test_user.id is not None
+
+    with pytest.raises(agent_runner.RunQuotaExceeded):
+        await agent_runner.queue_agent_runs(
+            db=db_session, runs_in=runs_in, owner_id=test_user.id
+        )
+
+
+async def test_queue_agent_runs_locks_the_owner_before_counting(
+    db_session: AsyncSession, test_user: User, mock_broker: StubBroker, mocker
+):
+    """Concurrent submissions by one user are serialized on the user's row."""
+    execute = mocker.spy(db_session, "execute")
+    assert test_user.id is not None
+
+    await agent_runner.queue_agent_run(
+        db=db_session,
+        run_in=AgentRunCreate(target_url="https://lock.com", task_prompt="Lock"),
+        owner_id=test_user.id,
+    )
+
+    user_query, count_query = [c.args[0] for c in execute.call_args_list[:2]]
+    assert "FOR UPDATE" in str(user_query.compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE" not in str(count_query.compile(dialect=postgresql.dialect()))
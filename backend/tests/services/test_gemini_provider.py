@@ -0,0 +1,126 @@
+# backend/tests/services/test_gemini_provider.py
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+from PIL import Image
+
+from backend.src.services.vlm.gemini_provider import (
+    REPORT_ANALYST_PROMPT,
+    GeminiVLMProvider,
+    backoff_delay,
+)
+from backend.src.services.vlm.response_cache import ResponseCache
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def no_backoff(mocker):
+    return mocker.patch(
+        "backend.src.services.vlm.gemini_provider.asyncio.sleep", new=AsyncMock()
+    )
+
+
+def make_model(**kwargs) -> MagicMock:
+    model = MagicMock(model_name="models/test")
+    model.generate_content_async = AsyncMock(**kwargs)
+    return model
+
+
+async def test_rate_limited_calls_are_retried(no_backoff):
+    provider = GeminiVLMProvider(max_in_flight=2, max_retries=3)
+    model = make_model(
+        side_effect=[
+            google_exceptions.ResourceExhausted("quota"),
+            google_exceptions.ServiceUnavailable("busy"),
+            MagicMock(text="ok"),
+        ]
+    )
+
+    response = await provider._generate(model, ["prompt"])
+
+    assert response.text == "ok"
+    assert model.generate_content_async.await_count == 3
+    assert no_backoff.await_count == 2
+
+
+async def test_gives_up_after_max_retries_and_skips_permanent_errors(no_backoff):
+    provider = GeminiVLMProvider(max_in_flight=2, max_retries=2)
+    model = make_model(side_effect=google_exceptions.TooManyRequests("slow down"))
+    with pytest.raises(google_exceptions.TooManyRequests):
+        await provider._generate(model, ["prompt"])
+    assert model.generate_content_async.await_count == 3
+
+    model = make_model(side_effect=google_exceptions.InvalidArgument("bad prompt"))
+    with pytest.raises(google_exceptions.InvalidArgument):
+        await provider._generate(model, ["prompt"])
+    assert model.generate_content_async.await_count == 1
+
+
+async def test_in_flight_requests_are_capped():
+    provider = GeminiVLMProvider(max_in_flight=2, max_retries=0)
+    running, peak = 0, 0
+
+    async def generate(contents):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return MagicMock(text="ok")
+
+    model = make_model(side_effect=generate)
+    await asyncio.gather(*(provider._generate(model, ["p"]) for _ in range(6)))
+    assert peak == 2
+
+
+async def test_backoff_is_jittered_and_capped():
+    delays = [backoff_delay(10, base=1.0, cap=5.0) for _ in range(50)]
+    assert all(0 <= d <= 5.0 for d in delays)
+    assert len(set(delays)) > 1
+
+
+async def test_identical_requests_are_served_from_the_cache(tmp_path):
+    provider = GeminiVLMProvider(max_in_flight=2, max_retries=0)
+    provider.cache = ResponseCache(tmp_path, ttl_seconds=60, max_bytes=1 << 20)
+    provider.analysis_model = make_model(return_value=MagicMock(text="{}"))
+    image = Image.new("RGB", (8, 8), "white")
+
+    first = await provider.generate_report_from_run([image], "log")
+    second = await provider.generate_report_from_run([image.copy()], "log")
+    await provider.generate_report_from_run([image], "another log")
+
+    assert first == second == "{}"
+    assert provider.analysis_model.generate_content_async.await_count == 2
+
+
+async def test_unparsable_report_is_not_cached(tmp_path):
+    provider = GeminiVLMProvider(max_in_flight=2, max_retries=0)
+    provider.cache = ResponseCache(tmp_path, ttl_seconds=60, max_bytes=1 << 20)
+    provider.analysis_model = make_model(
+        side_effect=[MagicMock(text="Sorry, no JSON"), MagicMock(text='{"a": 1}')]
+    )
+    image = Image.new("RGB", (8, 8), "white")
+
+    with pytest.raises(json.JSONDecodeError):
+        await provider.generate_report_from_run([image], "log")
+    assert not list(tmp_path.glob("*.bin"))
+
+    assert await provider.generate_report_from_run([image], "log") == '{"a": 1}'
+    assert await provider.generate_report_from_run([image], "log") == '{"a": 1}'
+    assert provider.analysis_model.generate_content_async.await_count == 2
+
+
+async def test_unparsable_cached_report_is_regenerated(tmp_path):
+    provider = GeminiVLMProvider(max_in_flight=2, max_retries=0)
+    provider.cache = ResponseCache(tmp_path, ttl_seconds=60, max_bytes=1 << 20)
+    provider.analysis_model = make_model(return_value=MagicMock(text="```json\n{}```"))
+    image = Image.new("RGB", (8, 8), "white")
+    key = ResponseCache.key_for("models/test", [REPORT_ANALYST_PROMPT, "log", image])
+    provider.cache.put(key, b"not json")
+
+    assert await provider.generate_report_from_run([image], "log") == "```json\n{}```"
+    assert provider.cache.get(key) == b"```json\n{}```"
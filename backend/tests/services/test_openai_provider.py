@@ -0,0 +1,29 @@
+# backend/tests/services/test_openai_provider.py
+import base64
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from backend.src.services.vlm import openai_provider
+from backend.src.services.vlm.openai_provider import OpenAIVLMProvider
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_data_url_declares_the_format_of_the_bytes(mocker):
+    mocker.patch.object(openai_provider, "tiktoken", None)
+    mocker.patch.object(
+        openai_provider, "get_settings", return_value=MagicMock(OPENAI_API_KEY="sk")
+    )
+    provider = OpenAIVLMProvider(parser=MagicMock())
+    create = AsyncMock()
+    create.return_value.choices = [MagicMock()]
+    provider.client = MagicMock()
+    provider.client.chat.completions.create = create
+    # A JPEG, although frame_spec says webp (e.g. prepare_model_frame's fallback).
+    jpeg = base64.b64encode(b"\xff\xd8\xff\xe0" + bytes(32)).decode()
+
+    await provider.get_next_action(jpeg, "prompt")
+
+    [_, image] = create.await_args.kwargs["messages"][1]["content"]
+    assert image["image_url"]["url"].startswith("data:image/jpeg;base64,")
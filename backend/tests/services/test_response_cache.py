@@ -0,0 +1,41 @@
+# backend/tests/services/test_response_cache.py
+import os
+import time
+
+from PIL import Image
+
+from backend.src.services.vlm.response_cache import ResponseCache
+
+
+def test_key_depends_on_model_prompt_and_image_pixels():
+    red, blue = Image.new("RGB", (4, 4), "red"), Image.new("RGB", (4, 4), "blue")
+    key = ResponseCache.key_for("flash", ["prompt", red])
+    assert key == ResponseCache.key_for("flash", ["prompt", red.copy()])
+    assert key != ResponseCache.key_for("pro", ["prompt", red])
+    assert key != ResponseCache.key_for("flash", ["other prompt", red])
+    assert key != ResponseCache.key_for("flash", ["prompt", blue])
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = ResponseCache(tmp_path, ttl_seconds=60, max_bytes=1024)
+    cache.put("a", b"answer")
+    assert cache.get("a") == b"answer"
+
+    stale = time.time() - 120
+    os.utime(tmp_path / "a.bin", (stale, stale))
+    assert cache.get("a") is None
+    assert cache.get("missing") is None
+
+
+def test_least_recently_used_entries_are_evicted_over_size(tmp_path):
+    cache = ResponseCache(tmp_path, ttl_seconds=3600, max_bytes=25)
+    now = time.time()
+    for i, key in enumerate(["old", "used", "new"]):
+        cache.put(key, b"x" * 10)
+        os.utime(tmp_path / f"{key}.bin", (now - 30 + i, now - 30 + i))
+    # Reading "used" makes "old" the least recently used entry.
+    assert cache.get("used") == b"x" * 10
+
+    cache.evict()
+    assert cache.get("old") is None
+    assert cache.get("used") is not None and cache.get("new") is not None
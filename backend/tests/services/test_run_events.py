@@ -0,0 +1,77 @@
+# backend/tests/services/test_run_events.py
+import json
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import redis.asyncio as redis
+from fastapi import HTTPException
+
+from backend.src.api.v1 import dependencies
+from backend.src.core import security
+from backend.src.core.security import (
+    create_access_token,
+    create_stream_token,
+    verify_stream_token,
+    verify_token,
+)
+from backend.src.services.run_events import publish_run_status, run_events_channel
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_status_is_published_to_the_owners_channel():
+    owner_id, run_id = uuid.uuid4(), uuid.uuid4()
+    redis_client = AsyncMock()
+
+    await publish_run_status(redis_client, owner_id, run_id, "ANALYZING")
+
+    channel, payload = redis_client.publish.await_args.args
+    assert channel == run_events_channel(owner_id) == f"run_status:{owner_id}"
+    assert json.loads(payload) == {"run_id": str(run_id), "status": "ANALYZING"}
+
+
+async def test_publish_failure_does_not_raise():
+    """The status is already committed; a Redis outage only costs the push."""
+    redis_client = AsyncMock()
+    redis_client.publish.side_effect = redis.ConnectionError("down")
+
+    await publish_run_status(redis_client, uuid.uuid4(), uuid.uuid4(), "FAILED")
+
+
+async def test_stream_tokens_only_open_event_streams(mocker):
+    user_id = uuid.uuid4()
+    stream_token = create_stream_token(user_id)
+    access_token = create_access_token({"sub": str(user_id)})
+
+    assert verify_stream_token(stream_token) == user_id
+    # A stream token leaked from a URL is no bearer token, and vice versa.
+    assert verify_token(stream_token) is None
+    assert verify_stream_token(access_token) is None
+    assert verify_token(access_token) == user_id
+
+    mocker.patch.object(security.settings, "RUN_EVENTS_TOKEN_EXPIRE_SECONDS", -1)
+    assert verify_stream_token(create_stream_token(user_id)) is None
+
+
+async def test_stream_user_session_is_closed_before_streaming(mocker):
+    user = MagicMock(is_active=True)
+    session = AsyncMock()
+    session.get.return_value = user
+    closed = []
+
+    @asynccontextmanager
+    async def get_session():
+        yield session
+        closed.append(True)
+
+    mocker.patch.object(dependencies.postgres_db, "get_session", get_session)
+
+    assert await dependencies.get_stream_user(create_stream_token(uuid.uuid4())) is user
+    assert closed == [True]
+
+    with pytest.raises(HTTPException) as error:
+        await dependencies.get_stream_user("not-a-token")
+    assert error.value.status_code == 401
+    assert closed == [True]
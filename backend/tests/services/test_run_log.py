@@ -0,0 +1,59 @@
+import pytest
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.src.db.models.agent_run import AgentRun, AgentRunStep, RunStep
+from backend.src.db.models.user import User
+from backend.src.services.run_log import load_run_log
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_step(n: int) -> RunStep:
+    return RunStep(
+        step=n,
+        thought=f"Thought {n}",
+        action="wait(seconds=1)",
+        screenshot_path=f"storage/runs/x/step_{n}.jpeg",
+        observation="",
+        friction_score=n,
+    )
+
+
+async def test_load_run_log_projects_step_rows(
+    db_session: AsyncSession, test_user: User
+):
+    """Steps are read back in order, optionally filtered to specific steps."""
+    run = AgentRun(target_url="https://a.com", task_prompt="A", owner_id=test_user.id)
+    db_session.add(run)
+    await db_session.commit()
+    for n in (2, 1, 3):
+        db_session.add(
+            AgentRunStep(
+                run_id=run.id, step=n, friction_score=n, data=make_step(n).model_dump()
+            )
+        )
+    await db_session.commit()
+
+    full_log = await load_run_log(db_session, run.id)
+    key_steps = await load_run_log(db_session, run.id, steps=[3])
+
+    assert [s.step for s in full_log] == [1, 2, 3]
+    assert [s.step for s in key_steps] == [3]
+
+
+async def test_load_run_log_falls_back_to_legacy_blob(
+    db_session: AsyncSession, test_user: User
+):
+    """Runs recorded before the run_step table still expose their log."""
+    run = AgentRun(
+        target_url="https://b.com",
+        task_prompt="B",
+        owner_id=test_user.id,
+        run_log=[make_step(1).model_dump(), make_step(2).model_dump()],
+    )
+    db_session.add(run)
+    await db_session.commit()
+
+    log = await load_run_log(db_session, run.id, steps=[2])
+
+    assert [s.step for s in log] == [2]
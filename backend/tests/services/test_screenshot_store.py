@@ -0,0 +1,134 @@
+# backend/tests/services/test_screenshot_store.py
+import datetime as dt
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.src.db.models.agent_run import AgentRun, AgentRunStep, ScreenshotBlob
+from backend.src.db.models.user import User
+from backend.src.services.screenshot_store import (
+    ScreenshotStore,
+    add_blob_refs,
+    collect_orphan_blobs,
+    release_run_blobs,
+    resolve_screenshot,
+    sweep_orphan_blobs,
+)
+
+
+def test_identical_frames_are_stored_once(tmp_path):
+    store = ScreenshotStore(tmp_path)
+    ref = ScreenshotStore.ref_for(b"frame")
+
+    assert ref.startswith("blob:") and ref.endswith(".jpeg")
+    assert store.write(ref, b"frame")
+    assert not store.write(ref, b"frame")
+    assert store.path_for(ref).read_bytes() == b"frame"
+
+    rendition = store.path_for(ref).with_name(
+        f"{store.path_for(ref).stem}.1280x720q70.webp"
+    )
+    rendition.write_bytes(b"small")
+    store.delete([ref])
+    assert not store.path_for(ref).exists()
+    assert not rendition.exists()
+
+
+def test_concurrent_writes_of_one_frame_do_not_collide(tmp_path, mocker):
+    """Threads in one process writing the same blob each use their own temp file."""
+    store = ScreenshotStore(tmp_path)
+    ref = ScreenshotStore.ref_for(b"frame")
+    # Hold every writer at the rename until all have written their temp file.
+    barrier = threading.Barrier(8)
+    replace = Path.replace
+
+    def racing_replace(path, target):
+        barrier.wait(timeout=5)
+        return replace(path, target)
+
+    mocker.patch.object(Path, "replace", racing_replace)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: store.write(ref, b"frame"), range(8)))
+
+    assert store.path_for(ref).read_bytes() == b"frame"
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_stale_refs_lists_old_blobs_and_drops_dead_writes(tmp_path):
+    store = ScreenshotStore(tmp_path)
+    old, fresh = ScreenshotStore.ref_for(b"old"), ScreenshotStore.ref_for(b"fresh")
+    store.write(old, b"old")
+    store.write(fresh, b"fresh")
+    rendition = store.path_for(old).with_name(f"{store.path_for(old).stem}.1x1q1.jpeg")
+    rendition.write_bytes(b"small")
+    dead_write = store.path_for(old).with_suffix(".abc.tmp")
+    dead_write.write_bytes(b"partial")
+    for path in (store.path_for(old), rendition, dead_write):
+        os.utime(path, (1000, 1000))
+
+    assert store.stale_refs(cutoff=2000) == [old]
+    assert not dead_write.exists()
+
+    # Writing an existing blob again makes it fresh.
+    store.write(old, b"old")
+    assert store.stale_refs(cutoff=2000) == []
+
+
+def test_legacy_paths_resolve_unchanged():
+    assert str(resolve_screenshot("storage/runs/x/step_1.jpeg")) == (
+        "storage/runs/x/step_1.jpeg"
+    )
+
+
+@pytest.mark.asyncio
+async def test_blob_references_are_counted_and_released(
+    db_session: AsyncSession, test_user: User
+):
+    """A blob is swept only once no step references it any more."""
+    shared, unique = ScreenshotStore.ref_for(b"shared"), ScreenshotStore.ref_for(b"u")
+    run = AgentRun(target_url="https://a.com", task_prompt="A", owner_id=test_user.id)
+    db_session.add(run)
+    await db_session.commit()
+    for n, ref in enumerate([shared, shared, unique], start=1):
+        db_session.add(
+            AgentRunStep(run_id=run.id, step=n, data={"screenshot_path": ref})
+        )
+    await add_blob_refs(db_session, [shared, shared, unique, "legacy/path.jpeg"])
+    await add_blob_refs(db_session, [shared])  # another run's step
+    await db_session.commit()
+
+    await release_run_blobs(db_session, run.id)
+    await db_session.commit()
+    shared_blob = await db_session.get(ScreenshotBlob, shared)
+    assert shared_blob is not None and shared_blob.ref_count == 1
+
+    unique_blob = await db_session.get(ScreenshotBlob, unique)
+    assert unique_blob is not None and unique_blob.ref_count == 0
+    unique_blob.updated_at = dt.datetime.utcnow() - dt.timedelta(hours=2)
+    db_session.add(unique_blob)
+    await db_session.commit()
+
+    assert await sweep_orphan_blobs(db_session, grace_seconds=3600) == [unique]
+
+
+@pytest.mark.asyncio
+async def test_collect_deletes_old_files_that_never_got_a_row(
+    db_session: AsyncSession, tmp_path, mocker
+):
+    """A crash between writing a blob and counting it leaves a file to collect."""
+    store = ScreenshotStore(tmp_path)
+    mocker.patch("backend.src.services.screenshot_store.screenshot_store", store)
+    counted, uncounted = ScreenshotStore.ref_for(b"a"), ScreenshotStore.ref_for(b"b")
+    for ref in (counted, uncounted):
+        store.write(ref, ref.encode())
+        os.utime(store.path_for(ref), (1000, 1000))
+    await add_blob_refs(db_session, [counted])
+    await db_session.commit()
+
+    assert await collect_orphan_blobs(db_session, grace_seconds=3600) == 1
+    assert store.path_for(counted).exists()
+    assert not store.path_for(uncounted).exists()
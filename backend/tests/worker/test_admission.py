@@ -0,0 +1,87 @@
+# backend/tests/worker/test_admission.py
+from unittest.mock import AsyncMock
+
+import pytest
+
+from backend.worker.admission import (
+    CLAIM_SCRIPT,
+    PARK_SCRIPT,
+    RELEASE_SLOTS_SCRIPT,
+    RunAdmission,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_admission(redis_client, domain="shop.example.com", owner_id="user-1"):
+    return RunAdmission(
+        redis_client,
+        "run-1",
+        domain=domain,
+        owner_id=owner_id,
+        max_per_domain=2,
+        max_per_user=5,
+        ttl_seconds=900,
+    )
+
+
+async def test_acquire_checks_domain_and_user_caps_atomically():
+    redis_client = AsyncMock()
+    redis_client.eval.return_value = 0
+
+    assert not await make_admission(redis_client).acquire()
+
+    args = redis_client.eval.await_args.args
+    assert args[1:4] == (
+        2,
+        "admission:domain:shop.example.com",
+        "admission:user:user-1",
+    )
+    assert args[-2:] == (2, 5)
+
+
+async def test_runs_without_caps_are_admitted_without_redis():
+    redis_client = AsyncMock()
+
+    admission = make_admission(redis_client, domain=None, owner_id=None)
+
+    assert await admission.acquire()
+    assert await admission.release() == []
+    redis_client.eval.assert_not_awaited()
+
+
+async def test_release_frees_every_slot_and_returns_the_woken_runs():
+    redis_client = AsyncMock()
+    redis_client.eval.return_value = [b'{"run_id": "run-2"}']
+
+    woken = await make_admission(redis_client).release()
+
+    assert woken == ['{"run_id": "run-2"}']
+    assert redis_client.eval.await_args.args == (
+        RELEASE_SLOTS_SCRIPT,
+        2,
+        "admission:domain:shop.example.com",
+        "admission:user:user-1",
+        "run-1",
+        "admission:parked:",
+    )
+
+
+async def test_parked_run_waits_behind_every_cap_and_is_claimed_by_token():
+    redis_client = AsyncMock()
+    redis_client.eval.return_value = 1
+    admission = make_admission(redis_client)
+
+    await admission.park("token-1", "payload")
+    assert await admission.claim("token-1")
+
+    park, claim = [c.args for c in redis_client.eval.await_args_list]
+    assert park[:5] == (
+        PARK_SCRIPT,
+        3,
+        "admission:domain:shop.example.com",
+        "admission:user:user-1",
+        "admission:parked:run-1",
+    )
+    assert park[6:9] == ("run-1", "token-1", "payload")
+    assert claim == (CLAIM_SCRIPT, 1, "admission:parked:run-1", "token-1")
@@ -0,0 +1,30 @@
+# backend/tests/worker/test_broker.py
+from unittest.mock import MagicMock
+
+import dramatiq
+
+from backend.worker.broker import PipelinedRedisBroker
+
+
+def test_enqueue_many_sends_every_message_in_one_pipeline():
+    client = MagicMock()
+    broker = PipelinedRedisBroker(client=client)
+    broker._max_unpack_size = MagicMock(return_value=1000)
+
+    @dramatiq.actor(broker=broker, queue_name="standard")
+    def scout(run_id):
+        pass
+
+    messages = [scout.message(f"run-{i}") for i in range(3)]
+    enqueued = broker.enqueue_many(messages)
+
+    pipe = client.pipeline.return_value.__enter__.return_value
+    pipe.execute.assert_called_once_with()
+    dispatch = broker.scripts["dispatch"]
+    assert dispatch.call_count == 3
+    for call, message in zip(dispatch.call_args_list, enqueued):
+        assert call.kwargs["client"] is pipe
+        args = call.kwargs["args"]
+        assert args[0] == "enqueue" and args[2] == "standard"
+        assert args[-2:] == [message.options["redis_message_id"], message.encode()]
+    assert len({m.options["redis_message_id"] for m in enqueued}) == 3
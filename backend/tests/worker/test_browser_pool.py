@@ -0,0 +1,65 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from backend.worker.browser_pool import BrowserPool
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_browser():
+    browser = MagicMock()
+    browser.is_connected.return_value = True
+    browser.new_context = AsyncMock(return_value=AsyncMock())
+    browser.close = AsyncMock()
+    return browser
+
+
+@pytest.fixture
+def mock_chromium(mocker):
+    """Patches Playwright so every launch returns a fresh fake browser."""
+    playwright = MagicMock()
+    playwright.chromium.launch = AsyncMock(side_effect=lambda **_: make_browser())
+    playwright.stop = AsyncMock()
+    mock_async_playwright = mocker.patch("backend.worker.browser_pool.async_playwright")
+    mock_async_playwright.return_value.start = AsyncMock(return_value=playwright)
+    return playwright.chromium
+
+
+async def test_contexts_reuse_warm_browser(mock_chromium):
+    """Consecutive runs lease contexts from the same pre-launched browser."""
+    pool = BrowserPool(size=1, max_contexts_per_browser=10)
+
+    async with pool.context():
+        pass
+    async with pool.context():
+        pass
+
+    assert mock_chromium.launch.await_count == 1
+
+
+async def test_browser_recycled_after_max_contexts(mock_chromium):
+    """A browser is closed and replaced once it has served its quota."""
+    pool = BrowserPool(size=1, max_contexts_per_browser=2)
+
+    async with pool.context():
+        pass
+    first_browser = pool._browsers[0].browser
+    async with pool.context():
+        pass
+
+    first_browser.close.assert_awaited_once()
+    async with pool.context():
+        pass
+    assert mock_chromium.launch.await_count == 2
+
+
+async def test_crashed_browser_is_replaced(mock_chromium):
+    """A disconnected browser never receives new contexts."""
+    pool = BrowserPool(size=1, max_contexts_per_browser=10)
+    await pool.start()
+    pool._browsers[0].browser.is_connected.return_value = False
+
+    async with pool.context():
+        pass
+
+    assert mock_chromium.launch.await_count == 2
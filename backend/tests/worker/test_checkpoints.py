@@ -0,0 +1,151 @@
+# backend/tests/worker/test_checkpoints.py
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from backend.src.db.models.agent_run import RunStep
+from backend.worker.checkpoints import (
+    RELEASE_LEASE_SCRIPT,
+    RENEW_LEASE_SCRIPT,
+    RunLease,
+    checkpoint_key,
+    clear_checkpoint,
+    load_checkpoint,
+    save_checkpoint,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_redis() -> AsyncMock:
+    """An AsyncMock Redis client backed by a dict for get/set/delete."""
+    store: dict[str, str] = {}
+    redis_client = AsyncMock()
+    redis_client.store = store
+
+    async def set_(key, value, **kwargs):
+        if kwargs.get("nx") and key in store:
+            return None
+        store[key] = value
+        return True
+
+    redis_client.set.side_effect = set_
+    redis_client.get.side_effect = store.get
+    redis_client.delete.side_effect = lambda key: store.pop(key, None)
+    return redis_client
+
+
+def make_step(step: int) -> RunStep:
+    return RunStep(
+        step=step,
+        thought="",
+        action="click(x=0.1, y=0.1)",
+        screenshot_path=f"blob:{step}.jpeg",
+        observation="",
+        friction_score=step,
+    )
+
+
+async def test_checkpoint_round_trip_and_clear():
+    redis_client = make_redis()
+    context = AsyncMock()
+    context.storage_state.return_value = {"cookies": [{"name": "sid"}]}
+    history = [make_step(1), make_step(2)]
+
+    await save_checkpoint(
+        redis_client, "run-1", context, "https://shop.test/cart", history, 3600
+    )
+
+    assert redis_client.set.await_args.kwargs == {"ex": 3600}
+    checkpoint = await load_checkpoint(redis_client, "run-1")
+    assert checkpoint is not None
+    assert checkpoint.completed_steps == 2
+    assert checkpoint.url == "https://shop.test/cart"
+    assert checkpoint.storage_state == {"cookies": [{"name": "sid"}]}
+    assert checkpoint.history == history
+
+    await clear_checkpoint(redis_client, "run-1")
+    assert await load_checkpoint(redis_client, "run-1") is None
+
+
+async def test_corrupt_checkpoint_is_ignored():
+    redis_client = make_redis()
+    redis_client.store[checkpoint_key("run-1")] = '{"completed_steps": "many"}'
+
+    assert await load_checkpoint(redis_client, "run-1") is None
+
+
+async def test_lease_is_exclusive_and_released_only_by_its_holder():
+    redis_client = make_redis()
+    first = RunLease(redis_client, "run-1", ttl_seconds=60)
+    second = RunLease(redis_client, "run-1", ttl_seconds=60)
+
+    assert await first.acquire()
+    assert not await second.acquire()
+    assert redis_client.set.await_args_list[0].kwargs == {"nx": True, "px": 60_000}
+
+    await second.release()
+    await first.release()
+    assert [c.args for c in redis_client.eval.await_args_list] == [
+        (RELEASE_LEASE_SCRIPT, 1, "lease:run-1", second.token),
+        (RELEASE_LEASE_SCRIPT, 1, "lease:run-1", first.token),
+    ]
+    assert first._renewer is None
+
+
+async def test_lease_is_renewed_while_held(mocker):
+    redis_client = make_redis()
+    redis_client.eval.return_value = 1
+    lease = RunLease(redis_client, "run-1", ttl_seconds=60)
+    sleep = mocker.patch("backend.worker.checkpoints.asyncio.sleep", new=AsyncMock())
+    # Stop the renewer once it has renewed twice.
+    sleep.side_effect = [None, None, asyncio.CancelledError()]
+
+    await lease.acquire()
+    assert lease._renewer is not None
+    with pytest.raises(asyncio.CancelledError):
+        await lease._renewer
+
+    sleep.assert_awaited_with(20.0)
+    assert [c.args for c in redis_client.eval.await_args_list] == [
+        (RENEW_LEASE_SCRIPT, 1, "lease:run-1", lease.token, 60_000)
+    ] * 2
+
+
+async def test_lost_lease_stops_renewing_and_reports_it(mocker):
+    redis_client = make_redis()
+    redis_client.eval.return_value = 0  # Another worker holds the key now.
+    on_lost = MagicMock()
+    lease = RunLease(redis_client, "run-1", ttl_seconds=60, on_lost=on_lost)
+    mocker.patch("backend.worker.checkpoints.asyncio.sleep", new=AsyncMock())
+
+    await lease.acquire()
+    assert lease._renewer is not None
+    await lease._renewer
+
+    assert lease.lost
+    on_lost.assert_called_once_with()
+    assert redis_client.eval.await_count == 1
+
+
+async def test_redis_errors_are_retried_until_the_lease_expires(mocker):
+    redis_client = make_redis()
+    redis_client.eval.side_effect = [ConnectionError("reset"), 1] + [
+        ConnectionError("down")
+    ] * 2
+    on_lost = MagicMock()
+    lease = RunLease(redis_client, "run-1", ttl_seconds=60, on_lost=on_lost)
+    mocker.patch("backend.worker.checkpoints.asyncio.sleep", new=AsyncMock())
+    # Start, failed renewal, renewal, failed renewal, then past the TTL.
+    clock = mocker.patch("backend.worker.checkpoints.time")
+    clock.monotonic.side_effect = [0, 20, 40, 60, 100]
+
+    await lease.acquire()
+    assert lease._renewer is not None
+    await lease._renewer
+
+    assert redis_client.eval.await_count == 4
+    assert lease.lost
+    on_lost.assert_called_once_with()
@@ -0,0 +1,86 @@
+from io import BytesIO
+from PIL import Image, ImageDraw
+
+from backend.src.services.screenshot_store import ScreenshotStore
+from backend.src.services.vlm.base import FrameSpec, image_mime_type
+from backend.worker.frames import (
+    FrameComparator,
+    dhash,
+    prepare_model_frame,
+    to_viewport_coordinates,
+)
+
+
+def make_frame(box_x: int, quality: int = 70) -> bytes:
+    """Renders a simple page-like JPEG with a dark box at `box_x`."""
+    image = Image.new("RGB", (320, 180), "white")
+    ImageDraw.Draw(image).rectangle([box_x, 40, box_x + 80, 120], fill="black")
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def test_dhash_ignores_reencoding():
+    """The same screen encoded at different JPEG qualities hashes the same."""
+    first, second = dhash(make_frame(20, quality=70)), dhash(make_frame(20, 40))
+    assert first is not None and second is not None
+    assert (first ^ second).bit_count() <= 2
+
+
+def test_dhash_detects_layout_change():
+    """Moving content across the screen changes the hash substantially."""
+    first, second = dhash(make_frame(20)), dhash(make_frame(200))
+    assert first is not None and second is not None
+    assert (first ^ second).bit_count() > 2
+
+
+def test_dhash_returns_none_for_undecodable_bytes():
+    assert dhash(b"not an image") is None
+
+
+def test_comparator_flags_only_identical_frames():
+    comparator = FrameComparator()
+    ticked = Image.open(BytesIO(make_frame(20)))
+    ImageDraw.Draw(ticked).rectangle([150, 60, 153, 63], fill="black")
+    buffer = BytesIO()
+    ticked.save(buffer, format="JPEG", quality=70)
+
+    assert not comparator.is_unchanged(ScreenshotStore.ref_for(make_frame(20)))
+    assert comparator.is_unchanged(ScreenshotStore.ref_for(make_frame(20)))
+    # A few pixels of feedback (a ticked checkbox) is a change, even though
+    # the perceptual hash barely moves.
+    assert not comparator.is_unchanged(ScreenshotStore.ref_for(buffer.getvalue()))
+    assert comparator.is_unchanged(ScreenshotStore.ref_for(buffer.getvalue()))
+
+
+def test_prepare_model_frame_downscales_and_reencodes():
+    spec = FrameSpec(max_width=160, max_height=90, format="webp", quality=60)
+
+    prepared = prepare_model_frame(make_frame(20), spec)
+
+    with Image.open(BytesIO(prepared)) as image:
+        assert image.format == "WEBP"
+        assert image.size == (160, 90)
+
+
+def test_prepare_model_frame_passes_through_matching_frames():
+    frame = make_frame(20)
+    assert prepare_model_frame(frame, FrameSpec()) is frame
+
+
+def test_mime_type_follows_the_bytes_not_the_spec():
+    webp = FrameSpec(max_width=160, max_height=90, format="webp")
+
+    assert image_mime_type(prepare_model_frame(make_frame(20), webp)) == "image/webp"
+    # A frame that already fits is passed through as the original JPEG.
+    assert image_mime_type(prepare_model_frame(make_frame(20), FrameSpec())) == (
+        "image/jpeg"
+    )
+
+
+def test_cropped_coordinates_map_back_to_viewport():
+    spec = FrameSpec(crop=(0.0, 0.5, 1.0, 1.0))
+
+    with Image.open(BytesIO(prepare_model_frame(make_frame(20), spec))) as image:
+        assert image.size == (320, 90)
+    assert to_viewport_coordinates(0.5, 0.5, spec.crop) == (0.5, 0.75)
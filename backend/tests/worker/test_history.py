@@ -0,0 +1,48 @@
+from backend.src.db.models.agent_run import RunStep
+from backend.worker.history import MissionHistory
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+def make_steps(count: int) -> list[RunStep]:
+    return [
+        RunStep(
+            step=n,
+            thought=f"A fairly long chain of reasoning for step {n} " * 5,
+            action=f"click(x=0.{n}, y=0.5)",
+            screenshot_path=f"step_{n}.jpeg",
+            observation=f"Signup form, page {n}",
+            friction_score=0,
+        )
+        for n in range(1, count + 1)
+    ]
+
+
+def test_short_history_is_kept_verbatim():
+    history = MissionHistory(count_words, token_budget=10_000, verbatim_steps=4)
+
+    rendered = history.render(make_steps(3))
+
+    assert "Summary of earlier steps" not in rendered
+    assert rendered.count("Thought:") == 3
+
+
+def test_older_steps_are_folded_into_summary():
+    history = MissionHistory(count_words, token_budget=10_000, verbatim_steps=2)
+
+    rendered = history.render(make_steps(6))
+
+    assert rendered.count("Thought:") == 2
+    assert "Step 1: click(x=0.1, y=0.5) (screen: Signup form, page 1)" in rendered
+
+
+def test_history_stays_within_budget_on_long_runs():
+    history = MissionHistory(count_words, token_budget=150, verbatim_steps=4)
+
+    rendered = history.render(make_steps(25))
+
+    assert count_words(rendered) <= 150
+    assert "Step 25: Thought:" in rendered
+    assert "earlier steps omitted" in rendered
@@ -0,0 +1,111 @@
+# backend/tests/worker/test_keyframes.py
+import os
+from io import BytesIO
+
+from PIL import Image
+
+from backend.src.db.models.agent_run import RunStep
+from backend.src.services.vlm.base import FrameSpec
+from backend.worker import keyframes
+from backend.worker.keyframes import (
+    derivative_path,
+    frame_signature,
+    pairwise_novelty,
+    prepare_keyframes,
+    select_diverse_keyframes,
+)
+
+SPEC = FrameSpec(max_width=1280, max_height=720, format="webp", quality=70)
+
+
+def write_screenshot(path):
+    """A noisy full-size screenshot, so renditions have a realistic size."""
+    image = Image.frombytes("RGB", (1920, 1080), os.urandom(1920 * 1080 * 3))
+    image.save(path, format="JPEG", quality=70)
+    return path
+
+
+def test_keyframes_are_downsized_deduplicated_and_reused(tmp_path, mocker):
+    a = write_screenshot(tmp_path / "a.jpeg")
+    b = write_screenshot(tmp_path / "b.jpeg")
+    prepare = mocker.spy(keyframes, "prepare_model_frame")
+
+    frames, spec = prepare_keyframes(
+        [a, b, a, tmp_path / "missing.jpeg"], SPEC, budget_bytes=10**9
+    )
+
+    assert len(frames) == 2 and spec == SPEC
+    with Image.open(BytesIO(frames[0])) as frame:
+        assert frame.format == "WEBP" and frame.size == (1280, 720)
+    assert derivative_path(a, SPEC).exists()
+    assert prepare.call_count == 2
+
+    again, _ = prepare_keyframes([a, b], SPEC, budget_bytes=10**9)
+    assert again == frames
+    assert prepare.call_count == 2
+
+
+def test_keyframes_over_budget_are_shrunk(tmp_path):
+    sources = [write_screenshot(tmp_path / f"{i}.jpeg") for i in range(3)]
+    full, _ = prepare_keyframes(sources, SPEC, budget_bytes=10**9)
+    budget = sum(len(f) for f in full) // 3
+
+    frames, spec = prepare_keyframes(sources, SPEC, budget_bytes=budget)
+
+    assert spec.max_width < SPEC.max_width
+    assert sum(len(f) for f in frames) <= budget
+
+
+def make_steps(screens: list[int], frictions: list[int]) -> list[RunStep]:
+    return [
+        RunStep(
+            step=i,
+            thought="",
+            action="wait()",
+            screenshot_path=f"blob:{i}.jpeg",
+            observation="",
+            friction_score=friction,
+            frame_hash=f"{screen:064x}",
+        )
+        for i, (screen, friction) in enumerate(zip(screens, frictions), 1)
+    ]
+
+
+def test_pairwise_novelty_is_normalized_hamming_distance():
+    legacy = f"{0b1011:016x}"
+    distances = pairwise_novelty([f"{0:064x}", f"{0b1011:064x}", None, legacy])
+    assert distances[0, 1] == distances[1, 0] == 3 / 256
+    assert distances[0, 2] == distances[2, 1] == distances[3, 0] == 1.0
+    assert distances[2, 2] == 0.0
+
+
+def test_frame_signature_is_a_256_bit_dhash(tmp_path):
+    signature = frame_signature(write_screenshot(tmp_path / "a.jpeg").read_bytes())
+    assert signature is not None and len(signature) == 64
+    assert frame_signature(b"not an image") is None
+
+
+def test_selection_skips_near_duplicate_screens():
+    home, cart, checkout = 0, (1 << 32) - 1, (1 << 64) - 1
+    # Steps 2-4 are the same cart screen, one with a single pixel flipped.
+    steps = make_steps(
+        [home, cart, cart | 1 << 40, cart, checkout, checkout],
+        [0, 1, 5, 1, 0, 0],
+    )
+    # The highest-friction copy of the cart screen represents it.
+    assert select_diverse_keyframes(steps, budget=5) == [1, 3, 6]
+
+
+def test_selection_keeps_high_friction_step_on_near_duplicate_screen():
+    form, cart = 0, (1 << 128) - 1
+    # Step 2 is the form again with an inline error: one bit apart, friction 9.
+    steps = make_steps([form, form | 1, cart, cart >> 64], [1, 9, 2, 0])
+    assert select_diverse_keyframes(steps, budget=3) == [1, 2, 4]
+    assert select_diverse_keyframes(steps, budget=4) == [1, 2, 3, 4]
+
+
+def test_selection_respects_budget_and_weighs_friction():
+    screens = [0, 0xFF, 0xFF00, 0xFF0000, 0xFF000000, (1 << 64) - 1]
+    steps = make_steps(screens, [0, 0, 0, 9, 0, 0])
+    assert select_diverse_keyframes(steps, budget=3) == [1, 4, 6]
+    assert select_diverse_keyframes(steps[:1], budget=3) == [1]
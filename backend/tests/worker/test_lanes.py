@@ -0,0 +1,65 @@
+# backend/tests/worker/test_lanes.py
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from backend.src.db.models.user import User
+from backend.worker.lanes import (
+    PRIORITY_LANE,
+    STANDARD_LANE,
+    QueueWaitMetrics,
+    get_queue_wait_stats,
+    lane_for,
+)
+
+
+def test_lane_follows_subscription_status():
+    assert (
+        lane_for(User(email="a@b.com", subscription_status="active")) == PRIORITY_LANE
+    )
+    assert (
+        lane_for(User(email="a@b.com", subscription_status="canceled")) == STANDARD_LANE
+    )
+    assert lane_for(User(email="a@b.com")) == STANDARD_LANE
+
+
+def test_queue_wait_is_measured_from_when_a_delayed_message_was_due():
+    metrics = QueueWaitMetrics()
+    metrics._record = MagicMock()  # type: ignore[method-assign]
+    now_ms = int(time.time() * 1000)
+    message = MagicMock(
+        queue_name="runs_priority",
+        message_timestamp=now_ms - 60_000,
+        options={"eta": now_ms - 2_000},
+    )
+
+    metrics.before_process_message(None, message)
+
+    lane, wait_ms = metrics._record.call_args.args
+    assert lane == PRIORITY_LANE
+    assert 2_000 <= wait_ms < 10_000
+
+
+def test_messages_outside_the_lanes_are_ignored():
+    metrics = QueueWaitMetrics()
+    metrics._record = MagicMock()  # type: ignore[method-assign]
+
+    metrics.before_process_message(None, MagicMock(queue_name="reports"))
+
+    metrics._record.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_queue_wait_stats_per_lane():
+    redis_client = AsyncMock()
+    redis_client.hgetall.side_effect = [
+        {b"count": b"4", b"sum_ms": b"8000", b"le_1s": b"1", b"le_5s": b"3"},
+        {},
+    ]
+
+    stats = await get_queue_wait_stats(redis_client)
+
+    assert stats[PRIORITY_LANE]["mean_wait_ms"] == 2000
+    assert stats[PRIORITY_LANE]["buckets"]["le_5s"] == 3
+    assert stats[STANDARD_LANE]["count"] == 0
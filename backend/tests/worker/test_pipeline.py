@@ -0,0 +1,80 @@
+# backend/tests/worker/test_pipeline.py
+import dramatiq
+import pytest
+from dramatiq.brokers.stub import StubBroker
+
+from backend.src.db.models.agent_run import RunStep
+from backend.worker.pipeline import RunState, Stage, StagedPipeline, pick_keyframes
+
+
+def make_state(frictions: list[int]) -> RunState:
+    return RunState(
+        run_id="run-1",
+        target_url="https://shop.test",
+        task_prompt="Buy a hat",
+        steps=[
+            RunStep(
+                step=i,
+                thought="",
+                action="wait()",
+                screenshot_path=f"blob:{i}.jpeg",
+                observation="",
+                friction_score=score,
+            )
+            for i, score in enumerate(frictions, 1)
+        ],
+    )
+
+
+def test_pick_keyframes_keeps_ends_and_highest_friction_steps():
+    state = pick_keyframes(make_state([0, 5, 1, 4, 0, 3, 0]))
+    assert state.keyframe_indices == [1, 2, 4, 6, 7]
+    assert [s.step for s in state.steps] == [1, 2, 4, 6, 7]
+
+
+def test_pick_keyframes_rejects_empty_log():
+    with pytest.raises(ValueError):
+        pick_keyframes(make_state([]))
+
+
+def test_pipeline_runs_inline_stages_then_chains_actors():
+    broker = StubBroker()
+
+    @dramatiq.actor(broker=broker, queue_name="reports")
+    def analyse(run_id, state=None):
+        return state
+
+    @dramatiq.actor(broker=broker, queue_name="reports")
+    def design(run_id, state=None):
+        pass
+
+    pipeline = StagedPipeline(
+        [
+            Stage("keyframes", run=pick_keyframes),
+            Stage("analysis", actor=analyse),
+            Stage("design", actor=design),
+        ]
+    )
+    state = pipeline.run_inline(make_state([1, 2, 3]))
+    pipeline.enqueue(state)
+
+    message = broker.queues["reports"].get_nowait()
+    decoded = dramatiq.Message.decode(message).asdict()
+    assert decoded["actor_name"] == "analyse"
+    assert decoded["args"][1]["keyframe_indices"] == [1, 2, 3]
+    # The designer is only sent once the analyst returns.
+    assert decoded["options"]["pipe_target"]["actor_name"] == "design"
+    assert broker.queues["reports"].empty()
+
+
+def test_pipeline_rejects_inline_stage_after_actor():
+    broker = StubBroker()
+
+    @dramatiq.actor(broker=broker)
+    def analyse(run_id, state=None):
+        pass
+
+    with pytest.raises(ValueError):
+        StagedPipeline(
+            [Stage("analysis", actor=analyse), Stage("late", run=lambda s: s)]
+        )
@@ -0,0 +1,104 @@
+# backend/tests/worker/test_routing.py
+import os
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from backend.worker.routing import RequestRouter, StaticAssetCache
+
+
+def make_router(**kwargs) -> RequestRouter:
+    return RequestRouter(
+        "https://www.shop.example.com/pricing",
+        blocked_resource_types=["media", "font"],
+        blocked_domains=["doubleclick.net"],
+        **kwargs,
+    )
+
+
+def test_first_party_requests_are_never_blocked():
+    router = make_router()
+    assert not router.should_block("https://cdn.example.com/hero.mp4", "media")
+
+
+def test_third_party_blocked_by_type_and_domain():
+    router = make_router()
+    assert router.should_block("https://fonts.gstatic.com/a.woff2", "font")
+    assert router.should_block("https://ad.doubleclick.net/pixel", "image")
+    assert not router.should_block("https://cdn.jsdelivr.net/lib.js", "script")
+
+
+def test_allowlist_and_per_run_switch():
+    allowlisted = make_router(allowed_domains=["stripe.com"])
+    assert not allowlisted.should_block("https://js.stripe.com/v3", "script")
+    assert allowlisted.should_block("https://cdn.jsdelivr.net/lib.js", "script")
+
+    keep_all = make_router(block_third_party=False)
+    assert not keep_all.should_block("https://ad.doubleclick.net/pixel", "image")
+
+
+def test_cache_round_trip_drops_per_response_headers(tmp_path):
+    cache = StaticAssetCache(tmp_path)
+    cache.write(
+        "https://example.com/app.css",
+        200,
+        {"content-type": "text/css", "set-cookie": "session=1"},
+        b"body{}",
+    )
+
+    assert cache.read("https://example.com/app.css") == (
+        200,
+        {"content-type": "text/css"},
+        b"body{}",
+    )
+    assert cache.read("https://example.com/other.css") is None
+
+
+def test_expired_entries_are_deleted_on_read(tmp_path):
+    cache = StaticAssetCache(tmp_path, ttl_seconds=60)
+    cache.write("https://example.com/app.js", 200, {}, b"old")
+    meta_path, body_path = cache._paths("https://example.com/app.js")
+    os.utime(meta_path, (time.time() - 120, time.time() - 120))
+
+    assert cache.read("https://example.com/app.js") is None
+    assert not meta_path.exists() and not body_path.exists()
+
+
+def test_least_recently_served_assets_are_evicted_over_the_size_cap(tmp_path):
+    cache = StaticAssetCache(tmp_path, max_bytes=2500)
+    urls = [f"https://example.com/{n}.png" for n in range(3)]
+    for age, url in zip((30, 20, 10), urls):
+        cache.write(url, 200, {}, b"x" * 1000)
+        for path in cache._paths(url):
+            os.utime(path, (time.time() - age, time.time() - age))
+    # Serving the oldest entry makes it the most recently used.
+    assert cache.read(urls[0]) is not None
+
+    cache.evict()
+
+    assert [cache.read(url) is not None for url in urls] == [True, False, True]
+
+
+def test_uncacheable_responses(tmp_path):
+    cache = StaticAssetCache(tmp_path, max_entry_bytes=4)
+    assert not cache.is_cacheable(200, {"cache-control": "no-store"}, b"")
+    assert not cache.is_cacheable(404, {}, b"")
+    assert not cache.is_cacheable(200, {}, b"too large")
+    assert cache.is_cacheable(200, {"cache-control": "max-age=60"}, b"ok")
+
+
+@pytest.mark.asyncio
+async def test_cached_assets_are_served_without_the_network(tmp_path):
+    cache = StaticAssetCache(tmp_path)
+    cache.write("https://example.com/app.js", 200, {}, b"run()")
+    route = MagicMock()
+    route.request.url = "https://example.com/app.js"
+    route.fulfill = AsyncMock()
+    route.fetch = AsyncMock()
+
+    await cache.serve(route)
+
+    route.fetch.assert_not_awaited()
+    route.fulfill.assert_awaited_once_with(status=200, headers={}, body=b"run()")
+    assert cache.hits == 1
@@ -0,0 +1,114 @@
+import asyncio
+import pytest
+
+from backend.worker.runtime import RunSupervisor, WorkerEventLoop, WorkerResources
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_supervisor_caps_concurrent_runs():
+    """No more than `max_concurrent_runs` sessions execute at once."""
+    supervisor = RunSupervisor(max_concurrent_runs=2, time_limit_seconds=5)
+    running, peak = 0, 0
+
+    async def session():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await asyncio.gather(*[supervisor.supervise(f"run-{i}", session) for i in range(6)])
+    assert peak == 2
+
+
+async def test_supervisor_enforces_time_limit():
+    """A session that overruns its time limit is stopped without raising."""
+    supervisor = RunSupervisor(max_concurrent_runs=1, time_limit_seconds=0.01)
+
+    async def session():
+        await asyncio.sleep(1)
+        return "finished"
+
+    assert await supervisor.supervise("slow-run", session) is None
+    assert supervisor.active_runs == []
+
+
+async def test_supervisor_cancels_run_by_id():
+    """Cancelling a run stops it and records that it was cancelled."""
+    supervisor = RunSupervisor(max_concurrent_runs=1, time_limit_seconds=5)
+    observed = []
+
+    async def session():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            observed.append(supervisor.was_cancelled("run-1"))
+            raise
+
+    task = asyncio.create_task(supervisor.supervise("run-1", session))
+    await asyncio.sleep(0)
+    assert supervisor.cancel("run-1")
+    await task
+
+    assert observed == [True]
+    assert not task.cancelled()
+
+
+async def test_worker_resources_are_shared_and_sized_from_settings():
+    """Every task gets the same engine and Redis pool until they are closed."""
+    resources = WorkerResources(
+        postgres_pool_size=3, postgres_max_overflow=1, redis_max_connections=7
+    )
+    db, client = resources.db, resources.redis
+    assert resources.db is db and resources.redis is client
+    assert db.pool_size == 3 and db.max_overflow == 1
+    assert client.connection_pool.max_connections == 7
+
+    await resources.close()
+    assert resources.db is not db
+    await resources.close()
+
+
+async def test_periodic_tasks_run_until_the_loop_stops():
+    """A failing periodic task is logged and retried on the next tick."""
+    loop = WorkerEventLoop()
+    ticks = []
+
+    async def tick():
+        ticks.append(len(ticks))
+        if len(ticks) == 1:
+            raise RuntimeError("database unavailable")
+
+    loop.add_periodic_task(0.01, tick)
+    loop.start_periodic_tasks()
+    await asyncio.sleep(0.1)
+    loop.stop()
+    seen = len(ticks)
+    await asyncio.sleep(0.05)
+
+    assert seen >= 2
+    assert len(ticks) == seen
+
+
+async def test_supervisor_abandons_a_run_taken_over_elsewhere():
+    """An abandoned run stops quietly and is not reported as cancelled."""
+    supervisor = RunSupervisor(max_concurrent_runs=1, time_limit_seconds=5)
+    observed = []
+
+    async def session():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            observed.append(
+                (supervisor.was_abandoned("run-1"), supervisor.was_cancelled("run-1"))
+            )
+            raise
+
+    task = asyncio.create_task(supervisor.supervise("run-1", session))
+    await asyncio.sleep(0)
+    assert supervisor.abandon("run-1")
+    await task
+
+    assert observed == [(True, False)]
+    assert not supervisor.was_abandoned("run-1")
@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from backend.worker.settle import PageSettler
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def quiet_page():
+    """A fake page whose DOM has been idle for a long time."""
+    page = MagicMock()
+    page.add_init_script = AsyncMock()
+    page.evaluate = AsyncMock(return_value=10_000)
+    return page
+
+
+async def test_settles_quickly_on_idle_page(quiet_page):
+    """An idle page only costs the minimum wait, not a fixed sleep."""
+    settler = PageSettler(quiet_page, network_quiet_ms=0, min_wait_ms=10)
+    await settler.attach()
+
+    waited_ms = await settler.wait()
+
+    assert waited_ms < 200
+
+
+async def test_waits_for_inflight_requests(quiet_page):
+    """The settle stage blocks while a request is in flight."""
+    settler = PageSettler(quiet_page, network_quiet_ms=0, min_wait_ms=0)
+    await settler.attach()
+    request = MagicMock(resource_type="xhr")
+    settler._on_request_started(request)
+
+    async def finish_request():
+        await asyncio.sleep(0.2)
+        settler._on_request_done(request)
+
+    asyncio.create_task(finish_request())
+    waited_ms = await settler.wait()
+
+    assert waited_ms >= 200
+
+
+async def test_wait_is_bounded_by_max_timeout(quiet_page):
+    """A page that never goes quiet is released after max_wait_ms."""
+    quiet_page.evaluate.return_value = 0
+    settler = PageSettler(quiet_page, max_wait_ms=150, min_wait_ms=0)
+    await settler.attach()
+
+    waited_ms = await settler.wait()
+
+    assert 150 <= waited_ms < 400
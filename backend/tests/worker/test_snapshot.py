@@ -0,0 +1,67 @@
+# backend/tests/worker/test_snapshot.py
+from unittest.mock import AsyncMock
+
+import pytest
+
+from backend.worker.snapshot import capture_snapshot, render_snapshot
+
+pytestmark = pytest.mark.asyncio
+
+RAW_SNAPSHOT = {
+    "url": "https://shop.example.com/signup",
+    "title": "Sign up",
+    "elements": [
+        {
+            "role": "textbox",
+            "name": "Email",
+            "x": 0.5,
+            "y": 0.3,
+            "width": 0.2,
+            "height": 0.04,
+            "value": "a@b.com",
+            "disabled": False,
+        },
+        {
+            "role": "checkbox",
+            "name": "Accept terms",
+            "x": 0.41,
+            "y": 0.42,
+            "width": 0.01,
+            "height": 0.02,
+            "checked": False,
+            "disabled": False,
+        },
+        {
+            "role": "button",
+            "name": "Create account",
+            "x": 0.5,
+            "y": 0.5,
+            "width": 0.1,
+            "height": 0.05,
+            "disabled": True,
+        },
+    ],
+}
+
+
+async def test_snapshot_renders_one_line_per_element():
+    page = AsyncMock()
+    page.evaluate.return_value = RAW_SNAPSHOT
+
+    snapshot = await capture_snapshot(page, max_elements=10)
+
+    assert snapshot is not None
+    assert page.evaluate.await_args.args[1] == 10
+    assert render_snapshot(snapshot).splitlines() == [
+        "Page: Sign up (https://shop.example.com/signup)",
+        '[1] textbox "Email" at (x=0.500, y=0.300) value="a@b.com"',
+        '[2] checkbox "Accept terms" at (x=0.410, y=0.420) unchecked',
+        '[3] button "Create account" at (x=0.500, y=0.500) disabled',
+    ]
+
+
+async def test_snapshot_failure_is_not_fatal():
+    page = AsyncMock()
+    page.evaluate.side_effect = RuntimeError("Execution context was destroyed")
+
+    assert await capture_snapshot(page) is None
@@ -0,0 +1,34 @@
+import pytest
+from unittest.mock import AsyncMock
+
+from backend.worker.step_io import StepIOPipeline
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_pipeline_drains_jobs_in_order_on_exit(tmp_path):
+    """Queued publishes and writes all complete, in order, when the run ends."""
+    redis_client = AsyncMock()
+    frame_path = tmp_path / "step_1.jpeg"
+
+    async with StepIOPipeline(redis_client, max_queue_size=2) as step_io:
+        await step_io.publish("logs:run", "first")
+        await step_io.run_in_thread(frame_path.write_bytes, b"frame")
+        await step_io.publish("logs:run", "second")
+
+    assert frame_path.read_bytes() == b"frame"
+    assert [c.args[1] for c in redis_client.publish.await_args_list] == [
+        "first",
+        "second",
+    ]
+
+
+async def test_failed_job_does_not_stop_the_pipeline():
+    redis_client = AsyncMock()
+    redis_client.publish.side_effect = [ConnectionError("redis down"), None]
+
+    async with StepIOPipeline(redis_client) as step_io:
+        await step_io.publish("logs:run", "lost")
+        await step_io.publish("logs:run", "delivered")
+
+    assert redis_client.publish.await_count == 2
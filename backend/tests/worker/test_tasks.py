@@ -1,7 +1,17 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from io import BytesIO
+from types import SimpleNamespace
+
 import pytest
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
+from PIL import Image
 
 from backend.worker import tasks
+from backend.worker.checkpoints import RunCheckpoint
+from backend.worker.lanes import LANE_QUEUES, REPORT_QUEUE
+from backend.src.db.models.agent_run import FrictionPoint, RunStep
 from backend.src.services.vlm.base import VLMResponse
 
 pytestmark = pytest.mark.asyncio
@@ -20,20 +30,50 @@ def mock_playwright_page(mocker):
     return mock_page
 
 
-async def test_agent_task_async_main_loop(mocker, db_session):
-    """Integration test for the agent's main async execution loop."""
-    run_id = "test-run-id"
+@pytest.fixture
+def mock_db():
+    """A PostgresDatabase stand-in whose sessions are all one mocked session."""
+    session = AsyncMock()
+    session.add = MagicMock()
+    session.get.return_value = None
+    session.execute.return_value = MagicMock()
+
+    async def get_db_session():
+        yield session
+
+    @asynccontextmanager
+    async def get_session():
+        yield session
 
-    # 1. Mock all external dependencies
-    mocker.patch("backend.worker.tasks.async_playwright", new_callable=AsyncMock)
+    db = MagicMock()
+    db.get_db_session = get_db_session
+    db.get_session = get_session
+    db.session = session
+    return db
+
+
+@pytest.fixture
+def scout(mocker, mock_playwright_page):
+    """Mocks the browser, the VLM, storage and the report pipeline around the scout."""
+    mock_playwright_page.url = "https://loop.test/cart"
+    mock_playwright_page.screenshot.side_effect = [
+        f"screenshot_{i}".encode() for i in range(3)
+    ]
+    mock_context = AsyncMock()
+    mock_context.new_page.return_value = mock_playwright_page
+    mock_pool = mocker.patch("backend.worker.tasks.browser_pool")
+    mock_pool.context.return_value.__aenter__.return_value = mock_context
+    mock_settler = mocker.patch("backend.worker.tasks.PageSettler").return_value
+    mock_settler.attach = AsyncMock()
+    mock_settler.wait = AsyncMock(return_value=120)
     mocker.patch("backend.worker.tasks.execute_action", new_callable=AsyncMock)
-    mocker.patch("backend.worker.tasks.redis.Redis", new_callable=AsyncMock)
+    mocker.patch("backend.worker.tasks.capture_snapshot", return_value=None)
 
-    # Mock the VLM to return a sequence of actions, then terminate
-    mock_vlm = mocker.patch(
+    # The VLM clicks, types, then terminates.
+    vlm = mocker.patch(
         "backend.worker.tasks.vlm_provider.get_next_action", new_callable=AsyncMock
     )
-    mock_vlm.side_effect = [
+    responses = [
         VLMResponse(
             thought="Let's click.",
             action="click(x=0.1, y=0.1)",
@@ -53,27 +93,350 @@ async def test_agent_task_async_main_loop(mocker, db_session):
             friction_score=0,
         ),
     ]
+    vlm.side_effect = responses
+    return SimpleNamespace(
+        page=mock_playwright_page,
+        vlm=vlm,
+        responses=responses,
+        blob_write=mocker.patch("backend.worker.tasks.screenshot_store.write"),
+        save_checkpoint=mocker.patch(
+            "backend.worker.tasks.save_checkpoint", new_callable=AsyncMock
+        ),
+        clear_checkpoint=mocker.patch(
+            "backend.worker.tasks.clear_checkpoint", new_callable=AsyncMock
+        ),
+        update_status=mocker.patch(
+            "backend.worker.tasks.update_run_status", new_callable=AsyncMock
+        ),
+        enqueue_report=mocker.patch("backend.worker.tasks.REPORT_PIPELINE.enqueue"),
+    )
+
+
+async def test_agent_task_async_main_loop(scout, mock_db):
+    """Integration test for the agent's main async execution loop."""
+    run_id = "test-run-id"
+    mock_redis = AsyncMock()
+
+    await tasks.agent_task_logic(
+        run_id, "https://loop.test", "Loop test", mock_db, mock_redis
+    )
+
+    assert scout.vlm.await_count == 3
+    # Each distinct frame is stored once, and a checkpoint follows every step.
+    assert [c.args[1] for c in scout.blob_write.call_args_list] == [
+        f"screenshot_{i}".encode() for i in range(3)
+    ]
+    assert scout.save_checkpoint.await_count == 3
+    assert [len(c.args[4]) for c in scout.save_checkpoint.await_args_list] == [1, 2, 3]
+    scout.clear_checkpoint.assert_awaited_once_with(mock_redis, run_id)
+
+    assert scout.update_status.await_count == 2
+    scout.update_status.assert_any_await(mock_db.session, mock_redis, run_id, "RUNNING")
+    # Keyframes are picked inline and recorded with the status change.
+    scout.update_status.assert_any_await(
+        mock_db.session, mock_redis, run_id, "ANALYZING", keyframe_indices=[1, 2, 3]
+    )
+
+    # The report pipeline starts with the key steps in memory.
+    scout.enqueue_report.assert_called_once()
+    state = scout.enqueue_report.call_args.args[0]
+    assert state.keyframe_indices == [1, 2, 3]
+    assert [s.step for s in state.steps] == [1, 2, 3]
+
+
+async def test_checkpoint_is_cleared_only_after_the_report_pipeline_starts(
+    scout, mock_db
+):
+    order = []
+    scout.enqueue_report.side_effect = lambda state: order.append("enqueue")
+    scout.clear_checkpoint.side_effect = lambda *args: order.append("clear")
+
+    await tasks.agent_task_logic(
+        "run-1", "https://loop.test", "Loop test", mock_db, AsyncMock()
+    )
+
+    assert order == ["enqueue", "clear"]
+
+
+async def test_resumed_run_continues_after_the_checkpointed_steps(
+    scout, mock_db, mocker
+):
+    history = [
+        RunStep(
+            step=i,
+            thought="",
+            action="click(x=0.5, y=0.5)",
+            screenshot_path=f"blob:{i}.jpeg",
+            observation="",
+            friction_score=0,
+        )
+        for i in (1, 2)
+    ]
+    checkpoint = RunCheckpoint(
+        completed_steps=2,
+        url="https://loop.test/checkout",
+        storage_state={"cookies": []},
+        history=history,
+    )
+    scout.vlm.side_effect = scout.responses[1:]
+
+    await tasks.agent_task_logic(
+        "run-1",
+        "https://loop.test",
+        "Loop test",
+        mock_db,
+        AsyncMock(),
+        checkpoint=checkpoint,
+    )
 
-    # Mock the DB update function and the next actor in the chain
-    mock_update_status = mocker.patch(
-        "backend.worker.tasks.update_run_status", new_callable=AsyncMock
+    context_options = tasks.browser_pool.context.call_args.kwargs
+    assert context_options["storage_state"] == {"cookies": []}
+    scout.page.goto.assert_awaited_once_with(
+        "https://loop.test/checkout", wait_until="domcontentloaded", timeout=60000
     )
-    mock_select_keyframes = mocker.patch("backend.worker.tasks.select_keyframes.send")
+    assert scout.vlm.await_count == 2
+    state = scout.enqueue_report.call_args.args[0]
+    assert [s.step for s in state.steps] == [1, 2, 3, 4]
+
+
+@pytest.mark.parametrize("final_attempt", [False, True])
+async def test_failed_run_is_marked_failed_only_on_its_final_attempt(
+    scout, mock_db, final_attempt
+):
+    scout.vlm.side_effect = RuntimeError("VLM unreachable")
 
-    # 2. Run the task
-    # We pass a mock DB instance
-    mock_db = AsyncMock()
-    mock_db.get_db_session.return_value.__aiter__.return_value = [db_session]
+    with pytest.raises(RuntimeError):
+        await tasks.agent_task_logic(
+            "run-1",
+            "https://loop.test",
+            "Loop test",
+            mock_db,
+            AsyncMock(),
+            final_attempt=final_attempt,
+        )
+
+    statuses = [c.args[3] for c in scout.update_status.await_args_list]
+    assert statuses == (["RUNNING", "FAILED"] if final_attempt else ["RUNNING"])
+    scout.clear_checkpoint.assert_not_awaited()
+
+
+async def test_live_preview_is_downscaled_and_the_archive_is_full_size(scout, mock_db):
+    """Viewers get the small rendition; the blob store keeps the full frame."""
+    frames = []
+    for shade in (40, 120, 200):
+        buffer = BytesIO()
+        Image.new("RGB", (1920, 1080), (shade, shade, shade)).save(
+            buffer, format="JPEG", quality=70
+        )
+        frames.append(buffer.getvalue())
+    scout.page.screenshot.side_effect = frames
+    redis_client = AsyncMock()
 
     await tasks.agent_task_logic(
-        run_id, "https://loop.test", "Loop test", mock_db, AsyncMock()
+        "run-1", "https://loop.test", "Loop test", mock_db, redis_client
+    )
+
+    previews = [
+        c.args[1]
+        for c in redis_client.publish.await_args_list
+        if c.args[0] == "preview:run-1" and c.args[1] != b"END"
+    ]
+    assert len(previews) == 3
+    for preview, frame in zip(previews, frames):
+        assert preview != frame
+        assert Image.open(BytesIO(preview)).size == (
+            tasks.PREVIEW_FRAME_SPEC.max_width,
+            tasks.PREVIEW_FRAME_SPEC.max_height,
+        )
+    assert [c.args[1] for c in scout.blob_write.call_args_list] == frames
+    assert Image.open(BytesIO(frames[0])).size == (1920, 1080)
+
+
+async def test_session_resumes_from_the_saved_checkpoint(mocker):
+    checkpoint = MagicMock()
+    mocker.patch("backend.worker.tasks.listen_for_cancellation", new=AsyncMock())
+    mocker.patch(
+        "backend.worker.tasks.load_checkpoint", new=AsyncMock(return_value=checkpoint)
+    )
+    task_logic = mocker.patch(
+        "backend.worker.tasks.agent_task_logic", new_callable=AsyncMock
+    )
+    db, redis_client = MagicMock(), AsyncMock()
+
+    await tasks.agent_session_logic(
+        "run-1", "https://loop.test", "Loop test", db, redis_client, final_attempt=False
+    )
+
+    task_logic.assert_awaited_once_with(
+        "run-1",
+        "https://loop.test",
+        "Loop test",
+        db,
+        redis_client,
+        checkpoint=checkpoint,
+        final_attempt=False,
+    )
+
+
+def make_admission(acquired=True, claimed=True, woken=()):
+    admission = MagicMock(run_id="run-1")
+    admission.acquire = AsyncMock(return_value=acquired)
+    admission.claim = AsyncMock(return_value=claimed)
+    admission.park = AsyncMock()
+    admission.release = AsyncMock(return_value=list(woken))
+    return admission
+
+
+async def test_run_over_its_caps_is_parked_with_a_backoff_retry(mocker):
+    enqueue = mocker.patch("backend.worker.tasks.enqueue_scout")
+    mocker.patch.object(tasks.settings, "RUN_ADMISSION_RETRY_DELAY_SECONDS", 10)
+    mocker.patch.object(tasks.settings, "RUN_ADMISSION_MAX_RETRY_DELAY_SECONDS", 60)
+    admission = make_admission(acquired=False)
+
+    for attempt in (0, 1, 5):
+        assert not await tasks.admit_scout(
+            admission, "https://a.test", "Buy", "user-1", "standard", None, attempt
+        )
+
+    delays = [c.kwargs["delay_ms"] for c in enqueue.call_args_list]
+    assert 5_000 <= delays[0] <= 10_000
+    assert 10_000 <= delays[1] <= 20_000
+    assert 30_000 <= delays[2] <= 60_000
+    token, payload = admission.park.await_args_list[0].args
+    assert enqueue.call_args_list[0].kwargs == {
+        **json.loads(payload),
+        "delay_ms": delays[0],
+        "admission_token": token,
+    }
+    assert json.loads(payload)["admission_attempt"] == 1
+
+
+async def test_retry_of_an_already_woken_run_is_dropped(mocker):
+    enqueue = mocker.patch("backend.worker.tasks.enqueue_scout")
+    admission = make_admission(claimed=False)
+
+    assert not await tasks.admit_scout(
+        admission, "https://a.test", "Buy", "user-1", "standard", "stale-token"
+    )
+
+    admission.claim.assert_awaited_once_with("stale-token")
+    admission.acquire.assert_not_awaited()
+    enqueue.assert_not_called()
+
+
+async def test_releasing_a_run_wakes_the_runs_parked_behind_it(mocker):
+    enqueue = mocker.patch("backend.worker.tasks.enqueue_scout")
+    woken = {"run_id": "run-2", "target_url": "https://a.test", "lane": "standard"}
+
+    await tasks.release_admission(make_admission(woken=[json.dumps(woken)]))
+
+    enqueue.assert_called_once_with(**woken)
+
+
+async def test_session_holds_no_worker_slot_until_admitted(mocker):
+    mocker.patch(
+        "backend.worker.tasks.run_admission", return_value=make_admission(False)
+    )
+    mocker.patch("backend.worker.tasks.enqueue_scout")
+    supervise = mocker.patch.object(tasks.run_supervisor, "supervise")
+    lease = mocker.patch("backend.worker.tasks.RunLease")
+
+    await tasks.scout_session(
+        "run-1", "https://a.test", "Buy", "user-1", "standard", final_attempt=True
+    )
+
+    lease.assert_not_called()
+    supervise.assert_not_called()
+
+
+async def test_enqueue_scouts_sends_one_message_per_run(mocker):
+    broker = tasks.run_churninator_agent.broker
+    enqueue_many = mocker.patch.object(broker, "enqueue_many")
+
+    tasks.enqueue_scouts(
+        [("run-1", "https://a.test", "Buy"), ("run-2", "https://b.test", "Sell")],
+        owner_id="user-1",
+    )
+
+    [messages] = enqueue_many.call_args.args
+    assert [m.args for m in messages] == [
+        ("run-1", "https://a.test", "Buy"),
+        ("run-2", "https://b.test", "Sell"),
+    ]
+    assert {m.queue_name for m in messages} == {tasks.run_churninator_agent.queue_name}
+    assert all(m.kwargs == {"owner_id": "user-1"} for m in messages)
+
+
+async def test_only_the_last_retry_is_the_final_attempt(mocker):
+    actor = tasks.run_churninator_agent
+    message = MagicMock(options={})
+    current = mocker.patch(
+        "backend.worker.tasks.CurrentMessage.get_current_message",
+        return_value=message,
+    )
+
+    assert not tasks.is_final_attempt(actor)
+    message.options["retries"] = actor.options["max_retries"]
+    assert tasks.is_final_attempt(actor)
+    current.return_value = None
+    assert tasks.is_final_attempt(actor)
+
+
+async def test_report_actors_are_kept_off_the_browser_queues():
+    """Report generation is consumed by its own workers, never by scout workers."""
+    for actor in (
+        tasks.select_keyframes,
+        tasks.generate_final_report,
+        tasks.generate_design_report,
+    ):
+        assert actor.queue_name == REPORT_QUEUE
+    assert REPORT_QUEUE not in LANE_QUEUES.values()
+    assert {a.queue_name for a in tasks.SCOUT_ACTORS.values()} == set(
+        LANE_QUEUES.values()
     )
 
-    # 3. Assert the outcomes
-    assert mock_vlm.call_count == 3
-    assert mock_update_status.call_count == 2
-    mock_update_status.assert_any_await(db_session, run_id, "RUNNING")
-    mock_update_status.assert_any_await(db_session, run_id, "ANALYZING")
 
-    # Assert that the next phase (keyframe selection) was triggered
-    mock_select_keyframes.assert_called_once_with(run_id)
+async def test_after_images_run_concurrently_and_tolerate_failures(mocker, tmp_path):
+    """One failed or slow redesign leaves the others in place, in order."""
+    mocker.patch.object(tasks.settings, "DESIGN_IMAGE_CONCURRENCY", 2)
+    mocker.patch.object(tasks.settings, "DESIGN_IMAGE_TIMEOUT_SECONDS", 0.5)
+    running, peak = 0, 0
+
+    async def render(before_path, recommendation, after_path):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            await asyncio.sleep(1 if recommendation == "slow" else 0.05)
+            if recommendation == "broken":
+                raise ValueError("no image returned")
+        finally:
+            running -= 1
+
+    mocker.patch("backend.worker.tasks.render_after_image", side_effect=render)
+    recommendations = ["fine", "broken", "slow", "fine"]
+    points = [
+        FrictionPoint(
+            step=i,
+            screenshot_path="",
+            description="",
+            recommendation=recommendation,
+        )
+        for i, recommendation in enumerate(recommendations, 1)
+    ]
+    before_paths = {}
+    for point in points:
+        before_paths[point.step] = tmp_path / f"before_{point.step}.jpeg"
+        before_paths[point.step].write_bytes(b"jpeg")
+    redis_client = AsyncMock()
+
+    pairs = await tasks.generate_after_images(
+        "run-1", redis_client, points, before_paths, tmp_path
+    )
+
+    assert pairs == [
+        ("step_1.jpeg", "after_1.png"),
+        ("step_4.jpeg", "after_4.png"),
+    ]
+    assert peak == 2
+    assert redis_client.publish.await_count == 2
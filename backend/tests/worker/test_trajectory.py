@@ -0,0 +1,43 @@
+# backend/tests/worker/test_trajectory.py
+from backend.worker.trajectory import TrajectoryMonitor
+
+
+def test_repeated_action_nudges_then_stops():
+    monitor = TrajectoryMonitor(repeat_threshold=3, patience=1)
+    verdicts = [monitor.observe("click(x=0.5, y=0.5)", f"screen-{i}") for i in range(5)]
+
+    assert verdicts[:2] == [None, None]
+    assert verdicts[2] is not None and verdicts[2].kind == "nudge"
+    assert verdicts[3] is not None and verdicts[3].kind == "stop"
+    assert "click(x=0.5, y=0.5)" in verdicts[3].reason
+
+
+def test_unchanged_screen_is_flagged_unless_waiting():
+    monitor = TrajectoryMonitor(repeat_threshold=3)
+    actions = ["scroll(direction='down')", "scroll(direction='up')", "press('End')"]
+
+    verdicts = [monitor.observe(action, "cart") for action in actions]
+    assert verdicts[-1] is not None
+    assert "not changed" in verdicts[-1].reason
+
+    waiting = TrajectoryMonitor(repeat_threshold=3)
+    assert all(
+        waiting.observe("wait()", "cart", waiting=True) is None for _ in range(3)
+    )
+
+
+def test_oscillation_between_two_screens():
+    monitor = TrajectoryMonitor()
+    screens = ["home", "cart", "home", "cart"]
+    verdicts = [monitor.observe(f"action({i})", h) for i, h in enumerate(screens)]
+
+    assert verdicts[-1] is not None
+    assert "Oscillating" in verdicts[-1].reason
+
+
+def test_clean_step_resets_escalation():
+    monitor = TrajectoryMonitor(repeat_threshold=2, patience=1)
+    monitor.observe("click(1)", "a")
+    assert monitor.observe("click(1)", "b").kind == "nudge"  # type: ignore[union-attr]
+    assert monitor.observe("type('hello')", "c") is None
+    assert monitor.observe("type('hello')", "d").kind == "nudge"  # type: ignore[union-attr]
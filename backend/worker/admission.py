@@ -0,0 +1,157 @@
+# backend/worker/admission.py
+import time
+from typing import Optional
+
+import redis.asyncio as redis
+
+# KEYS are the slot sets to join; ARGV is (now_ms, expires_at_ms, run_id,
+# ttl_ms, limit per key...). A run already holding its slots is re-admitted.
+ACQUIRE_SLOTS_SCRIPT = """
+local now, expires_at, member, ttl = tonumber(ARGV[1]), ARGV[2], ARGV[3], ARGV[4]
+for i, key in ipairs(KEYS) do
+    redis.call("zremrangebyscore", key, "-inf", now)
+    if not redis.call("zscore", key, member)
+        and redis.call("zcard", key) >= tonumber(ARGV[4 + i]) then
+        return 0
+    end
+end
+for _, key in ipairs(KEYS) do
+    redis.call("zadd", key, expires_at, member)
+    redis.call("pexpire", key, ttl)
+end
+return 1
+"""
+
+# A parked run stays parked well past any retry delay, so its fallback retry
+# can always tell whether a freed slot woke it in the meantime.
+PARKED_TTL_MS = 24 * 60 * 60 * 1000
+
+# KEYS are the run's slot sets and its parked entry; ARGV is (now_ms, run_id,
+# token, payload, ttl_ms). The run queues behind every cap it is subject to.
+PARK_SCRIPT = """
+local parked = KEYS[#KEYS]
+redis.call("hset", parked, "token", ARGV[3], "payload", ARGV[4])
+redis.call("pexpire", parked, ARGV[5])
+for i = 1, #KEYS - 1 do
+    redis.call("zadd", KEYS[i] .. ":waiting", ARGV[1], ARGV[2])
+    redis.call("pexpire", KEYS[i] .. ":waiting", ARGV[5])
+end
+"""
+
+# KEYS are the run's parked entry; ARGV is (token). Unparks the run only if
+# it was parked with this token, i.e. it has not been woken or parked again.
+CLAIM_SCRIPT = """
+if redis.call("hget", KEYS[1], "token") == ARGV[1] then
+    redis.call("del", KEYS[1])
+    return 1
+end
+return 0
+"""
+
+# KEYS are the slot sets to leave; ARGV is (run_id, parked key prefix). Each
+# freed slot wakes the longest-waiting run still parked behind that cap.
+RELEASE_SLOTS_SCRIPT = """
+local woken = {}
+for _, key in ipairs(KEYS) do
+    redis.call("zrem", key, ARGV[1])
+    while true do
+        local popped = redis.call("zpopmin", key .. ":waiting")
+        if #popped == 0 then
+            break
+        end
+        local parked = ARGV[2] .. popped[1]
+        local payload = redis.call("hget", parked, "payload")
+        if payload then
+            redis.call("del", parked)
+            table.insert(woken, payload)
+            break
+        end
+    end
+end
+return woken
+"""
+
+
+class RunAdmission:
+    """
+    Caps how many runs execute at once per target domain and per user.
+
+    Each cap is a Redis sorted set of the run ids holding a slot, scored by when
+    the slot expires. Slots are taken atomically across both sets, or not at all.
+    A slot outlives the run's time limit, so a worker that dies without
+    releasing it only blocks the slot until it expires. A limit of 0 disables
+    that cap.
+
+    A run turned away is parked in a waiting set per cap with an opaque
+    payload; releasing a slot hands back the payload of the run to wake.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        run_id: str,
+        domain: Optional[str],
+        owner_id: Optional[str],
+        max_per_domain: int,
+        max_per_user: int,
+        ttl_seconds: int,
+    ):
+        self.redis_client = redis_client
+        self.run_id = run_id
+        self.ttl_ms = ttl_seconds * 1000
+        self.parked_key = f"admission:parked:{run_id}"
+        self.limits: dict[str, int] = {}
+        if domain and max_per_domain > 0:
+            self.limits[f"admission:domain:{domain}"] = max_per_domain
+        if owner_id and max_per_user > 0:
+            self.limits[f"admission:user:{owner_id}"] = max_per_user
+
+    async def acquire(self) -> bool:
+        """Takes a slot under every cap. Returns False if any cap is full."""
+        if not self.limits:
+            return True
+        now_ms = int(time.time() * 1000)
+        admitted = await self.redis_client.eval(
+            ACQUIRE_SLOTS_SCRIPT,
+            len(self.limits),
+            *self.limits.keys(),
+            now_ms,
+            now_ms + self.ttl_ms,
+            self.run_id,
+            self.ttl_ms,
+            *self.limits.values(),
+        )
+        return bool(admitted)
+
+    async def park(self, token: str, payload: str):
+        """Queues the run behind its caps until a slot frees or `claim` is called."""
+        await self.redis_client.eval(
+            PARK_SCRIPT,
+            len(self.limits) + 1,
+            *self.limits.keys(),
+            self.parked_key,
+            int(time.time() * 1000),
+            self.run_id,
+            token,
+            payload,
+            PARKED_TTL_MS,
+        )
+
+    async def claim(self, token: str) -> bool:
+        """Unparks the run if it is still parked under `token`."""
+        return bool(
+            await self.redis_client.eval(CLAIM_SCRIPT, 1, self.parked_key, token)
+        )
+
+    async def release(self) -> list[str]:
+        """Frees the run's slots. Returns the payloads of the parked runs woken."""
+        if not self.limits:
+            return []
+        woken = await self.redis_client.eval(
+            RELEASE_SLOTS_SCRIPT,
+            len(self.limits),
+            *self.limits.keys(),
+            self.run_id,
+            "admission:parked:",
+        )
+        return [p.decode() if isinstance(p, bytes) else p for p in woken or []]
@@ -1,9 +1,59 @@
+import uuid
+
 import dramatiq
+from dramatiq import Message
 from dramatiq.brokers.redis import RedisBroker
+from dramatiq.common import current_millis
+from dramatiq.middleware import CurrentMessage
 from backend.src.core.settings import get_settings
+from backend.worker.runtime import WorkerRuntimeMiddleware
+from backend.worker.lanes import QueueWaitMetrics
+
+
+class PipelinedRedisBroker(RedisBroker):
+    """A RedisBroker that can also enqueue a batch of messages in one round trip."""
+
+    def enqueue_many(self, messages: list[Message]) -> list[Message]:
+        """
+        Enqueues undelayed messages as `enqueue` does, but sends every
+        dispatch call in a single Redis pipeline.
+        """
+        dispatch = self.scripts["dispatch"]
+        enqueued = []
+        with self.client.pipeline(transaction=False) as pipe:
+            for message in messages:
+                # Each enqueued message needs its own id in Redis, see `enqueue`.
+                message = message.copy(options={"redis_message_id": str(uuid.uuid4())})
+                self.emit_before("enqueue", message, None)
+                dispatch(
+                    keys=[self.namespace],
+                    args=[
+                        "enqueue",
+                        current_millis(),
+                        message.queue_name,
+                        self.broker_id,
+                        self.heartbeat_timeout,
+                        self.dead_message_ttl,
+                        self._should_do_maintenance("enqueue"),
+                        self._max_unpack_size(),
+                        message.options["redis_message_id"],
+                        message.encode(),
+                    ],
+                    client=pipe,
+                )
+                enqueued.append(message)
+            pipe.execute()
+        for message in enqueued:
+            self.emit_after("enqueue", message, None)
+        return enqueued
+
 
 # Configure the Redis broker
-redis_broker = RedisBroker(
+redis_broker = PipelinedRedisBroker(
     host=get_settings().REDIS_HOST, port=get_settings().REDIS_PORT
 )
+redis_broker.add_middleware(WorkerRuntimeMiddleware())
+# Lets scout actors tell a retryable attempt from the final one.
+redis_broker.add_middleware(CurrentMessage())
+redis_broker.add_middleware(QueueWaitMetrics())
 dramatiq.set_broker(redis_broker)
@@ -0,0 +1,140 @@
+# backend/worker/browser_pool.py
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+
+from playwright.async_api import Browser, BrowserContext, Playwright, async_playwright
+
+from backend.src.core.settings import get_settings
+
+settings = get_settings()
+
+
+class PooledBrowser:
+    """A warm Chromium instance and the bookkeeping needed to recycle it."""
+
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.contexts_served = 0
+        self.active_contexts = 0
+        self.retiring = False
+
+    @property
+    def is_healthy(self) -> bool:
+        return self.browser.is_connected() and not self.retiring
+
+
+class BrowserPool:
+    """
+    A long-lived, per-process pool of warm Chromium browsers.
+
+    Each run leases a fresh, isolated BrowserContext from one of the pooled
+    browsers instead of launching Chromium from scratch. A browser is retired
+    once it has served `max_contexts_per_browser` contexts or as soon as it
+    disconnects (crash), and a replacement is launched on demand.
+
+    The pool is bound to the event loop it is started on, so it must only be
+    used from the worker's long-lived loop (see `backend.worker.runtime`).
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_contexts_per_browser: int = 20,
+        headless: bool = True,
+    ):
+        self.size = size
+        self.max_contexts_per_browser = max_contexts_per_browser
+        self.headless = headless
+        self._playwright: Optional[Playwright] = None
+        self._browsers: list[PooledBrowser] = []
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        """Starts Playwright and pre-launches the configured number of browsers."""
+        async with self._lock:
+            if self._playwright is not None:
+                return
+            self._playwright = await async_playwright().start()
+            while len(self._browsers) < self.size:
+                self._browsers.append(await self._launch())
+        print(
+            f"🌐 [BROWSER POOL] Warmed up {len(self._browsers)} Chromium instance(s)."
+        )
+
+    async def _launch(self) -> PooledBrowser:
+        assert self._playwright is not None
+        browser = await self._playwright.chromium.launch(headless=self.headless)
+        pooled = PooledBrowser(browser)
+        # A crashed browser is retired immediately so no new contexts land on it.
+        browser.on("disconnected", lambda _: setattr(pooled, "retiring", True))
+        return pooled
+
+    async def _acquire(self) -> PooledBrowser:
+        """Picks the least-loaded healthy browser, launching one if needed."""
+        async with self._lock:
+            self._browsers = [
+                b for b in self._browsers if b.is_healthy or b.active_contexts > 0
+            ]
+            healthy = [b for b in self._browsers if b.is_healthy]
+            if len(healthy) < self.size:
+                pooled = await self._launch()
+                self._browsers.append(pooled)
+                healthy.append(pooled)
+            pooled = min(healthy, key=lambda b: b.active_contexts)
+            pooled.contexts_served += 1
+            pooled.active_contexts += 1
+            if pooled.contexts_served >= self.max_contexts_per_browser:
+                pooled.retiring = True
+            return pooled
+
+    async def _release(self, pooled: PooledBrowser):
+        async with self._lock:
+            pooled.active_contexts -= 1
+            should_close = pooled.retiring and pooled.active_contexts == 0
+            if should_close and pooled in self._browsers:
+                self._browsers.remove(pooled)
+        if should_close and pooled.browser.is_connected():
+            print("♻️ [BROWSER POOL] Recycling a retired Chromium instance.")
+            await pooled.browser.close()
+
+    @asynccontextmanager
+    async def context(self, **context_options: Any) -> AsyncIterator[BrowserContext]:
+        """Leases a fresh, isolated BrowserContext from a warm browser."""
+        await self.start()
+        pooled = await self._acquire()
+        browser_context = None
+        try:
+            try:
+                browser_context = await pooled.browser.new_context(**context_options)
+            except Exception:
+                # The browser died between health check and use; never reuse it.
+                pooled.retiring = True
+                raise
+            yield browser_context
+        finally:
+            if browser_context is not None:
+                try:
+                    await browser_context.close()
+                except Exception as e:
+                    print(f"⚠️ [BROWSER POOL] Failed to close context cleanly: {e}")
+                    pooled.retiring = True
+            await self._release(pooled)
+
+    async def close(self):
+        """Closes every pooled browser and stops Playwright."""
+        for pooled in self._browsers:
+            if pooled.browser.is_connected():
+                await pooled.browser.close()
+        self._browsers = []
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        print("🧹 [BROWSER POOL] All Chromium instances closed.")
+
+
+browser_pool = BrowserPool(
+    size=settings.BROWSER_POOL_SIZE,
+    max_contexts_per_browser=settings.BROWSER_MAX_CONTEXTS_PER_BROWSER,
+    headless=settings.BROWSER_HEADLESS,
+)
@@ -0,0 +1,143 @@
+# backend/worker/checkpoints.py
+import asyncio
+import time
+import uuid
+from typing import Any, Callable, Optional
+
+import redis.asyncio as redis
+from playwright.async_api import BrowserContext
+from pydantic import BaseModel, ValidationError
+
+from backend.src.db.models.agent_run import RunStep
+
+
+class RunCheckpoint(BaseModel):
+    """Everything a worker needs to resume a scout run after its last completed step."""
+
+    completed_steps: int
+    url: str
+    storage_state: dict[str, Any]
+    history: list[RunStep]
+
+
+def checkpoint_key(run_id: str) -> str:
+    return f"checkpoint:{run_id}"
+
+
+async def save_checkpoint(
+    redis_client: redis.Redis,
+    run_id: str,
+    context: BrowserContext,
+    url: str,
+    history: list[RunStep],
+    ttl_seconds: int,
+):
+    """Snapshots the browser storage state and run history into Redis."""
+    checkpoint = RunCheckpoint(
+        completed_steps=len(history),
+        url=url,
+        storage_state=dict(await context.storage_state()),
+        history=history,
+    )
+    await redis_client.set(
+        checkpoint_key(run_id), checkpoint.model_dump_json(), ex=ttl_seconds
+    )
+
+
+async def load_checkpoint(
+    redis_client: redis.Redis, run_id: str
+) -> Optional[RunCheckpoint]:
+    """Returns the run's last checkpoint, or None if there is no usable one."""
+    raw = await redis_client.get(checkpoint_key(run_id))
+    if not raw:
+        return None
+    try:
+        return RunCheckpoint.model_validate_json(raw)
+    except ValidationError as e:
+        print(f"⚠️ [CHECKPOINT] Ignoring corrupt checkpoint for {run_id}: {e}")
+        return None
+
+
+async def clear_checkpoint(redis_client: redis.Redis, run_id: str):
+    await redis_client.delete(checkpoint_key(run_id))
+
+
+# Only the lease holder may extend or release it.
+RENEW_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class RunLease:
+    """
+    A Redis lease guaranteeing that only one worker executes a run at a time.
+
+    The lease expires after `ttl_seconds` unless renewed, so a crashed worker
+    never blocks a retry for longer than that. While held, it is renewed in
+    the background every third of its TTL; a Redis error only skips one
+    renewal. Once the lease is lost (it was taken over, or it expired while
+    Redis was unreachable) `lost` is set and `on_lost` is called, so the run
+    can be stopped before two workers drive it.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        run_id: str,
+        ttl_seconds: int = 60,
+        on_lost: Optional[Callable[[], Any]] = None,
+    ):
+        self.redis_client = redis_client
+        self.key = f"lease:{run_id}"
+        self.ttl_ms = ttl_seconds * 1000
+        self.token = uuid.uuid4().hex
+        self.on_lost = on_lost
+        self.lost = False
+        self._renewer: Optional[asyncio.Task] = None
+
+    async def acquire(self) -> bool:
+        acquired = await self.redis_client.set(
+            self.key, self.token, nx=True, px=self.ttl_ms
+        )
+        if acquired:
+            self._renewer = asyncio.create_task(self._renew_forever())
+        return bool(acquired)
+
+    async def _renew_forever(self):
+        renewed_at = time.monotonic()
+        while True:
+            await asyncio.sleep(self.ttl_ms / 3000)
+            try:
+                renewed = await self.redis_client.eval(
+                    RENEW_LEASE_SCRIPT, 1, self.key, self.token, self.ttl_ms
+                )
+            except redis.RedisError as e:
+                if (time.monotonic() - renewed_at) * 1000 < self.ttl_ms:
+                    print(f"⚠️ [CHECKPOINT] Could not renew lease {self.key}: {e}")
+                    continue
+                renewed = 0  # It has expired by now.
+            if not renewed:
+                print(
+                    f"⚠️ [CHECKPOINT] Lost lease {self.key}; another worker may take over."
+                )
+                self.lost = True
+                if self.on_lost is not None:
+                    self.on_lost()
+                return
+            renewed_at = time.monotonic()
+
+    async def release(self):
+        if self._renewer is not None:
+            self._renewer.cancel()
+            self._renewer = None
+        await self.redis_client.eval(RELEASE_LEASE_SCRIPT, 1, self.key, self.token)
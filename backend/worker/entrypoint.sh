@@ -3,11 +3,45 @@ set -e
 
 echo "--- Churninator Worker Entrypoint ---"
 
-echo "[1/2] Starting virtual display (Xvfb) on display :99..."
-Xvfb :99 -screen 0 1920x1080x24 &
-export DISPLAY=:99
-sleep 2
+# WORKER_ROLE picks the queues this worker consumes (queue names: lanes.py):
+#   browser - scout runs (default, runs_priority); CPU/RAM heavy, needs Xvfb
+#   reports - keyframes and Gemini report generation; mostly waits on the network
+#   all     - everything (default, for local development)
+WORKER_ROLE=${WORKER_ROLE:-all}
 
-echo "[2/2] Launching Dramatiq worker..."
+case "$WORKER_ROLE" in
+  browser)
+    QUEUES="default runs_priority"
+    PROCESSES=${WORKER_BROWSER_PROCESSES:-${WORKER_PROCESSES:-2}}
+    THREADS=${WORKER_BROWSER_THREADS:-${WORKER_THREADS:-8}}
+    ;;
+  reports)
+    QUEUES="reports"
+    PROCESSES=${WORKER_REPORT_PROCESSES:-1}
+    THREADS=${WORKER_REPORT_THREADS:-32}
+    ;;
+  all)
+    QUEUES=""
+    PROCESSES=${WORKER_PROCESSES:-4}
+    THREADS=${WORKER_THREADS:-8}
+    ;;
+  *)
+    echo "Unknown WORKER_ROLE '$WORKER_ROLE' (expected browser, reports or all)." >&2
+    exit 1
+    ;;
+esac
+
+if [ "$WORKER_ROLE" != "reports" ]; then
+  echo "[1/2] Starting virtual display (Xvfb) on display :99..."
+  Xvfb :99 -screen 0 1920x1080x24 &
+  export DISPLAY=:99
+  sleep 2
+else
+  echo "[1/2] Report worker: no browser, skipping the virtual display."
+fi
+
+echo "[2/2] Launching Dramatiq worker (role: $WORKER_ROLE)..."
 # Use `uv run` to execute the command within the virtual environment
-exec uv run dramatiq -p 4 -t 4 worker.broker worker.tasks
+# Threads only wait on the shared event loop, where runs are multiplexed, so
+# they are cheap; keep browser threads at or above WORKER_MAX_CONCURRENT_RUNS.
+exec uv run dramatiq -p "$PROCESSES" -t "$THREADS" worker.broker worker.tasks ${QUEUES:+--queues $QUEUES}
@@ -0,0 +1,101 @@
+# backend/worker/frames.py
+from io import BytesIO
+from typing import Optional
+from PIL import Image
+
+from backend.src.services.vlm.base import FrameSpec
+
+
+def dhash(image_bytes: bytes, hash_size: int = 8) -> Optional[int]:
+    """
+    Computes a difference hash (dHash) of an encoded image.
+
+    The image is reduced to a (hash_size + 1) x hash_size grayscale thumbnail
+    and each bit records whether a pixel is brighter than its right neighbour.
+    Visually identical frames (even after JPEG re-encoding) hash to the same or
+    nearly the same value. Returns None if the bytes cannot be decoded.
+    """
+    try:
+        with Image.open(BytesIO(image_bytes)) as image:
+            image.draft("L", (hash_size * 8, hash_size * 8))  # fast JPEG downscale
+            pixels = (
+                image.convert("L")
+                .resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR)
+                .tobytes()
+            )
+    except Exception:
+        return None
+
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | int(left > right)
+    return value
+
+
+class FrameComparator:
+    """
+    Tracks the last frame seen by the scout and reports whether a new frame is
+    unchanged. Frames are compared by an exact content key (the screenshot's
+    digest), not by perceptual hash: small but meaningful feedback such as a
+    validation message, a toast or a ticked checkbox must count as a change.
+    """
+
+    def __init__(self):
+        self._previous_key: Optional[str] = None
+
+    def is_unchanged(self, frame_key: Optional[str]) -> bool:
+        """Compares against the previous frame, then remembers this one."""
+        previous, self._previous_key = self._previous_key, frame_key
+        if previous is None or frame_key is None:
+            return False
+        return previous == frame_key
+
+
+def prepare_model_frame(image_bytes: bytes, spec: FrameSpec) -> bytes:
+    """
+    Produces a rendition of the archived screenshot, such as the frame sent to
+    the model or the live preview.
+
+    Applies the spec's optional crop, downscales to fit within its max size
+    (never upscaling) and re-encodes with its format and quality. The archived
+    full-resolution screenshot is left untouched. If the screenshot already
+    matches the spec it is returned as is, without a re-encode.
+    """
+    try:
+        with Image.open(BytesIO(image_bytes)) as image:
+            fits = image.width <= spec.max_width and image.height <= spec.max_height
+            if fits and not spec.crop and image.format == spec.format.upper():
+                return image_bytes
+
+            frame = image
+            if spec.crop:
+                left, top, right, bottom = spec.crop
+                frame = image.crop(
+                    (
+                        round(left * image.width),
+                        round(top * image.height),
+                        round(right * image.width),
+                        round(bottom * image.height),
+                    )
+                )
+            frame = frame.convert("RGB")
+            frame.thumbnail((spec.max_width, spec.max_height), Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            frame.save(buffer, format=spec.format.upper(), quality=spec.quality)
+            return buffer.getvalue()
+    except Exception as e:
+        print(f"⚠️ [FRAMES] Could not prepare model frame, sending original: {e}")
+        return image_bytes
+
+
+def to_viewport_coordinates(
+    x: float, y: float, crop: Optional[tuple[float, float, float, float]]
+) -> tuple[float, float]:
+    """Maps normalized coordinates within a cropped frame back to the full viewport."""
+    if not crop:
+        return x, y
+    left, top, right, bottom = crop
+    return left + x * (right - left), top + y * (bottom - top)
@@ -0,0 +1,68 @@
+# backend/worker/history.py
+from typing import Callable
+
+from backend.src.db.models.agent_run import RunStep
+
+SUMMARY_OBSERVATION_CHARS = 80
+
+
+def render_verbatim(step: RunStep) -> str:
+    return f"Step {step.step}: Thought: {step.thought}\nAction: {step.action}"
+
+
+def render_folded(step: RunStep) -> str:
+    """One compact line per older step: what was done and what was on screen."""
+    observation = step.observation.strip().replace("\n", " ")
+    if len(observation) > SUMMARY_OBSERVATION_CHARS:
+        observation = observation[: SUMMARY_OBSERVATION_CHARS - 1] + "…"
+    line = f"Step {step.step}: {step.action}"
+    return f"{line} (screen: {observation})" if observation else line
+
+
+class MissionHistory:
+    """
+    Renders the agent's mission history within a fixed token budget.
+
+    The last `verbatim_steps` steps are kept in full (thought and action). Older
+    steps are folded into a rolling summary of one line each. If the result is
+    still over budget, the oldest summary lines are dropped first, then the
+    verbatim window shrinks, so the prompt stays bounded however long the run.
+    """
+
+    def __init__(
+        self,
+        count_tokens: Callable[[str], int],
+        token_budget: int = 1500,
+        verbatim_steps: int = 4,
+    ):
+        self.count_tokens = count_tokens
+        self.token_budget = token_budget
+        self.verbatim_steps = verbatim_steps
+
+    def render(self, steps: list[RunStep]) -> str:
+        verbatim_count = min(self.verbatim_steps, len(steps))
+        while True:
+            split = len(steps) - verbatim_count
+            summary = [render_folded(s) for s in steps[:split]]
+            recent = [render_verbatim(s) for s in steps[split:]]
+
+            while summary and not self._fits(summary, recent, split):
+                summary.pop(0)
+            if self._fits(summary, recent, split) or verbatim_count <= 1:
+                return self._join(summary, recent, split)
+            verbatim_count -= 1
+
+    def _join(self, summary: list[str], recent: list[str], folded: int) -> str:
+        parts = []
+        omitted = folded - len(summary)
+        if omitted:
+            parts.append(f"({omitted} earlier steps omitted)")
+        if summary:
+            parts.append("Summary of earlier steps:\n" + "\n".join(summary))
+        parts.extend(recent)
+        return "\n".join(parts)
+
+    def _fits(self, summary: list[str], recent: list[str], folded: int) -> bool:
+        return (
+            self.count_tokens(self._join(summary, recent, folded)) <= self.token_budget
+        )
@@ -0,0 +1,157 @@
+# backend/worker/keyframes.py
+import math
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Optional, Sequence
+
+from backend.src.db.models.agent_run import RunStep
+from backend.src.services.vlm.base import FrameSpec
+from backend.worker.frames import dhash, prepare_model_frame
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Side of the dHash grid kept per step (see frames.dhash). At 16x16 = 256 bits
+# it tells apart screens that differ only in a dialog or an inline error.
+FRAME_HASH_SIZE = 16
+FRAME_HASH_BITS = FRAME_HASH_SIZE**2
+
+# Below this, a keyframe is no longer legible to the analyst.
+MIN_KEYFRAME_WIDTH = 480
+
+
+def derivative_path(source: Path, spec: FrameSpec) -> Path:
+    """Where the rendition of `source` for `spec` is kept, next to the source."""
+    tag = f"{spec.max_width}x{spec.max_height}q{spec.quality}"
+    return source.with_name(f"{source.stem}.{tag}.{spec.format}")
+
+
+def load_derivative(source: Path, spec: FrameSpec) -> bytes:
+    """
+    Returns the rendition of `source` for `spec`, preparing and storing it on
+    first use. Only one full-size image is decoded at a time.
+    """
+    path = derivative_path(source, spec)
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        pass
+    data = prepare_model_frame(source.read_bytes(), spec)
+    tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(path)
+    return data
+
+
+def shrink(spec: FrameSpec, factor: float) -> FrameSpec:
+    """Scales a spec's dimensions down by `factor`, keeping the aspect ratio."""
+    return spec.model_copy(
+        update={
+            "max_width": int(spec.max_width * factor),
+            "max_height": int(spec.max_height * factor),
+        }
+    )
+
+
+def prepare_keyframes(
+    sources: Iterable[Path], spec: FrameSpec, budget_bytes: int, max_rounds: int = 3
+) -> tuple[list[bytes], FrameSpec]:
+    """
+    Prepares compact renditions of the keyframe screenshots, one per unique
+    existing file, in order. If together they exceed `budget_bytes`, all are
+    re-prepared at a smaller size (area scales roughly with bytes) for up to
+    `max_rounds` more rounds. Returns the frames and the spec they match.
+    """
+    unique = [p for p in dict.fromkeys(sources) if p.exists()]
+    frames = [load_derivative(p, spec) for p in unique]
+    for _ in range(max_rounds):
+        total = sum(len(f) for f in frames)
+        if total <= budget_bytes or spec.max_width <= MIN_KEYFRAME_WIDTH:
+            break
+        factor = max(
+            math.sqrt(budget_bytes / total) * 0.9, MIN_KEYFRAME_WIDTH / spec.max_width
+        )
+        spec = shrink(spec, factor)
+        frames = [load_derivative(p, spec) for p in unique]
+    return frames, spec
+
+
+def frame_signature(image_bytes: bytes) -> Optional[str]:
+    """A step's frame hash as hex, or None if the frame cannot be decoded."""
+    value = dhash(image_bytes, hash_size=FRAME_HASH_SIZE)
+    return None if value is None else f"{value:0{FRAME_HASH_BITS // 4}x}"
+
+
+def pairwise_novelty(hashes: Sequence[Optional[str]]) -> "np.ndarray":
+    """
+    Normalized Hamming distances (0 = same screen, 1 = every bit differs)
+    between all pairs of hex frame hashes, computed in one vectorized pass.
+    A frame without a hash, or with one of another size (recorded before the
+    hash grew), counts as fully novel against every other frame.
+    """
+    # Imported here so the API, which imports the worker tasks only to
+    # enqueue them, does not need numpy.
+    import numpy as np
+
+    width = FRAME_HASH_BITS // 4
+    known = np.array([h is not None and len(h) == width for h in hashes])
+    values = np.frombuffer(
+        b"".join(
+            bytes.fromhex(h) if ok and h else bytes(width // 2)
+            for h, ok in zip(hashes, known)
+        ),
+        dtype=np.uint8,
+    ).reshape(len(hashes), width // 2)
+    distances = np.bitwise_count(values[:, None, :] ^ values[None, :, :])
+    distances = distances.sum(axis=2) / FRAME_HASH_BITS
+    distances[~(known[:, None] & known[None, :])] = 1.0
+    np.fill_diagonal(distances, 0.0)
+    return distances
+
+
+def select_diverse_keyframes(
+    steps: Sequence[RunStep],
+    budget: int,
+    friction_weight: float = 1.0,
+    friction_slots: int = 2,
+    duplicate_bits: int = 4,
+) -> list[int]:
+    """
+    Picks up to `budget` steps that together cover the run's distinct screens.
+
+    The first and last steps are always kept. Next, up to `friction_slots`
+    of the highest-friction steps are reserved whatever their screen looks
+    like (an error can leave the page nearly unchanged), skipping only those
+    that duplicate a higher-friction reserved step. Each further pick is the
+    step whose screen is least like any already picked, weighted up by its
+    friction score; a screen within `duplicate_bits` of a picked one scores
+    zero, and picking stops early once every remaining step is such a
+    duplicate. Returns step numbers in run order.
+    """
+    if not steps:
+        return []
+    import numpy as np
+
+    distances = pairwise_novelty([s.frame_hash for s in steps])
+    distances[distances <= duplicate_bits / FRAME_HASH_BITS] = 0.0
+    friction = np.array([max(s.friction_score, 0) for s in steps], dtype=float)
+    weights = 1.0 + friction_weight * friction / max(friction.max(), 1.0)
+
+    reserved: list[int] = []
+    for i in np.argsort(-friction, kind="stable"):
+        if len(reserved) >= friction_slots or friction[i] <= 0:
+            break
+        if all(distances[i, j] > 0 for j in reserved):
+            reserved.append(int(i))
+    selected = list(dict.fromkeys([0, len(steps) - 1, *reserved]))
+    selected = selected[: max(budget, 1)]
+    novelty = distances[selected].min(axis=0)
+    while len(selected) < budget:
+        scores = novelty * weights
+        scores[selected] = -1.0
+        best = int(scores.argmax())
+        if scores[best] <= 0:
+            break
+        selected.append(best)
+        novelty = np.minimum(novelty, distances[best])
+    return sorted(steps[i].step for i in selected)
@@ -0,0 +1,102 @@
+# backend/worker/lanes.py
+import time
+from typing import Optional
+
+import dramatiq
+import redis
+import redis.asyncio as aioredis
+
+from backend.src.core.settings import get_settings
+from backend.src.db.models.user import User
+
+settings = get_settings()
+
+PRIORITY_LANE = "priority"
+STANDARD_LANE = "standard"
+
+# The standard lane keeps the original queue so messages already enqueued
+# before lanes existed are still consumed.
+LANE_QUEUES = {PRIORITY_LANE: "runs_priority", STANDARD_LANE: "default"}
+
+# Report generation mostly waits on Gemini, so it gets its own queue and can be
+# served by separate, lighter workers than the browser-driving scout lanes
+# (see WORKER_ROLE in entrypoint.sh).
+REPORT_QUEUE = "reports"
+
+PAID_SUBSCRIPTION_STATUSES = {"active", "trialing"}
+
+# Upper bounds (in seconds) of the exported queue wait histogram buckets.
+QUEUE_WAIT_BUCKETS = (1, 5, 15, 60, 300, 900)
+
+
+def lane_for(user: User) -> str:
+    """Paying customers get the priority lane; everyone else shares the standard one."""
+    if user.subscription_status in PAID_SUBSCRIPTION_STATUSES:
+        return PRIORITY_LANE
+    return STANDARD_LANE
+
+
+def max_in_flight_runs(lane: str) -> int:
+    """How many queued or running runs a user of this lane may have at once."""
+    if lane == PRIORITY_LANE:
+        return settings.RUN_MAX_IN_FLIGHT_PER_USER_PAID
+    return settings.RUN_MAX_IN_FLIGHT_PER_USER_FREE
+
+
+def queue_wait_key(lane: str) -> str:
+    return f"queue_wait:{lane}"
+
+
+class QueueWaitMetrics(dramatiq.Middleware):
+    """
+    Records how long each lane's messages waited in the queue before a worker
+    picked them up, as a cumulative histogram in one Redis hash per lane.
+    Delayed messages are measured from when they became due, not when sent.
+    """
+
+    def __init__(self):
+        self._lanes = {queue: lane for lane, queue in LANE_QUEUES.items()}
+        self._redis: Optional[redis.Redis] = None
+
+    def before_process_message(self, broker, message):
+        lane = self._lanes.get(message.queue_name)
+        if lane is None:
+            return
+        due_at_ms = max(message.message_timestamp, message.options.get("eta", 0))
+        wait_ms = max(0, int(time.time() * 1000) - due_at_ms)
+        try:
+            self._record(lane, wait_ms)
+        except redis.RedisError as e:
+            print(f"⚠️ [LANES] Could not record queue wait for {lane}: {e}")
+
+    def _record(self, lane: str, wait_ms: int):
+        if self._redis is None:
+            self._redis = redis.Redis(
+                host=settings.REDIS_HOST, port=settings.REDIS_PORT
+            )
+        key = queue_wait_key(lane)
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.hincrby(key, "count", 1)
+        pipe.hincrby(key, "sum_ms", wait_ms)
+        for bound in QUEUE_WAIT_BUCKETS:
+            if wait_ms <= bound * 1000:
+                pipe.hincrby(key, f"le_{bound}s", 1)
+        pipe.execute()
+
+
+async def get_queue_wait_stats(redis_client: aioredis.Redis) -> dict[str, dict]:
+    """Per-lane queue wait histogram, as recorded by `QueueWaitMetrics`."""
+    stats = {}
+    for lane in LANE_QUEUES:
+        raw = await redis_client.hgetall(queue_wait_key(lane))
+        fields = {k.decode(): int(v) for k, v in raw.items()}
+        count = fields.get("count", 0)
+        stats[lane] = {
+            "count": count,
+            "mean_wait_ms": fields.get("sum_ms", 0) // count if count else 0,
+            "buckets": {
+                f"le_{bound}s": fields.get(f"le_{bound}s", 0)
+                for bound in QUEUE_WAIT_BUCKETS
+            },
+        }
+    return stats
@@ -0,0 +1,99 @@
+# backend/worker/pipeline.py
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import dramatiq
+from pydantic import BaseModel
+
+from backend.src.core.settings import get_settings
+from backend.src.db.models.agent_run import RunStep
+from backend.worker.keyframes import select_diverse_keyframes
+
+settings = get_settings()
+
+
+class RunState(BaseModel):
+    """
+    The in-memory state of a run as it moves through the post-scout stages.
+
+    It travels inside the stage messages, so no stage has to re-read the run
+    row or the run log. Once keyframes are picked, `steps` holds only the key
+    steps (without their page snapshots) to keep the messages small.
+    """
+
+    run_id: str
+    target_url: str
+    task_prompt: str
+    steps: list[RunStep]
+    keyframe_indices: list[int] = []
+    final_result: Optional[dict[str, Any]] = None
+
+
+def pick_keyframes(state: RunState) -> RunState:
+    """Keeps a visually diverse, friction-weighted set of steps (see keyframes.py)."""
+    if not state.steps:
+        raise ValueError("Run log not found.")
+    key_indices = set(
+        select_diverse_keyframes(
+            state.steps,
+            budget=settings.KEYFRAME_BUDGET,
+            friction_weight=settings.KEYFRAME_FRICTION_WEIGHT,
+            friction_slots=settings.KEYFRAME_FRICTION_SLOTS,
+        )
+    )
+    return state.model_copy(
+        update={
+            "keyframe_indices": sorted(key_indices),
+            "steps": [
+                s.model_copy(update={"snapshot": None})
+                for s in state.steps
+                if s.step in key_indices
+            ],
+        }
+    )
+
+
+@dataclass
+class Stage:
+    """A pipeline stage: either an inline function or a dramatiq actor."""
+
+    name: str
+    run: Optional[Callable[[RunState], RunState]] = None
+    actor: Optional[dramatiq.Actor] = None
+
+
+class StagedPipeline:
+    """
+    Runs a run's stages in order, handing the `RunState` from one to the next.
+
+    Cheap, in-memory stages run inline in the calling worker. The expensive
+    ones are actors chained as a single dramatiq pipeline: the first receives
+    `(run_id, state)`, and each later one gets `run_id` plus the state returned
+    by the previous actor. An actor may return None to pass no state on; the
+    next one then has to fall back to the database. Inline stages must come
+    before actor stages.
+    """
+
+    def __init__(self, stages: list[Stage]):
+        self.inline_stages = [s for s in stages if s.actor is None]
+        self.actor_stages = [s for s in stages if s.actor is not None]
+        if stages[: len(self.inline_stages)] != self.inline_stages:
+            raise ValueError("Inline stages must come before actor stages.")
+
+    def run_inline(self, state: RunState) -> RunState:
+        for stage in self.inline_stages:
+            assert stage.run is not None
+            state = stage.run(state)
+        return state
+
+    def enqueue(self, state: RunState) -> Optional[dramatiq.pipeline]:
+        """Sends the actor stages as one pipeline, starting from `state`."""
+        if not self.actor_stages:
+            return None
+        first, *rest = [s.actor for s in self.actor_stages]
+        assert first is not None
+        messages = [first.message(state.run_id, state.model_dump(mode="json"))]
+        messages.extend(actor.message(state.run_id) for actor in rest if actor)
+        pipe = dramatiq.pipeline(messages, broker=first.broker)
+        pipe.run()
+        return pipe
@@ -0,0 +1,216 @@
+# backend/worker/routing.py
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+from playwright.async_api import BrowserContext, Route
+
+# Resource types worth sharing across runs of the same site.
+CACHEABLE_RESOURCE_TYPES = {"stylesheet", "script", "image", "font"}
+
+# Never replayed from the cache: cookies belong to the run that received them,
+# and the stored body is already decoded.
+UNCACHED_HEADERS = {"set-cookie", "content-encoding", "content-length"}
+
+
+def site_of(host: str) -> str:
+    """
+    Approximates the registrable domain of a host by its last two labels
+    (`cdn.shop.example.com` -> `example.com`). Good enough to tell first- from
+    third-party requests without shipping a public suffix list.
+    """
+    return ".".join(host.lower().rstrip(".").split(".")[-2:])
+
+
+def matches_domain(host: str, domains: Iterable[str]) -> bool:
+    host = host.lower()
+    return any(host == d or host.endswith(f".{d}") for d in domains)
+
+
+class StaticAssetCache:
+    """
+    A shared on-disk cache of static assets, reused across runs and workers.
+
+    Request interception disables Chromium's own HTTP cache, so successful GET
+    responses for stylesheets, scripts, images and fonts are stored here by URL
+    and served straight from disk for `ttl_seconds`. Responses marked
+    `no-store` or `private`, and bodies over `max_entry_bytes`, are not cached.
+    Once the cache holds more than `max_bytes` (0 = unbounded), the least
+    recently used entries are evicted.
+    """
+
+    # Evicting scans the whole directory, so it runs once per this many writes.
+    EVICT_EVERY_WRITES = 32
+
+    def __init__(
+        self,
+        root: Path,
+        ttl_seconds: int = 3600,
+        max_entry_bytes: int = 0,
+        max_bytes: int = 0,
+    ):
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self.max_entry_bytes = max_entry_bytes
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self._writes = 0
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.root / f"{key}.meta", self.root / f"{key}.body"
+
+    def read(self, url: str) -> Optional[tuple[int, dict[str, str], bytes]]:
+        meta_path, body_path = self._paths(url)
+        try:
+            if time.time() - meta_path.stat().st_mtime > self.ttl_seconds:
+                self.discard(meta_path, body_path)
+                return None
+            meta = json.loads(meta_path.read_text())
+            body = body_path.read_bytes()
+            # The metadata's mtime is when the entry was stored, the body's
+            # when it was last served: the former expires it, the latter
+            # orders eviction.
+            os.utime(body_path)
+            return meta["status"], meta["headers"], body
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def write(self, url: str, status: int, headers: dict[str, str], body: bytes):
+        meta_path, body_path = self._paths(url)
+        stored_headers = {
+            k: v for k, v in headers.items() if k.lower() not in UNCACHED_HEADERS
+        }
+        meta = json.dumps({"status": status, "headers": stored_headers}).encode()
+        # Body first, then metadata, each via rename: readers never see a
+        # metadata file whose body is missing or half-written.
+        for path, data in ((body_path, body), (meta_path, meta)):
+            tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+            tmp_path.write_bytes(data)
+            tmp_path.replace(path)
+        self._writes += 1
+        if self.max_bytes and self._writes % self.EVICT_EVERY_WRITES == 0:
+            self.evict()
+
+    @staticmethod
+    def discard(meta_path: Path, body_path: Path):
+        # Metadata first, so the entry is never served without its body.
+        meta_path.unlink(missing_ok=True)
+        body_path.unlink(missing_ok=True)
+
+    def evict(self):
+        """Drops expired entries, then the least recently used over `max_bytes`."""
+        now = time.time()
+        entries = []
+        for meta_path in self.root.glob("*.meta"):
+            body_path = meta_path.with_suffix(".body")
+            try:
+                meta_stat, body_stat = meta_path.stat(), body_path.stat()
+            except OSError:
+                continue
+            if now - meta_stat.st_mtime > self.ttl_seconds:
+                self.discard(meta_path, body_path)
+            else:
+                size = meta_stat.st_size + body_stat.st_size
+                entries.append((body_stat.st_mtime, size, meta_path, body_path))
+        total = sum(size for _, size, _, _ in entries)
+        for _, size, meta_path, body_path in sorted(entries):
+            if not self.max_bytes or total <= self.max_bytes:
+                break
+            self.discard(meta_path, body_path)
+            total -= size
+
+    def is_cacheable(self, status: int, headers: dict[str, str], body: bytes) -> bool:
+        cache_control = headers.get("cache-control", "").lower()
+        return (
+            status == 200
+            and "no-store" not in cache_control
+            and "private" not in cache_control
+            and (not self.max_entry_bytes or len(body) <= self.max_entry_bytes)
+        )
+
+    async def serve(self, route: Route):
+        """Fulfills the request from disk, or fetches it and stores the response."""
+        url = route.request.url
+        entry = await asyncio.to_thread(self.read, url)
+        if entry is not None:
+            self.hits += 1
+            status, headers, body = entry
+            await route.fulfill(status=status, headers=headers, body=body)
+            return
+        response = await route.fetch()
+        body = await response.body()
+        if self.is_cacheable(response.status, response.headers, body):
+            await asyncio.to_thread(
+                self.write, url, response.status, response.headers, body
+            )
+        await route.fulfill(response=response, body=body)
+
+
+class RequestRouter:
+    """
+    Filters the scout's network traffic before it reaches the page.
+
+    First-party requests (same site as the target URL) always load. Third-party
+    requests are aborted if their resource type is blocked or their domain is
+    on the blocklist, or when an allowlist is set and their domain is not on it.
+    With `block_third_party=False` nothing is blocked. Allowed static assets
+    are served through the optional `StaticAssetCache`.
+    """
+
+    def __init__(
+        self,
+        target_url: str,
+        blocked_resource_types: Iterable[str] = (),
+        blocked_domains: Iterable[str] = (),
+        allowed_domains: Iterable[str] = (),
+        cache: Optional[StaticAssetCache] = None,
+        block_third_party: bool = True,
+    ):
+        self.block_third_party = block_third_party
+        self.site = site_of(urlparse(target_url).hostname or "")
+        self.blocked_resource_types = set(blocked_resource_types)
+        self.blocked_domains = list(blocked_domains)
+        self.allowed_domains = list(allowed_domains)
+        self.cache = cache
+        self.blocked = 0
+
+    async def attach(self, context: BrowserContext):
+        await context.route("**/*", self._handle)
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        host = urlparse(url).hostname
+        if not self.block_third_party or not host or site_of(host) == self.site:
+            return False
+        if resource_type in self.blocked_resource_types:
+            return True
+        if matches_domain(host, self.blocked_domains):
+            return True
+        return bool(self.allowed_domains) and not matches_domain(
+            host, self.allowed_domains
+        )
+
+    async def _handle(self, route: Route):
+        request = route.request
+        if self.should_block(request.url, request.resource_type):
+            self.blocked += 1
+            await route.abort("blockedbyclient")
+            return
+        if (
+            self.cache is not None
+            and request.method == "GET"
+            and request.resource_type in CACHEABLE_RESOURCE_TYPES
+        ):
+            try:
+                await self.cache.serve(route)
+                return
+            except Exception as e:
+                print(f"⚠️ [ROUTING] Cache bypassed for {request.url}: {e}")
+        await route.continue_()
@@ -0,0 +1,283 @@
+# backend/worker/runtime.py
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Callable, Coroutine, Optional
+
+import dramatiq
+import redis.asyncio as redis
+
+from backend.src.core.settings import get_settings
+from backend.src.db.postgresql import PostgresDatabase
+
+settings = get_settings()
+
+
+class WorkerEventLoop:
+    """
+    A single, long-lived asyncio event loop per worker process.
+
+    Dramatiq actors are plain synchronous functions executed on worker threads.
+    Instead of spinning up a fresh loop with `asyncio.run` for every message,
+    actors submit their coroutines here. Process-wide async resources (such as
+    the warm browser pool) can then outlive a single message.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._shutdown_hooks: list[Callable[[], Awaitable[Any]]] = []
+        self._periodic_tasks: list[tuple[float, Callable[[], Awaitable[Any]]]] = []
+        self._periodic_futures: list[concurrent.futures.Future] = []
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="churninator-event-loop",
+                    daemon=True,
+                )
+                self._thread.start()
+            return self._loop
+
+    def run(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        """Runs a coroutine on the shared loop and blocks until it completes."""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result()
+        except BaseException:
+            # e.g. dramatiq's TimeLimitExceeded interrupting the waiting thread.
+            future.cancel()
+            raise
+
+    def add_shutdown_hook(self, hook: Callable[[], Awaitable[Any]]):
+        """Registers a coroutine function to be awaited when the loop stops."""
+        self._shutdown_hooks.append(hook)
+
+    def add_periodic_task(
+        self, interval_seconds: float, task: Callable[[], Awaitable[Any]]
+    ):
+        """Registers a coroutine function to run every `interval_seconds` once started."""
+        self._periodic_tasks.append((interval_seconds, task))
+
+    def start_periodic_tasks(self):
+        """Starts the periodic tasks on the loop, e.g. when the worker boots."""
+        for interval_seconds, task in self._periodic_tasks:
+            self._periodic_futures.append(
+                asyncio.run_coroutine_threadsafe(
+                    self._run_periodically(interval_seconds, task), self.loop
+                )
+            )
+
+    async def _run_periodically(
+        self, interval_seconds: float, task: Callable[[], Awaitable[Any]]
+    ):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await task()
+            except Exception as e:
+                print(f"⚠️ [WORKER] Periodic task {task.__name__} failed: {e}")
+
+    def stop(self):
+        """Runs shutdown hooks on the loop, then stops it and joins its thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop, self._thread = None, None
+        for future in self._periodic_futures:
+            future.cancel()
+        self._periodic_futures.clear()
+        if loop is None:
+            return
+        for hook in self._shutdown_hooks:
+            try:
+                asyncio.run_coroutine_threadsafe(hook(), loop).result(timeout=30)
+            except Exception as e:
+                print(f"⚠️ [WORKER] Shutdown hook failed: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=10)
+        loop.close()
+
+
+class RunSupervisor:
+    """
+    Multiplexes many agent sessions on the shared worker loop.
+
+    A semaphore caps how many runs execute concurrently in this process, each
+    run is bounded by a wall-clock time limit, and any active run can be
+    cancelled by id. Runs beyond the cap simply wait their turn on the loop,
+    so the dramatiq threads feeding it stay cheap.
+    """
+
+    def __init__(self, max_concurrent_runs: int, time_limit_seconds: float):
+        self.max_concurrent_runs = max_concurrent_runs
+        self.time_limit_seconds = time_limit_seconds
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._active: dict[str, asyncio.Task] = {}
+        self._cancelled: set[str] = set()
+        self._abandoned: set[str] = set()
+
+    @property
+    def active_runs(self) -> list[str]:
+        return list(self._active)
+
+    async def supervise(
+        self, run_id: str, session_factory: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Runs one agent session under the concurrency cap and time limit."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_runs)
+        task = asyncio.current_task()
+        assert task is not None
+        self._active[run_id] = task
+        try:
+            async with self._semaphore:
+                async with asyncio.timeout(self.time_limit_seconds):
+                    return await session_factory()
+        except TimeoutError:
+            print(
+                f"⏱️ [WORKER] Run {run_id} exceeded its {self.time_limit_seconds}s time limit."
+            )
+        except asyncio.CancelledError:
+            if run_id not in self._cancelled and run_id not in self._abandoned:
+                raise
+            # Our own cancellation: swallow it so dramatiq does not retry.
+            task.uncancel()
+            if run_id in self._abandoned:
+                print(f"🛑 [WORKER] Run {run_id} was abandoned to another worker.")
+            else:
+                print(f"🛑 [WORKER] Run {run_id} was cancelled.")
+        finally:
+            self._active.pop(run_id, None)
+            self._cancelled.discard(run_id)
+            self._abandoned.discard(run_id)
+
+    def was_cancelled(self, run_id: str) -> bool:
+        return run_id in self._cancelled
+
+    def cancel(self, run_id: str) -> bool:
+        """Cancels an active run in this process. Returns False if not found."""
+        task = self._active.get(run_id)
+        if task is None or task.done():
+            return False
+        self._cancelled.add(run_id)
+        task.cancel()
+        return True
+
+    def was_abandoned(self, run_id: str) -> bool:
+        return run_id in self._abandoned
+
+    def abandon(self, run_id: str) -> bool:
+        """
+        Stops an active run that another worker has taken over, leaving the
+        run's state to that worker. Returns False if not found.
+        """
+        task = self._active.get(run_id)
+        if task is None or task.done():
+            return False
+        self._abandoned.add(run_id)
+        task.cancel()
+        return True
+
+    async def cancel_all(self):
+        """Cancels every active run, e.g. when the worker shuts down."""
+        tasks = [t for run_id, t in self._active.items() if self.cancel(run_id)]
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class WorkerResources:
+    """
+    The database engine and Redis connection pool shared by every actor in a
+    worker process, instead of a fresh engine and client per message.
+
+    Both are created on first use (or at worker boot) and connect lazily on the
+    shared worker loop, so their connections stay bound to that one loop.
+    """
+
+    def __init__(
+        self,
+        postgres_pool_size: int,
+        postgres_max_overflow: int,
+        redis_max_connections: int,
+    ):
+        self.postgres_pool_size = postgres_pool_size
+        self.postgres_max_overflow = postgres_max_overflow
+        self.redis_max_connections = redis_max_connections
+        self._db: Optional[PostgresDatabase] = None
+        self._redis: Optional[redis.Redis] = None
+        self._lock = threading.Lock()
+
+    @property
+    def db(self) -> PostgresDatabase:
+        with self._lock:
+            if self._db is None:
+                self._db = PostgresDatabase(
+                    pool_size=self.postgres_pool_size,
+                    max_overflow=self.postgres_max_overflow,
+                )
+            return self._db
+
+    @property
+    def redis(self) -> redis.Redis:
+        with self._lock:
+            if self._redis is None:
+                self._redis = redis.Redis(
+                    connection_pool=redis.ConnectionPool(
+                        host=settings.REDIS_HOST,
+                        port=settings.REDIS_PORT,
+                        max_connections=self.redis_max_connections,
+                    )
+                )
+            return self._redis
+
+    def open(self):
+        """Creates both pools up front so the first message does not pay for it."""
+        self.db, self.redis
+
+    async def close(self):
+        """Disposes of the engine and disconnects the Redis pool."""
+        with self._lock:
+            db, client = self._db, self._redis
+            self._db, self._redis = None, None
+        if db is not None:
+            await db.engine.dispose()
+        if client is not None:
+            await client.aclose()
+            await client.connection_pool.disconnect()
+        print("🧹 [WORKER] Closed the shared database engine and Redis pool.")
+
+
+worker_loop = WorkerEventLoop()
+run_supervisor = RunSupervisor(
+    max_concurrent_runs=settings.WORKER_MAX_CONCURRENT_RUNS,
+    time_limit_seconds=settings.AGENT_RUN_TIME_LIMIT_SECONDS,
+)
+worker_resources = WorkerResources(
+    postgres_pool_size=settings.WORKER_POSTGRES_POOL_SIZE,
+    postgres_max_overflow=settings.WORKER_POSTGRES_MAX_OVERFLOW,
+    redis_max_connections=settings.WORKER_REDIS_MAX_CONNECTIONS,
+)
+# Hooks run in order: active runs finish their cleanup before the pools close.
+worker_loop.add_shutdown_hook(run_supervisor.cancel_all)
+worker_loop.add_shutdown_hook(worker_resources.close)
+
+
+class WorkerRuntimeMiddleware(dramatiq.Middleware):
+    """
+    Owns the worker process's runtime: the shared connection pools are created
+    and the periodic tasks started when the worker boots, and the event loop
+    (closing the pools and the browser pool on its way out) is torn down when
+    the worker stops.
+    """
+
+    def after_worker_boot(self, broker, worker):
+        worker_resources.open()
+        worker_loop.start_periodic_tasks()
+
+    def before_worker_shutdown(self, broker, worker):
+        worker_loop.stop()
@@ -0,0 +1,102 @@
+# backend/worker/settle.py
+import asyncio
+from playwright.async_api import Page, Request
+
+# Installed into every document of the page. It timestamps the latest DOM
+# mutation so the worker can ask "how long has the page been visually quiet?".
+DOM_MUTATION_TRACKER_SCRIPT = """
+(() => {
+  if (window.__churninatorSettle) return;
+  window.__churninatorSettle = { lastMutation: performance.now() };
+  new MutationObserver(() => {
+    window.__churninatorSettle.lastMutation = performance.now();
+  }).observe(document, {
+    subtree: true, childList: true, attributes: true, characterData: true,
+  });
+})();
+"""
+
+DOM_IDLE_MS_SCRIPT = """
+() => window.__churninatorSettle
+  ? performance.now() - window.__churninatorSettle.lastMutation
+  : 0
+"""
+
+# Long-lived connections never "finish" and must not block network quiescence.
+IGNORED_RESOURCE_TYPES = {"websocket", "eventsource"}
+
+
+class PageSettler:
+    """
+    Waits for a page to settle after an action instead of sleeping a fixed time.
+
+    A page is considered settled once no network request has been in flight for
+    `network_quiet_ms` and the DOM has not mutated for `dom_quiet_ms`. The wait
+    is always bounded by `max_wait_ms`, so a page with constant background
+    activity (polling, animations) costs at most that long.
+    """
+
+    def __init__(
+        self,
+        page: Page,
+        max_wait_ms: int = 5000,
+        min_wait_ms: int = 100,
+        network_quiet_ms: int = 500,
+        dom_quiet_ms: int = 300,
+        poll_interval_ms: int = 50,
+    ):
+        self.page = page
+        self.max_wait_ms = max_wait_ms
+        self.min_wait_ms = min_wait_ms
+        self.network_quiet_ms = network_quiet_ms
+        self.dom_quiet_ms = dom_quiet_ms
+        self.poll_interval_ms = poll_interval_ms
+        self._inflight: set[Request] = set()
+        self._last_network_activity = 0.0
+
+    async def attach(self):
+        """Starts tracking network and DOM activity. Call once per page."""
+        self._last_network_activity = asyncio.get_running_loop().time()
+        self.page.on("request", self._on_request_started)
+        self.page.on("requestfinished", self._on_request_done)
+        self.page.on("requestfailed", self._on_request_done)
+        await self.page.add_init_script(DOM_MUTATION_TRACKER_SCRIPT)
+        try:
+            await self.page.evaluate(DOM_MUTATION_TRACKER_SCRIPT)
+        except Exception:
+            # The page may be mid-navigation; the init script covers the next document.
+            pass
+
+    def _on_request_started(self, request: Request):
+        if request.resource_type in IGNORED_RESOURCE_TYPES:
+            return
+        self._inflight.add(request)
+        self._last_network_activity = asyncio.get_running_loop().time()
+
+    def _on_request_done(self, request: Request):
+        self._inflight.discard(request)
+        self._last_network_activity = asyncio.get_running_loop().time()
+
+    async def _dom_idle_ms(self) -> float:
+        try:
+            return float(await self.page.evaluate(DOM_IDLE_MS_SCRIPT))
+        except Exception:
+            # Execution context destroyed by a navigation: definitely not settled.
+            return 0.0
+
+    async def _is_settled(self) -> bool:
+        now = asyncio.get_running_loop().time()
+        network_idle_ms = (now - self._last_network_activity) * 1000
+        if self._inflight or network_idle_ms < self.network_quiet_ms:
+            return False
+        return await self._dom_idle_ms() >= self.dom_quiet_ms
+
+    async def wait(self) -> int:
+        """Blocks until the page settles or the max wait elapses. Returns ms waited."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + self.max_wait_ms / 1000
+        await asyncio.sleep(self.min_wait_ms / 1000)
+        while loop.time() < deadline and not await self._is_settled():
+            await asyncio.sleep(self.poll_interval_ms / 1000)
+        return int((loop.time() - started) * 1000)
@@ -0,0 +1,106 @@
+# backend/worker/snapshot.py
+from typing import Optional
+
+from playwright.async_api import Page
+
+from backend.src.db.models.agent_run import PageSnapshot, SnapshotElement
+
+# Collects visible interactive elements and headings in document order, with
+# their role, accessible name and viewport-normalized geometry.
+SNAPSHOT_SCRIPT = """
+(maxElements) => {
+  const vw = window.innerWidth, vh = window.innerHeight;
+  const selector = [
+    "a[href]", "button", "input:not([type=hidden])", "select", "textarea",
+    "summary", "h1", "h2", "h3", "[contenteditable=true]",
+    "[role=button]", "[role=link]", "[role=checkbox]", "[role=radio]",
+    "[role=tab]", "[role=menuitem]", "[role=option]", "[role=switch]",
+    "[role=textbox]", "[role=combobox]", "[role=searchbox]",
+  ].join(",");
+  const implicitRole = (el) => {
+    const tag = el.tagName.toLowerCase();
+    if (tag === "a") return "link";
+    if (tag === "select") return "combobox";
+    if (tag === "textarea" || el.isContentEditable) return "textbox";
+    if (/^h[1-3]$/.test(tag)) return "heading";
+    if (tag === "input") {
+      const type = (el.type || "text").toLowerCase();
+      if (["checkbox", "radio"].includes(type)) return type;
+      if (["submit", "button", "reset", "image"].includes(type)) return "button";
+      return "textbox";
+    }
+    return "button";
+  };
+  const clean = (text) => (text || "").replace(/\\s+/g, " ").trim().slice(0, 80);
+  const accessibleName = (el) => {
+    const labelledBy = el.getAttribute("aria-labelledby");
+    const byId = labelledBy && document.getElementById(labelledBy);
+    return clean(
+      el.getAttribute("aria-label") || (byId && byId.innerText) ||
+      (el.labels && el.labels[0] && el.labels[0].innerText) ||
+      el.innerText || el.getAttribute("placeholder") ||
+      el.getAttribute("title") || el.getAttribute("alt") ||
+      (el.type === "submit" && el.value) || ""
+    );
+  };
+  const elements = [];
+  for (const el of document.querySelectorAll(selector)) {
+    if (elements.length >= maxElements) break;
+    const r = el.getBoundingClientRect();
+    if (r.width < 2 || r.height < 2) continue;
+    if (r.bottom <= 0 || r.right <= 0 || r.top >= vh || r.left >= vw) continue;
+    const style = getComputedStyle(el);
+    if (style.visibility === "hidden" || style.opacity === "0") continue;
+    const role = el.getAttribute("role") || implicitRole(el);
+    const entry = {
+      role,
+      name: accessibleName(el),
+      x: (r.left + r.width / 2) / vw,
+      y: (r.top + r.height / 2) / vh,
+      width: r.width / vw,
+      height: r.height / vh,
+      disabled: !!el.disabled || el.getAttribute("aria-disabled") === "true",
+    };
+    if (role === "checkbox" || role === "radio" || role === "switch") {
+      entry.checked = el.checked ?? el.getAttribute("aria-checked") === "true";
+    } else if (role === "textbox" || role === "combobox") {
+      entry.value = el.type === "password" ? "••••" : clean(el.value);
+    }
+    elements.push(entry);
+  }
+  return { url: location.href, title: document.title, elements };
+}
+"""
+
+
+async def capture_snapshot(
+    page: Page, max_elements: int = 60
+) -> Optional[PageSnapshot]:
+    """Captures the page's snapshot, or None if the page cannot be evaluated."""
+    try:
+        return PageSnapshot.model_validate(
+            await page.evaluate(SNAPSHOT_SCRIPT, max_elements)
+        )
+    except Exception as e:
+        print(f"⚠️ [SNAPSHOT] Could not capture page snapshot: {e}")
+        return None
+
+
+def render_element(index: int, element: SnapshotElement) -> str:
+    line = f'[{index}] {element.role} "{element.name}" at (x={element.x:.3f}, y={element.y:.3f})'
+    if element.value:
+        line += f' value="{element.value}"'
+    if element.checked is not None:
+        line += " checked" if element.checked else " unchecked"
+    if element.disabled:
+        line += " disabled"
+    return line
+
+
+def render_snapshot(snapshot: PageSnapshot) -> str:
+    """One compact line per element, with click coordinates the agent can use directly."""
+    lines = [f"Page: {snapshot.title} ({snapshot.url})"]
+    lines.extend(render_element(i, el) for i, el in enumerate(snapshot.elements, 1))
+    if not snapshot.elements:
+        lines.append("(no interactive elements visible)")
+    return "\n".join(lines)
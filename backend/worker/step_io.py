@@ -0,0 +1,75 @@
+# backend/worker/step_io.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Callable, Optional
+
+import redis.asyncio as redis
+
+from backend.src.core.settings import get_settings
+
+settings = get_settings()
+
+# Shared by all runs in the process so blocking disk writes never touch the loop.
+file_writer = ThreadPoolExecutor(
+    max_workers=settings.STEP_IO_WRITER_THREADS, thread_name_prefix="step-io"
+)
+
+StepIOJob = Callable[[], Awaitable[Any]]
+
+
+class StepIOPipeline:
+    """
+    A per-run background stage for the scout's side-effect I/O.
+
+    Frame persistence, frame publishing and log publishing are queued here and
+    executed in submission order by a single consumer task, while the scout
+    moves straight on to the VLM request. The queue is bounded, so a slow disk
+    or Redis applies backpressure instead of growing memory without limit.
+    Exiting the context drains every pending job.
+    """
+
+    def __init__(self, redis_client: redis.Redis, max_queue_size: int = 64):
+        self.redis_client = redis_client
+        self._queue: asyncio.Queue[Optional[StepIOJob]] = asyncio.Queue(
+            maxsize=max_queue_size
+        )
+        self._consumer: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "StepIOPipeline":
+        self._consumer = asyncio.create_task(self._consume())
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _consume(self):
+        while True:
+            job = await self._queue.get()
+            if job is None:
+                return
+            try:
+                await job()
+            except Exception as e:
+                print(f"⚠️ [STEP I/O] Background job failed: {e}")
+
+    async def submit(self, job: StepIOJob):
+        """Queues a job, waiting only if the queue is full."""
+        await self._queue.put(job)
+
+    async def publish(self, channel: str, message: Any):
+        """Drop-in, queued replacement for `redis_client.publish`."""
+        await self.submit(partial(self.redis_client.publish, channel, message))
+
+    async def run_in_thread(self, fn: Callable[..., Any], *args: Any):
+        """Queues a blocking call that runs on the shared writer thread pool."""
+        loop = asyncio.get_running_loop()
+        await self.submit(lambda: loop.run_in_executor(file_writer, fn, *args))
+
+    async def close(self):
+        """Drains all pending jobs and stops the consumer."""
+        if self._consumer is None:
+            return
+        await self._queue.put(None)
+        await self._consumer
+        self._consumer = None
@@ -1,23 +1,74 @@
 import dramatiq
 import asyncio
 import redis.asyncio as redis
-import json
 import base64
-import os
+import json
+import random
+import uuid
+from functools import partial
 from pathlib import Path
-from playwright.async_api import async_playwright, Page
+from typing import Any, Optional
+from dramatiq.middleware import CurrentMessage
+from playwright.async_api import Page
+from sqlalchemy import update
+from sqlmodel import col
 from sqlmodel.ext.asyncio.session import AsyncSession
 from PIL import Image
 
 from backend.src.db.postgresql import PostgresDatabase
-from backend.worker.broker import redis_broker
+from backend.worker.broker import PipelinedRedisBroker, redis_broker
+from backend.worker.browser_pool import browser_pool
+from backend.worker.runtime import worker_loop, run_supervisor, worker_resources
+from backend.worker.settle import PageSettler
+from backend.worker.frames import (
+    FrameComparator,
+    prepare_model_frame,
+    to_viewport_coordinates,
+)
+from backend.worker.step_io import StepIOPipeline
+from backend.worker.admission import RunAdmission
+from backend.worker.lanes import (
+    LANE_QUEUES,
+    PRIORITY_LANE,
+    REPORT_QUEUE,
+    STANDARD_LANE,
+)
+from backend.worker.history import MissionHistory
+from backend.worker.trajectory import TrajectoryMonitor
+from backend.worker.routing import RequestRouter, StaticAssetCache
+from backend.worker.snapshot import capture_snapshot, render_snapshot
+from backend.worker.keyframes import frame_signature, prepare_keyframes
+from backend.worker.pipeline import RunState, Stage, StagedPipeline, pick_keyframes
+from backend.worker.checkpoints import (
+    RunCheckpoint,
+    RunLease,
+    clear_checkpoint,
+    load_checkpoint,
+    save_checkpoint,
+)
 from backend.src.core.settings import get_settings
-from backend.src.db.models.agent_run import AgentRun, RunStep, FinalReport
+from backend.src.db.models.agent_run import (
+    AgentRun,
+    FinalReport,
+    FrictionPoint,
+    RunStep,
+)
+from backend.src.services.run_events import publish_run_status
+from backend.src.services.run_log import RunStepWriter, load_run_log
+from backend.src.services.screenshot_store import (
+    ScreenshotStore,
+    collect_orphan_blobs,
+    resolve_screenshot,
+    screenshot_store,
+)
+from backend.src.services.vlm.base import FrameSpec, VLMResponse, image_mime_type
 from backend.src.services.vlm.factory import vlm_provider
-from backend.src.services.vlm.gemini_provider import gemini_provider
+from backend.src.services.vlm.gemini_provider import gemini_provider, parse_report_json
+from backend.src.utils.favicon import get_domain_from_url
 from forge.utils.function_parser import parse_function_call
 
 settings = get_settings()
+worker_loop.add_shutdown_hook(browser_pool.close)
 
 # --- Helper Functions ---
 
@@ -32,11 +83,44 @@ def load_prompt(filename: str) -> str:
 # Load the system prompt once at the module level for efficiency
 AGENT_SYSTEM_PROMPT = load_prompt("agent_system_prompt.txt")
 
+# Appended to the prompt when the last action left the screen visually unchanged.
+NO_VISUAL_CHANGE_NOTE = (
+    "\n\n**Note:** Your previous action `{action}` produced no visible change on "
+    "the screen. Do not repeat it; try a different approach."
+)
+
+
+# Appended to the prompt when the trajectory monitor thinks the agent is stuck.
+STUCK_NUDGE_NOTE = (
+    "\n\n**Warning:** {reason} You appear to be stuck. Change your approach, "
+    "or TERMINATE if the objective cannot be reached."
+)
+
+
+# Appended to the prompt in text-first mode.
+PAGE_ELEMENTS_NOTE = (
+    "\n\n**Page Elements** (visible interactive elements; click at the given "
+    "normalized coordinates)\n<elements>\n{elements}\n</elements>"
+)
+
+
+def is_wait_action(action_str: str) -> bool:
+    """True if the action only asks the agent to wait for the page."""
+    parsed_calls = parse_function_call(action_str)
+    return bool(parsed_calls) and parsed_calls[0].function_name == "wait"
+
 
 async def execute_action(
-    page: Page, action_str: str, run_id: str, redis_client: redis.Redis
+    page: Page,
+    action_str: str,
+    run_id: str,
+    redis_client: redis.Redis | StepIOPipeline,
+    crop: Optional[tuple[float, float, float, float]] = None,
 ):
-    """Parses and executes a single action string using Playwright."""
+    """
+    Parses and executes a single action string using Playwright. `crop` is the
+    viewport region the model saw, used to map its coordinates back.
+    """
     parsed_calls = parse_function_call(action_str)
     if not parsed_calls:
         await redis_client.publish(
@@ -55,9 +139,10 @@ async def execute_action(
     try:
         if action_name == "click":
             if "x" in params and "y" in params:
+                x, y = to_viewport_coordinates(params["x"], params["y"], crop)
                 pixel_x, pixel_y = (
-                    params["x"] * viewport_size["width"],
-                    params["y"] * viewport_size["height"],
+                    x * viewport_size["width"],
+                    y * viewport_size["height"],
                 )
                 await page.mouse.click(pixel_x, pixel_y)
         elif action_name == "type":
@@ -79,13 +164,84 @@ async def execute_action(
         await redis_client.publish(f"logs:{run_id}", error_message)
 
 
-async def update_run_status(db: AsyncSession, run_id: str, status: str):
-    """Helper to update the agent run status in the database."""
+async def update_run_status(
+    db: AsyncSession,
+    redis_client: redis.Redis,
+    run_id: str,
+    status: str,
+    **fields: Any,
+):
+    """
+    Helper to update the agent run status (and any other fields) in the
+    database, then push the transition to the owner's status stream.
+    """
     run = await db.get(AgentRun, run_id)
     if run:
         run.status = status
+        for name, value in fields.items():
+            setattr(run, name, value)
         db.add(run)
         await db.commit()
+        await publish_run_status(redis_client, run.owner_id, run_id, status)
+
+
+async def update_run(db: AsyncSession, run_id: str, **fields: Any):
+    """Writes the given fields to the run row without loading it first."""
+    await db.execute(
+        update(AgentRun)
+        .where(col(AgentRun.id) == uuid.UUID(str(run_id)))
+        .values(**fields)
+    )
+    await db.commit()
+
+
+async def listen_for_cancellation(run_id: str, redis_client: redis.Redis):
+    """Cancels the local run as soon as a cancel request is published for it."""
+    pubsub = redis_client.pubsub()
+    await pubsub.subscribe(f"cancel:{run_id}")
+    try:
+        async for message in pubsub.listen():
+            if message["type"] == "message":
+                run_supervisor.cancel(run_id)
+                break
+    finally:
+        await pubsub.unsubscribe(f"cancel:{run_id}")
+        await pubsub.aclose()
+
+
+async def persist_pending_steps(step_writer: RunStepWriter):
+    """Best-effort flush so steps recorded before a failure are not lost."""
+    try:
+        await step_writer.flush()
+    except Exception as e:
+        print(f"⚠️ [SCOUT] Could not persist pending steps: {e}")
+
+
+# Live viewers get a small rendition; the archived frame stays full resolution.
+PREVIEW_FRAME_SPEC = FrameSpec(
+    max_width=settings.PREVIEW_FRAME_MAX_WIDTH,
+    max_height=settings.PREVIEW_FRAME_MAX_HEIGHT,
+    quality=settings.PREVIEW_FRAME_QUALITY,
+)
+
+
+async def publish_preview(
+    redis_client: redis.Redis, channel: str, screenshot_bytes: bytes
+):
+    """Downscales a screenshot off the loop and publishes it to live viewers."""
+    preview = await asyncio.to_thread(
+        prepare_model_frame, screenshot_bytes, PREVIEW_FRAME_SPEC
+    )
+    await redis_client.publish(channel, preview)
+
+
+# Keyframes sent to the analyst are downsized once and reused across retries.
+ANALYST_FRAME_SPEC = FrameSpec(
+    max_width=settings.ANALYST_FRAME_MAX_WIDTH,
+    max_height=settings.ANALYST_FRAME_MAX_HEIGHT,
+    format=settings.ANALYST_FRAME_FORMAT,
+    quality=settings.ANALYST_FRAME_QUALITY,
+)
 
 
 # --- Core Task Logic ---
@@ -97,57 +253,202 @@ async def agent_task_logic(
     task_prompt: str,
     db: PostgresDatabase,
     redis_client: redis.Redis,
+    checkpoint: Optional[RunCheckpoint] = None,
+    final_attempt: bool = True,
 ):
-    """Phase 1: The Scout. Executes the run and annotates each step using tags."""
+    """
+    Phase 1: The Scout. Executes the run and annotates each step using tags.
+    A failure only marks the run FAILED on the `final_attempt`; otherwise the
+    run stays RUNNING while dramatiq retries it from the checkpoint.
+    """
     print(f"🚀 [SCOUT] Starting execution & annotation for run_id: {run_id}")
-    run_storage_path = Path(f"storage/runs/{run_id}")
-    run_storage_path.mkdir(parents=True, exist_ok=True)
-    frame_channel, log_channel = f"frames:{run_id}", f"logs:{run_id}"
-    browser = None
-    structured_log: list[RunStep] = []
+    preview_channel, log_channel = f"preview:{run_id}", f"logs:{run_id}"
+    # A retried run resumes after its last checkpointed step.
+    structured_log: list[RunStep] = list(checkpoint.history) if checkpoint else []
+    start_step = checkpoint.completed_steps if checkpoint else 0
+    context_options: dict[str, Any] = {"viewport": {"width": 1920, "height": 1080}}
+    if checkpoint:
+        context_options["storage_state"] = checkpoint.storage_state
+    if settings.ROUTING_ENABLED:
+        # Requests handled by a service worker would bypass the router.
+        context_options["service_workers"] = "block"
+    step_writer = RunStepWriter(
+        db,
+        run_id,
+        batch_size=settings.RUN_STEP_BATCH_SIZE,
+        flush_interval_seconds=settings.RUN_STEP_FLUSH_INTERVAL_SECONDS,
+    )
 
     async for session in db.get_db_session():
         try:
-            await update_run_status(session, run_id, "RUNNING")
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    viewport={"width": 1920, "height": 1080}
+            run = await session.get(AgentRun, run_id)
+            if run and run.status == "CANCELLED":
+                print(f"🛑 [SCOUT] Run {run_id} was cancelled before it started.")
+                return
+            await update_run_status(session, redis_client, run_id, "RUNNING")
+            max_steps = (run.max_steps if run else None) or settings.AGENT_MAX_STEPS
+            for past_step in structured_log:
+                # Steps still buffered when the previous attempt died.
+                step_writer.add(past_step)
+            async with (
+                browser_pool.context(**context_options) as context,
+                StepIOPipeline(
+                    redis_client, max_queue_size=settings.STEP_IO_QUEUE_SIZE
+                ) as step_io,
+            ):
+                router = RequestRouter(
+                    target_url,
+                    blocked_resource_types=settings.ROUTING_BLOCKED_RESOURCE_TYPES,
+                    blocked_domains=settings.ROUTING_BLOCKED_DOMAINS,
+                    allowed_domains=settings.ROUTING_ALLOWED_DOMAINS,
+                    cache=StaticAssetCache(
+                        Path(settings.HTTP_CACHE_DIR),
+                        ttl_seconds=settings.HTTP_CACHE_TTL_SECONDS,
+                        max_entry_bytes=settings.HTTP_CACHE_MAX_ENTRY_BYTES,
+                        max_bytes=settings.HTTP_CACHE_MAX_BYTES,
+                    )
+                    if settings.HTTP_CACHE_ENABLED
+                    else None,
+                    block_third_party=not (run and run.allow_third_party),
                 )
+                if settings.ROUTING_ENABLED:
+                    await router.attach(context)
                 page = await context.new_page()
-                await page.goto(
-                    target_url, wait_until="domcontentloaded", timeout=60000
+                settler = PageSettler(
+                    page,
+                    max_wait_ms=settings.SETTLE_MAX_WAIT_MS,
+                    min_wait_ms=settings.SETTLE_MIN_WAIT_MS,
+                    network_quiet_ms=settings.SETTLE_NETWORK_QUIET_MS,
+                    dom_quiet_ms=settings.SETTLE_DOM_QUIET_MS,
                 )
-                await redis_client.publish(log_channel, f"Navigated to {target_url}")
-
-                for step in range(25):
-                    await redis_client.publish(
-                        log_channel, f"--- Step {step + 1}/25 ---"
+                await settler.attach()
+                frame_comparator = FrameComparator()
+                reused_decisions = 0
+                trajectory = TrajectoryMonitor(
+                    repeat_threshold=settings.TRAJECTORY_REPEAT_THRESHOLD,
+                    patience=settings.TRAJECTORY_PATIENCE,
+                )
+                nudge: Optional[str] = None
+                for past_step in structured_log:
+                    trajectory.observe(
+                        past_step.action,
+                        past_step.screenshot_path,
+                        waiting=is_wait_action(past_step.action),
                     )
-                    screenshot_bytes = await page.screenshot(type="jpeg", quality=70)
-                    await redis_client.publish(frame_channel, screenshot_bytes)
-                    screenshot_path = run_storage_path / f"step_{step + 1}.jpeg"
-                    screenshot_path.write_bytes(screenshot_bytes)
-
-                    image_base64 = base64.b64encode(screenshot_bytes).decode("utf-8")
-                    history_for_prompt = "\n".join(
-                        [
-                            f"Step {s.step}: Thought: {s.thought}\nAction: {s.action}"
-                            for s in structured_log
-                        ]
+                mission_history = MissionHistory(
+                    vlm_provider.count_tokens,
+                    token_budget=settings.AGENT_HISTORY_TOKEN_BUDGET,
+                    verbatim_steps=settings.AGENT_HISTORY_VERBATIM_STEPS,
+                )
+                start_url = checkpoint.url if checkpoint else target_url
+                await page.goto(start_url, wait_until="domcontentloaded", timeout=60000)
+                await step_io.publish(log_channel, f"Navigated to {start_url}")
+                if checkpoint:
+                    await step_io.publish(
+                        log_channel,
+                        f"Resuming from checkpoint after step {start_step}.",
                     )
 
-                    user_content = f"{AGENT_SYSTEM_PROMPT}\n\n**Mission History**\n<history>\n{history_for_prompt}\n</history>\n\n**Your Current Mission Objective:**\n<objective>{task_prompt}</objective>"
+                for step in range(start_step, max_steps):
+                    await step_io.publish(
+                        log_channel, f"--- Step {step + 1}/{max_steps} ---"
+                    )
+                    screenshot_bytes, snapshot = await asyncio.gather(
+                        page.screenshot(type="jpeg", quality=70),
+                        capture_snapshot(page, settings.SNAPSHOT_MAX_ELEMENTS),
+                    )
+                    # Persisting and publishing the frame happen in the background
+                    # while the VLM request below is already in flight.
+                    await step_io.submit(
+                        partial(
+                            publish_preview,
+                            redis_client,
+                            preview_channel,
+                            screenshot_bytes,
+                        )
+                    )
+                    # Stored once per distinct frame; repeats cost no write.
+                    screenshot_ref = ScreenshotStore.ref_for(screenshot_bytes)
+                    await step_io.run_in_thread(
+                        screenshot_store.write, screenshot_ref, screenshot_bytes
+                    )
 
-                    # The inference server is responsible for adding the final model-specific tokens.
-                    vlm_response = await vlm_provider.get_next_action(
-                        image_base64, user_content
+                    # Decoding and resizing the frame would stall every run
+                    # sharing the loop.
+                    frame_hash = await asyncio.to_thread(
+                        frame_signature, screenshot_bytes
                     )
+                    # Only a byte-identical capture counts as "no change".
+                    unchanged = frame_comparator.is_unchanged(screenshot_ref)
+                    previous = structured_log[-1] if structured_log else None
+                    text_first = (
+                        settings.AGENT_OBSERVATION_MODE != "vision"
+                        and snapshot is not None
+                    )
+                    # Coordinates from a cropped frame map back to the viewport;
+                    # snapshot coordinates are already viewport-relative.
+                    action_crop = None if text_first else vlm_provider.frame_spec.crop
+
+                    if (
+                        unchanged
+                        and previous
+                        and is_wait_action(previous.action)
+                        and reused_decisions < settings.FRAME_DEDUP_MAX_REUSE
+                    ):
+                        # Nothing new to reason about: the agent is still waiting
+                        # on an identical screen, so skip the VLM round trip.
+                        reused_decisions += 1
+                        vlm_response = VLMResponse(
+                            thought="Screen unchanged; continuing to wait.",
+                            action=previous.action,
+                            observation=previous.observation,
+                            friction_score=previous.friction_score,
+                        )
+                        await step_io.publish(
+                            log_channel,
+                            "Screen unchanged; reusing previous decision without a VLM call.",
+                        )
+                    else:
+                        reused_decisions = 0
+                        # The model gets a provider-sized frame (or just a
+                        # thumbnail, or nothing, in text-first mode); the
+                        # archived screenshot above stays full resolution.
+                        image_base64: Optional[str] = None
+                        if not text_first or not (
+                            settings.AGENT_OBSERVATION_MODE == "text"
+                            and vlm_provider.supports_text_only
+                        ):
+                            model_frame = await asyncio.to_thread(
+                                prepare_model_frame,
+                                screenshot_bytes,
+                                vlm_provider.thumbnail_spec
+                                if text_first
+                                else vlm_provider.frame_spec,
+                            )
+                            image_base64 = base64.b64encode(model_frame).decode("utf-8")
+                        history_for_prompt = mission_history.render(structured_log)
+
+                        user_content = f"{AGENT_SYSTEM_PROMPT}\n\n**Mission History**\n<history>\n{history_for_prompt}\n</history>\n\n**Your Current Mission Objective:**\n<objective>{task_prompt}</objective>"
+                        if unchanged and previous:
+                            user_content += NO_VISUAL_CHANGE_NOTE.format(
+                                action=previous.action
+                            )
+                        if nudge:
+                            user_content += STUCK_NUDGE_NOTE.format(reason=nudge)
+                        if text_first and snapshot is not None:
+                            user_content += PAGE_ELEMENTS_NOTE.format(
+                                elements=render_snapshot(snapshot)
+                            )
+
+                        # The inference server is responsible for adding the final model-specific tokens.
+                        vlm_response = await vlm_provider.get_next_action(
+                            image_base64, user_content
+                        )
 
-                    await redis_client.publish(
+                    await step_io.publish(
                         log_channel, f"Thought: {vlm_response.thought}"
                     )
-                    await redis_client.publish(
+                    await step_io.publish(
                         log_channel, f"Friction Score: {vlm_response.friction_score}/10"
                     )
 
@@ -156,164 +457,502 @@ async def agent_task_logic(
                             step=step + 1,
                             thought=vlm_response.thought,
                             action=vlm_response.action,
-                            screenshot_path=str(screenshot_path),
+                            screenshot_path=screenshot_ref,
                             observation=vlm_response.observation or "",
                             friction_score=vlm_response.friction_score or 0,
+                            frame_hash=frame_hash,
+                            snapshot=snapshot,
                         )
                     )
 
-                    await execute_action(
-                        page, vlm_response.action, run_id, redis_client
+                    terminated = "TERMINATE" in vlm_response.action.upper()
+                    verdict = trajectory.observe(
+                        vlm_response.action,
+                        screenshot_ref,
+                        waiting=is_wait_action(vlm_response.action),
                     )
+                    nudge = None
+                    if verdict and not terminated:
+                        await step_io.publish(
+                            log_channel, f"Trajectory check: {verdict.reason}"
+                        )
+                        if verdict.kind == "stop":
+                            structured_log[-1].stop_reason = verdict.reason
+                            terminated = True
+                        else:
+                            nudge = verdict.reason
 
-                    if "TERMINATE" in vlm_response.action.upper():
-                        await redis_client.publish(
-                            log_channel, "Execution phase terminated by agent."
+                    if not structured_log[-1].stop_reason:
+                        await execute_action(
+                            page,
+                            vlm_response.action,
+                            run_id,
+                            step_io,
+                            crop=action_crop,
+                        )
+                    if not terminated:
+                        structured_log[-1].settle_ms = await settler.wait()
+                        await step_io.publish(
+                            log_channel,
+                            f"Page settled in {structured_log[-1].settle_ms}ms",
+                        )
+                    # Persisted in the background, in batches, as the run goes.
+                    if step_writer.add(structured_log[-1]):
+                        await step_io.submit(step_writer.flush)
+                    await step_io.submit(
+                        partial(
+                            save_checkpoint,
+                            redis_client,
+                            run_id,
+                            context,
+                            page.url,
+                            list(structured_log),
+                            settings.RUN_CHECKPOINT_TTL_SECONDS,
+                        )
+                    )
+                    if terminated:
+                        await step_io.publish(
+                            log_channel,
+                            f"Execution phase stopped: {structured_log[-1].stop_reason}"
+                            if structured_log[-1].stop_reason
+                            else "Execution phase terminated by agent.",
                         )
                         break
-                    await asyncio.sleep(1.5)
 
-            run = await session.get(AgentRun, run_id)
-            if run:
-                run.run_log = [s.model_dump() for s in structured_log]
-                session.add(run)
-                await session.commit()
-
-            await update_run_status(session, run_id, "ANALYZING")
-            select_keyframes.send(run_id)
-            print("✅ [SCOUT] Execution complete. Triggering keyframe selection.")
+                if settings.ROUTING_ENABLED:
+                    cache_hits = router.cache.hits if router.cache else 0
+                    await step_io.publish(
+                        log_channel,
+                        f"Blocked {router.blocked} third-party requests; "
+                        f"served {cache_hits} assets from cache.",
+                    )
+
+            await step_writer.flush()
+            await start_report_pipeline(
+                session,
+                redis_client,
+                RunState(
+                    run_id=run_id,
+                    target_url=target_url,
+                    task_prompt=task_prompt,
+                    steps=structured_log,
+                ),
+            )
+            # Only now is the run's work safe elsewhere; until the pipeline is
+            # enqueued, a retry must still be able to resume.
+            await clear_checkpoint(redis_client, run_id)
+            print("✅ [SCOUT] Execution complete. Triggering report generation.")
+        except asyncio.CancelledError:
+            if run_supervisor.was_abandoned(run_id):
+                # The worker now holding the lease owns the run's state.
+                raise
+            # Either a user cancel request or the supervisor's time limit.
+            status = "CANCELLED" if run_supervisor.was_cancelled(run_id) else "FAILED"
+            await persist_pending_steps(step_writer)
+            await redis_client.publish(
+                log_channel, f"Run stopped before completion ({status})."
+            )
+            await update_run_status(session, redis_client, run_id, status)
+            raise
         except Exception as e:
             error_message = f"FATAL ERROR during agent run {run_id}: {e}"
             print(error_message)
-            await redis_client.publish(log_channel, error_message)
-            await update_run_status(session, run_id, "FAILED")
+            await persist_pending_steps(step_writer)
+            if final_attempt:
+                await redis_client.publish(log_channel, error_message)
+                await update_run_status(session, redis_client, run_id, "FAILED")
+            else:
+                await redis_client.publish(
+                    log_channel, f"{error_message}. Retrying from the last checkpoint."
+                )
+            # Let dramatiq retry; the next attempt resumes from the checkpoint.
+            raise
         finally:
-            if browser:
-                await browser.close()
-            await redis_client.publish(frame_channel, b"END")
+            await redis_client.publish(preview_channel, b"END")
+
+
+async def agent_session_logic(
+    run_id: str,
+    target_url: str,
+    task_prompt: str,
+    db: PostgresDatabase,
+    redis_client: redis.Redis,
+    final_attempt: bool = True,
+):
+    """
+    Runs the scout, resuming from the last checkpoint if a previous attempt
+    died, while listening for cancel requests for this run.
+    """
+    watcher = asyncio.create_task(listen_for_cancellation(run_id, redis_client))
+    try:
+        checkpoint = await load_checkpoint(redis_client, run_id)
+        await agent_task_logic(
+            run_id,
+            target_url,
+            task_prompt,
+            db,
+            redis_client,
+            checkpoint=checkpoint,
+            final_attempt=final_attempt,
+        )
+    finally:
+        watcher.cancel()
+
+
+def run_admission(
+    redis_client: redis.Redis, run_id: str, target_url: str, owner_id: Optional[str]
+) -> RunAdmission:
+    """The per-domain and per-user concurrency caps a run is subject to."""
+    return RunAdmission(
+        redis_client,
+        run_id,
+        domain=get_domain_from_url(target_url),
+        owner_id=owner_id,
+        max_per_domain=settings.RUN_MAX_CONCURRENT_PER_DOMAIN,
+        max_per_user=settings.RUN_MAX_CONCURRENT_PER_USER,
+        ttl_seconds=settings.AGENT_RUN_TIME_LIMIT_SECONDS + 60,
+    )
+
+
+def admission_retry_delay_ms(attempt: int) -> int:
+    """Jittered delay before a deferred run is retried, doubling per attempt."""
+    delay = min(
+        settings.RUN_ADMISSION_RETRY_DELAY_SECONDS * 2**attempt,
+        settings.RUN_ADMISSION_MAX_RETRY_DELAY_SECONDS,
+    )
+    return int(delay * random.uniform(0.5, 1.0) * 1000)
+
+
+async def admit_scout(
+    admission: RunAdmission,
+    target_url: str,
+    task_prompt: str,
+    owner_id: Optional[str],
+    lane: str,
+    admission_token: Optional[str] = None,
+    admission_attempt: int = 0,
+) -> bool:
+    """
+    Takes the run's admission slots, or parks it until one of them frees up.
+    A parked run is also retried after a backoff, in case the slot's holder
+    dies without releasing it. Returns whether the run may start now.
+    """
+    run_id = admission.run_id
+    if admission_token is not None and not await admission.claim(admission_token):
+        # A freed slot already woke the run, or it was parked again since.
+        return False
+    if await admission.acquire():
+        return True
+    print(f"⏳ [SCOUT] Run {run_id} is over its concurrency caps; deferring.")
+    scout = {
+        "run_id": run_id,
+        "target_url": target_url,
+        "task_prompt": task_prompt,
+        "owner_id": owner_id,
+        "lane": lane,
+        "admission_attempt": admission_attempt + 1,
+    }
+    token = uuid.uuid4().hex
+    await admission.park(token, json.dumps(scout))
+    enqueue_scout(
+        **scout,
+        delay_ms=admission_retry_delay_ms(admission_attempt),
+        admission_token=token,
+    )
+    return False
+
+
+async def release_admission(admission: RunAdmission):
+    """Frees the run's slots and starts the parked runs they were holding back."""
+    for payload in await admission.release():
+        enqueue_scout(**json.loads(payload))
+
+
+async def scout_session(
+    run_id: str,
+    target_url: str,
+    task_prompt: str,
+    owner_id: Optional[str],
+    lane: str,
+    final_attempt: bool,
+    admission_token: Optional[str] = None,
+    admission_attempt: int = 0,
+):
+    """
+    Admits the run and takes its lease before it waits for one of the
+    worker's run slots, so a run that cannot start yet never holds one.
+    """
+    redis_client = worker_resources.redis
+    admission = run_admission(redis_client, run_id, target_url, owner_id)
+    if not await admit_scout(
+        admission,
+        target_url,
+        task_prompt,
+        owner_id,
+        lane,
+        admission_token=admission_token,
+        admission_attempt=admission_attempt,
+    ):
+        return
+    lease = RunLease(
+        redis_client,
+        run_id,
+        ttl_seconds=settings.RUN_LEASE_TTL_SECONDS,
+        on_lost=lambda: run_supervisor.abandon(run_id),
+    )
+    if not await lease.acquire():
+        # The lease holder runs under the same admission slots.
+        print(f"🔒 [SCOUT] Run {run_id} is already being executed by another worker.")
+        return
+    try:
+        # The supervisor caps concurrency and enforces the per-run time
+        # limit and cancellation.
+        await run_supervisor.supervise(
+            run_id,
+            lambda: task_lifecycle_wrapper(
+                agent_session_logic,
+                run_id=run_id,
+                target_url=target_url,
+                task_prompt=task_prompt,
+                final_attempt=final_attempt,
+            ),
+        )
+    finally:
+        await lease.release()
+        if not lease.lost:
+            # Otherwise the slots are the new lease holder's to release.
+            await release_admission(admission)
+
+
+async def start_report_pipeline(
+    session: AsyncSession, redis_client: redis.Redis, state: RunState
+):
+    """Runs the inline stages, records their result and chains the report actors."""
+    state = REPORT_PIPELINE.run_inline(state)
+    await update_run_status(
+        session,
+        redis_client,
+        state.run_id,
+        "ANALYZING",
+        keyframe_indices=state.keyframe_indices,
+    )
+    REPORT_PIPELINE.enqueue(state)
+    print(
+        f"✅ [STRATEGIST] Selected keyframes {state.keyframe_indices} for {state.run_id}."
+    )
+
+
+async def load_run_state(session: AsyncSession, run_id: str) -> RunState:
+    """Rebuilds a run's pipeline state from the database, with its key steps."""
+    run = await session.get(AgentRun, run_id)
+    if not run:
+        raise ValueError("Run not found.")
+    return RunState(
+        run_id=run_id,
+        target_url=run.target_url,
+        task_prompt=run.task_prompt,
+        steps=await load_run_log(session, run_id, steps=run.keyframe_indices or []),
+        keyframe_indices=run.keyframe_indices or [],
+        final_result=run.final_result,
+    )
 
 
 async def keyframe_selection_logic(
     run_id: str, db: PostgresDatabase, redis_client: redis.Redis
 ):
-    """Phase 2: The Strategist. Selects the most important frames for analysis."""
+    """
+    Phase 2: The Strategist. Keyframes are now picked inline at the end of the
+    scout; this only serves selection messages queued before that.
+    """
     print(f"🎯 [STRATEGIST] Selecting keyframes for run_id: {run_id}")
     async for session in db.get_db_session():
-        run = await session.get(AgentRun, run_id)
         try:
-            if not run or not run.run_log:
-                raise ValueError("Run log not found.")
-
-            log = [RunStep.model_validate(s) for s in run.run_log]
-            key_indices = set()
-
-            if log:
-                key_indices.add(log[0].step)
-                key_indices.add(log[-1].step)
-
-            sorted_by_friction = sorted(
-                log, key=lambda s: s.friction_score, reverse=True
-            )
-            for step in sorted_by_friction[:3]:
-                key_indices.add(step.step)
-
-            run.keyframe_indices = sorted(list(key_indices))
-            session.add(run)
-            await session.commit()
-            print(
-                f"✅ [STRATEGIST] Selected keyframes {run.keyframe_indices} for {run_id}. Triggering JSON analysis."
+            run = await session.get(AgentRun, run_id)
+            if not run:
+                raise ValueError("Run not found.")
+            state = RunState(
+                run_id=run_id,
+                target_url=run.target_url,
+                task_prompt=run.task_prompt,
+                steps=await load_run_log(session, run_id),
             )
-            generate_final_report.send(run_id)
+            await start_report_pipeline(session, redis_client, state)
         except Exception as e:
             print(
                 f"❌ [STRATEGIST] FATAL ERROR during keyframe selection for {run_id}: {e}"
             )
-            if run:
-                run.status = "FAILED"
-                session.add(run)
-                await session.commit()
+            await update_run_status(session, redis_client, run_id, "FAILED")
 
 
 async def report_analysis_logic(
-    run_id: str, db: PostgresDatabase, redis_client: redis.Redis
-):
-    """Phase 3, Part 1: The Analyst. Generates the structured JSON report from keyframes."""
+    run_id: str,
+    db: PostgresDatabase,
+    redis_client: redis.Redis,
+    state: Optional[dict[str, Any]] = None,
+) -> Optional[dict[str, Any]]:
+    """
+    Phase 3, Part 1: The Analyst. Generates the structured JSON report from
+    keyframes and returns the updated state for the designer, or None on failure.
+    """
     print(f"🔬 [ANALYST] Starting JSON report generation for run_id: {run_id}")
     async for session in db.get_db_session():
-        run = await session.get(AgentRun, run_id)
         try:
-            if not run or not run.run_log or not run.keyframe_indices:
+            run_state = (
+                RunState.model_validate(state)
+                if state
+                else await load_run_state(session, run_id)
+            )
+            if not run_state.keyframe_indices:
                 raise ValueError("Keyframes not selected.")
 
-            key_steps = [s for s in run.run_log if s["step"] in run.keyframe_indices]
+            key_steps = run_state.steps
             log_text = "Log of key agent actions:\n---\n" + "\n---\n".join(
                 [
-                    f"Step {s['step']}:\nThought: {s['thought']}\nAction: {s['action']}"
+                    f"Step {s.step}:\nThought: {s.thought}\nAction: {s.action}"
                     for s in key_steps
                 ]
             )
-            image_paths = [s["screenshot_path"] for s in key_steps]
-            images = [Image.open(path) for path in image_paths if os.path.exists(path)]
-            if not images:
+            # Identical frames share one blob, so each is prepared only once.
+            frames, _ = await asyncio.to_thread(
+                prepare_keyframes,
+                [resolve_screenshot(s.screenshot_path) for s in key_steps],
+                ANALYST_FRAME_SPEC,
+                settings.ANALYST_IMAGE_BUDGET_BYTES,
+            )
+            if not frames:
                 raise ValueError("No valid screenshots found.")
+            images = [
+                {"mime_type": image_mime_type(frame), "data": frame} for frame in frames
+            ]
 
-            report_json_str = gemini_provider.generate_report_from_run(images, log_text)
-            report_data = json.loads(
-                report_json_str.strip().replace("```json", "").replace("```", "")
+            report_json_str = await gemini_provider.generate_report_from_run(
+                images, log_text
             )
+            report_data = parse_report_json(report_json_str)
 
-            run.final_result = report_data
-            session.add(run)
-            await session.commit()
+            await update_run(session, run_id, final_result=report_data)
             print(
-                f"✅ [ANALYST] Saved JSON report for {run_id}. Triggering PDF design."
+                f"✅ [ANALYST] Saved JSON report for {run_id}. Handing off to the designer."
             )
-            generate_design_report.send(run_id)
+            return run_state.model_copy(
+                update={"final_result": report_data}
+            ).model_dump(mode="json")
         except Exception as e:
             print(f"❌ [ANALYST] FATAL ERROR during JSON analysis for {run_id}: {e}")
-            if run:
-                run.status = "FAILED"
-                session.add(run)
-                await session.commit()
+            await update_run_status(session, redis_client, run_id, "FAILED")
+    return None
+
+
+def open_image(path: Path) -> Image.Image:
+    """Opens and fully decodes an image. Blocking; run it in a thread."""
+    image = Image.open(path)
+    image.load()
+    return image
+
+
+async def render_after_image(before_path: Path, recommendation: str, after_path: Path):
+    """Generates and saves one redesigned screenshot."""
+    before_image = await asyncio.to_thread(open_image, before_path)
+    after_image = await gemini_provider.generate_improved_design(
+        before_image, recommendation
+    )
+    await asyncio.to_thread(after_image.save, after_path)
+
+
+async def generate_after_images(
+    run_id: str,
+    redis_client: redis.Redis,
+    points: list[FrictionPoint],
+    before_paths: dict[int, Path],
+    run_storage_path: Path,
+) -> list[tuple[str, str]]:
+    """
+    Generates the "after" image of every friction point concurrently, at most
+    DESIGN_IMAGE_CONCURRENCY at a time and each within
+    DESIGN_IMAGE_TIMEOUT_SECONDS. A point whose image fails or times out is
+    left out; the rest of the report still gets its images. Returns
+    (before, after) file names in friction point order.
+    """
+    semaphore = asyncio.Semaphore(settings.DESIGN_IMAGE_CONCURRENCY)
+
+    async def render(point: FrictionPoint) -> Optional[tuple[str, str]]:
+        before_path = before_paths[point.step]
+        after_path = run_storage_path / f"after_{point.step}.png"
+        if not before_path.exists():
+            return None
+        async with semaphore:
+            try:
+                await asyncio.wait_for(
+                    render_after_image(before_path, point.recommendation, after_path),
+                    timeout=settings.DESIGN_IMAGE_TIMEOUT_SECONDS,
+                )
+            except Exception as e:
+                reason = "timed out" if isinstance(e, asyncio.TimeoutError) else str(e)
+                message = f"Skipped the redesign of step {point.step}: {reason}"
+                print(f"⚠️ [DESIGNER] {message} (run {run_id})")
+                await redis_client.publish(f"logs:{run_id}", message)
+                return None
+        # Pass relative paths for Markdown images; the screenshots endpoint
+        # serves `step_N.jpeg` by step.
+        return f"step_{point.step}.jpeg", after_path.name
+
+    results = await asyncio.gather(*(render(point) for point in points))
+    return [pair for pair in results if pair is not None]
 
 
 async def design_report_logic(
-    run_id: str, db: PostgresDatabase, redis_client: redis.Redis
+    run_id: str,
+    db: PostgresDatabase,
+    redis_client: redis.Redis,
+    state: Optional[dict[str, Any]] = None,
 ):
     """Phase 3, Part 2: The Designer. Generates the final Markdown report."""
     print(f"🎨 [DESIGNER] Starting Markdown report generation for run_id: {run_id}")
     run_storage_path = Path(f"storage/runs/{run_id}")
+    run_storage_path.mkdir(parents=True, exist_ok=True)
 
     async for session in db.get_db_session():
-        run = await session.get(AgentRun, run_id)
-        if not run or not run.final_result:
-            raise ValueError("Analysis report must be generated first.")
+        # Without state, this is an older message or the analyst failed.
+        run_state = (
+            RunState.model_validate(state)
+            if state
+            else await load_run_state(session, run_id)
+        )
+        if not run_state.final_result:
+            print(f"⏭️ [DESIGNER] No analysis report for {run_id}; skipping design.")
+            return
         try:
-            analysis_data = FinalReport.model_validate(run.final_result)
-            image_pairs = []
-
-            for i, point in enumerate(analysis_data.friction_points):
-                before_image_path = Path(point.screenshot_path)
-                after_image_path = run_storage_path / f"after_{point.step}.png"
-                if before_image_path.exists():
-                    before_image = Image.open(before_image_path)
-                    after_image = gemini_provider.generate_improved_design(
-                        before_image, point.recommendation
-                    )
-                    after_image.save(after_image_path)
-                    image_pairs.append(
-                        (
-                            # Pass relative paths for Markdown images
-                            str(before_image_path.name),
-                            str(after_image_path.name),
-                        )
+            analysis_data = FinalReport.model_validate(run_state.final_result)
+            steps = {s.step: s for s in run_state.steps}
+            missing = [
+                p.step for p in analysis_data.friction_points if p.step not in steps
+            ]
+            if missing:
+                steps.update(
+                    (s.step, s)
+                    for s in await load_run_log(session, run_id, steps=missing)
+                )
+
+            image_pairs = await generate_after_images(
+                run_id,
+                redis_client,
+                analysis_data.friction_points,
+                {
+                    point.step: resolve_screenshot(
+                        steps[point.step].screenshot_path
+                        if point.step in steps
+                        else point.screenshot_path
                     )
+                    for point in analysis_data.friction_points
+                },
+                run_storage_path,
+            )
 
             # Generate the Markdown document string
-            markdown_doc_str = gemini_provider.author_markdown_report(
+            markdown_doc_str = await gemini_provider.author_markdown_report(
                 analysis=analysis_data,
-                target_url=run.target_url,
-                task_prompt=run.task_prompt,
+                target_url=run_state.target_url,
+                task_prompt=run_state.task_prompt,
                 image_pairs=image_pairs,
             )
 
@@ -322,10 +961,13 @@ async def design_report_logic(
             md_file_path.write_text(markdown_doc_str, encoding="utf-8")
 
             if md_file_path.exists():
-                run.report_path = str(md_file_path)
-                run.status = "COMPLETED"
-                session.add(run)
-                await session.commit()
+                await update_run_status(
+                    session,
+                    redis_client,
+                    run_id,
+                    "COMPLETED",
+                    report_path=str(md_file_path),
+                )
                 print(
                     f"✅ [DESIGNER] Successfully generated Markdown report at {md_file_path}"
                 )
@@ -335,54 +977,210 @@ async def design_report_logic(
             print(
                 f"❌ [DESIGNER] FATAL ERROR during Markdown generation for {run_id}: {e}"
             )
-            if run:
-                run.status = "FAILED"
-                session.add(run)
-                await session.commit()
+            await update_run_status(session, redis_client, run_id, "FAILED")
 
 
 # --- Async Lifecycle Wrapper ---
 async def task_lifecycle_wrapper(actor_logic, **kwargs):
-    """A single async context manager for all worker tasks."""
-    db_instance = PostgresDatabase()
-    redis_instance = redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
-    try:
-        await actor_logic(db=db_instance, redis_client=redis_instance, **kwargs)
-    finally:
-        print(
-            f"🧹 [WORKER] Cleaning up resources for task related to run_id: {kwargs.get('run_id')}"
+    """Runs a task with the worker's shared database engine and Redis pool."""
+    return await actor_logic(
+        db=worker_resources.db, redis_client=worker_resources.redis, **kwargs
+    )
+
+
+async def collect_screenshot_blobs():
+    """Deletes orphaned screenshot blobs, once per interval across all workers."""
+    redis_client = worker_resources.redis
+    if not await redis_client.set(
+        "screenshot-blob-gc",
+        "1",
+        nx=True,
+        ex=settings.SCREENSHOT_BLOB_GC_INTERVAL_SECONDS,
+    ):
+        return
+    async for session in worker_resources.db.get_db_session():
+        deleted = await collect_orphan_blobs(
+            session, settings.SCREENSHOT_BLOB_GRACE_SECONDS
         )
-        await db_instance.engine.dispose()
-        await redis_instance.close()
+        print(f"🧹 [WORKER] Deleted {deleted} orphaned screenshot blobs.")
+
+
+worker_loop.add_periodic_task(
+    settings.SCREENSHOT_BLOB_GC_INTERVAL_SECONDS, collect_screenshot_blobs
+)
 
 
 # --- Dramatiq Actors ---
-@dramatiq.actor(broker=redis_broker, max_retries=1, time_limit=900_000)
-def run_churninator_agent(run_id: str, target_url: str, task_prompt: str):
-    """Entrypoint actor that runs the agent execution task."""
-    asyncio.run(
-        task_lifecycle_wrapper(
-            agent_task_logic,
-            run_id=run_id,
-            target_url=target_url,
-            task_prompt=task_prompt,
+def is_final_attempt(actor: dramatiq.Actor) -> bool:
+    """Whether the message being processed will not be retried if it fails."""
+    message = CurrentMessage.get_current_message()
+    if message is None:
+        return True
+    max_retries = message.options.get("max_retries", actor.options.get("max_retries"))
+    return max_retries is not None and message.options.get("retries", 0) >= max_retries
+
+
+def run_scout(
+    run_id: str,
+    target_url: str,
+    task_prompt: str,
+    owner_id: Optional[str],
+    lane: str,
+    admission_token: Optional[str] = None,
+    admission_attempt: int = 0,
+):
+    # Many runs share the process-wide loop.
+    worker_loop.run(
+        scout_session(
+            run_id,
+            target_url,
+            task_prompt,
+            owner_id,
+            lane,
+            final_attempt=is_final_attempt(SCOUT_ACTORS[lane]),
+            admission_token=admission_token,
+            admission_attempt=admission_attempt,
         )
     )
 
 
-@dramatiq.actor(broker=redis_broker, max_retries=1)
+# Within a worker, prefetched priority-lane messages are processed before
+# standard-lane ones (lower dramatiq priority runs first).
+@dramatiq.actor(
+    broker=redis_broker,
+    max_retries=1,
+    time_limit=900_000,
+    queue_name=LANE_QUEUES[STANDARD_LANE],
+    priority=10,
+)
+def run_churninator_agent(
+    run_id: str,
+    target_url: str,
+    task_prompt: str,
+    owner_id: Optional[str] = None,
+    admission_token: Optional[str] = None,
+    admission_attempt: int = 0,
+):
+    """Entrypoint actor that runs the agent execution task (standard lane)."""
+    run_scout(
+        run_id,
+        target_url,
+        task_prompt,
+        owner_id,
+        STANDARD_LANE,
+        admission_token=admission_token,
+        admission_attempt=admission_attempt,
+    )
+
+
+@dramatiq.actor(
+    broker=redis_broker,
+    max_retries=1,
+    time_limit=900_000,
+    queue_name=LANE_QUEUES[PRIORITY_LANE],
+    priority=0,
+)
+def run_churninator_agent_priority(
+    run_id: str,
+    target_url: str,
+    task_prompt: str,
+    owner_id: Optional[str] = None,
+    admission_token: Optional[str] = None,
+    admission_attempt: int = 0,
+):
+    """Entrypoint actor that runs the agent execution task (priority lane)."""
+    run_scout(
+        run_id,
+        target_url,
+        task_prompt,
+        owner_id,
+        PRIORITY_LANE,
+        admission_token=admission_token,
+        admission_attempt=admission_attempt,
+    )
+
+
+SCOUT_ACTORS = {
+    STANDARD_LANE: run_churninator_agent,
+    PRIORITY_LANE: run_churninator_agent_priority,
+}
+
+
+def enqueue_scout(
+    run_id: str,
+    target_url: str,
+    task_prompt: str,
+    owner_id: Optional[str],
+    lane: str = STANDARD_LANE,
+    delay_ms: Optional[int] = None,
+    admission_token: Optional[str] = None,
+    admission_attempt: int = 0,
+):
+    """Sends a scout run to its lane's queue."""
+    kwargs: dict[str, Any] = {"owner_id": owner_id}
+    if admission_token is not None:
+        kwargs["admission_token"] = admission_token
+    if admission_attempt:
+        kwargs["admission_attempt"] = admission_attempt
+    SCOUT_ACTORS[lane].send_with_options(
+        args=(run_id, target_url, task_prompt),
+        kwargs=kwargs,
+        delay=delay_ms,
+    )
+
+
+def enqueue_scouts(
+    runs: list[tuple[str, str, str]],
+    owner_id: Optional[str],
+    lane: str = STANDARD_LANE,
+):
+    """Sends many (run_id, target_url, task_prompt) scout runs in one round trip."""
+    actor = SCOUT_ACTORS[lane]
+    messages = [
+        actor.message_with_options(args=run, kwargs={"owner_id": owner_id})
+        for run in runs
+    ]
+    if isinstance(actor.broker, PipelinedRedisBroker):
+        actor.broker.enqueue_many(messages)
+    else:
+        for message in messages:
+            actor.broker.enqueue(message)
+
+
+@dramatiq.actor(broker=redis_broker, max_retries=1, queue_name=REPORT_QUEUE)
 def select_keyframes(run_id: str):
-    """New actor for Phase 2."""
-    asyncio.run(task_lifecycle_wrapper(keyframe_selection_logic, run_id=run_id))
+    """Actor for Phase 2, kept for selection messages queued before it ran inline."""
+    worker_loop.run(task_lifecycle_wrapper(keyframe_selection_logic, run_id=run_id))
 
 
-@dramatiq.actor(broker=redis_broker, max_retries=1, time_limit=600_000)
-def generate_final_report(run_id: str):
+@dramatiq.actor(
+    broker=redis_broker, max_retries=1, time_limit=600_000, queue_name=REPORT_QUEUE
+)
+def generate_final_report(
+    run_id: str, state: Optional[dict[str, Any]] = None
+) -> Optional[dict[str, Any]]:
     """Actor for Phase 3, Part 1 (JSON Analysis)."""
-    asyncio.run(task_lifecycle_wrapper(report_analysis_logic, run_id=run_id))
+    return worker_loop.run(
+        task_lifecycle_wrapper(report_analysis_logic, run_id=run_id, state=state)
+    )
+
+
+@dramatiq.actor(
+    broker=redis_broker, max_retries=1, time_limit=1800_000, queue_name=REPORT_QUEUE
+)
+def generate_design_report(run_id: str, state: Optional[dict[str, Any]] = None):
+    """Actor for Phase 3, Part 2 (Markdown report)."""
+    worker_loop.run(
+        task_lifecycle_wrapper(design_report_logic, run_id=run_id, state=state)
+    )
 
 
-@dramatiq.actor(broker=redis_broker, max_retries=1, time_limit=1800_000)
-def generate_design_report(run_id: str):
-    """Actor for Phase 3, Part 2 (PDF Generation)."""
-    asyncio.run(task_lifecycle_wrapper(design_report_logic, run_id=run_id))
+# Everything after the scout: keyframes are picked inline, in memory; the two
+# Gemini stages are chained as one dramatiq pipeline carrying the run state.
+REPORT_PIPELINE = StagedPipeline(
+    [
+        Stage("keyframes", run=pick_keyframes),
+        Stage("analysis", actor=generate_final_report),
+        Stage("design", actor=generate_design_report),
+    ]
+)
@@ -0,0 +1,75 @@
+# backend/worker/trajectory.py
+from dataclasses import dataclass
+from typing import Literal, Optional
+
+
+@dataclass
+class TrajectoryVerdict:
+    kind: Literal["nudge", "stop"]
+    reason: str
+
+
+class TrajectoryMonitor:
+    """
+    Watches the scout's trajectory for wasted steps.
+
+    Flags a step when the agent repeats the same action `repeat_threshold`
+    times in a row, when the screen stays the same for that many non-wait
+    steps, or when it oscillates between two actions or two screens (A, B, A,
+    B). Screens are compared by an exact content key (the screenshot's
+    digest), so any visible change counts as progress. The first `patience`
+    consecutive flagged steps produce a nudge for the next prompt. Any further
+    flagged step produces a stop. A clean step resets the count.
+    """
+
+    def __init__(self, repeat_threshold: int = 3, patience: int = 2):
+        self.repeat_threshold = repeat_threshold
+        self.patience = patience
+        self._actions: list[str] = []
+        self._frames: list[Optional[str]] = []
+        self._waits: list[bool] = []
+        self._strikes = 0
+
+    def observe(
+        self, action: str, frame_key: Optional[str], waiting: bool = False
+    ) -> Optional[TrajectoryVerdict]:
+        """Records a step and returns a verdict if the trajectory looks stuck."""
+        self._actions.append(" ".join(action.split()))
+        self._frames.append(frame_key)
+        self._waits.append(waiting)
+
+        reason = self._detect()
+        if reason is None:
+            self._strikes = 0
+            return None
+        self._strikes += 1
+        kind: Literal["nudge", "stop"] = (
+            "nudge" if self._strikes <= self.patience else "stop"
+        )
+        return TrajectoryVerdict(kind=kind, reason=reason)
+
+    def _same_frame(self, a: Optional[str], b: Optional[str]) -> bool:
+        return a is not None and a == b
+
+    def _detect(self) -> Optional[str]:
+        n = self.repeat_threshold
+        if len(self._actions) >= n and not any(self._waits[-n:]):
+            recent = self._actions[-n:]
+            if len(set(recent)) == 1:
+                return f"Repeated the same action `{recent[0]}` {n} times in a row."
+            frames = self._frames[-n:]
+            if all(self._same_frame(frames[0], f) for f in frames[1:]):
+                return f"The screen has not changed for {n} steps."
+
+        if len(self._actions) >= 4:
+            a, b, c, d = self._actions[-4:]
+            if a == c and b == d and a != b:
+                return f"Oscillating between actions `{a}` and `{b}`."
+            f1, f2, f3, f4 = self._frames[-4:]
+            if (
+                self._same_frame(f1, f3)
+                and self._same_frame(f2, f4)
+                and not self._same_frame(f1, f2)
+            ):
+                return "Oscillating between the same two screens."
+        return None